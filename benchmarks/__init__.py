@@ -0,0 +1,19 @@
+# benchmarks/__init__.py
+"""
+Benchmarks do Event Scraper. Execute cada um como módulo a partir da raiz do
+repositório, por exemplo: `python -m benchmarks.bench_crawler`.
+
+Os benchmarks nunca tocam no banco real: antes de qualquer import de `src`,
+DATABASE_URL aponta para um arquivo temporário (a menos que já esteja definida).
+O cache de resultados das consultas também fica desligado por padrão, para
+que as medições repetidas executem o SQL de verdade.
+"""
+
+import os
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    _bench_dir = tempfile.mkdtemp(prefix="event_scraper_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_bench_dir, 'bench.db')}"
+
+os.environ.setdefault("QUERY_CACHE_ENABLED", "0")
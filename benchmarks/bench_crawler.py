@@ -0,0 +1,74 @@
+# benchmarks/bench_crawler.py
+"""
+Compara o caminho sequencial (EventCrawler) com o AsyncEventCrawler buscando
+as mesmas janelas AJAX em um servidor stub local com latência fixa.
+
+Uso: python -m benchmarks.bench_crawler [--windows 24] [--latency 0.1] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.stub_server import StubServer
+from src.crawlers.async_event_crawler import AsyncEventCrawler
+from src.crawlers.event_crawler import EventCrawler
+from src.parsers.event_parser import EventParser
+
+ACTION = 'mec_grid_load_more'
+
+
+def make_windows(count):
+    today = datetime(2024, 12, 1)
+    return [((today + timedelta(days=i)).strftime('%Y-%m-%d'), 0) for i in range(count)]
+
+
+def run_sequential(url, windows, parser):
+    crawler = EventCrawler(url)
+    parsed = 0
+    start = time.perf_counter()
+    try:
+        for start_date, offset in windows:
+            response_json = crawler.fetch_events_ajax(ACTION, start_date, offset)
+            if response_json:
+                parsed += len(parser.parse_events_from_html(response_json.get('html', '')))
+    finally:
+        crawler.close()
+    return time.perf_counter() - start, parsed
+
+
+async def run_async(url, windows, parser, concurrency):
+    parsed = 0
+    start = time.perf_counter()
+    async with AsyncEventCrawler(url, concurrency=concurrency) as crawler:
+        async for _, _, response_json in crawler.fetch_windows(ACTION, windows):
+            if response_json:
+                parsed += len(parser.parse_events_from_html(response_json.get('html', '')))
+    return time.perf_counter() - start, parsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--windows', type=int, default=24)
+    arg_parser.add_argument('--latency', type=float, default=0.1)
+    arg_parser.add_argument('--concurrency', type=int, default=8)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    parser = EventParser()
+    windows = make_windows(args.windows)
+
+    with StubServer(latency=args.latency) as server:
+        seq_time, seq_events = run_sequential(server.url, windows, parser)
+        async_time, async_events = asyncio.run(run_async(server.url, windows, parser, args.concurrency))
+
+    print(f"Janelas: {args.windows} | latência: {args.latency:.3f}s | concorrência: {args.concurrency}")
+    print(f"Sequencial: {seq_time:.3f}s ({seq_events} eventos)")
+    print(f"Assíncrono: {async_time:.3f}s ({async_events} eventos)")
+    print(f"Speedup:    {seq_time / async_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
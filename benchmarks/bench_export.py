@@ -0,0 +1,82 @@
+# benchmarks/bench_export.py
+"""
+Mede a exportação de eventos (src/export) em bancos de tamanhos diferentes:
+tempo, linhas por segundo, tamanho do arquivo e pico de memória Python
+(tracemalloc) de cada formato, comparados com o jeito antigo de exportar
+(get_all_events() inteiro em uma lista, serializado com um json.dump).
+
+O pico de memória da exportação em blocos depende de --chunk-size, não
+do tamanho do banco; o do jeito antigo cresce com o número de eventos.
+
+Uso: python -m benchmarks.bench_export [--sizes 1000 10000] [--chunk-size 1000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_queries import load_database
+from src.export.event_export import EventExporter
+from src.export.writers import DEFAULT_COMPRESSION
+from src.queries import database_queries
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def export_all_events(path):
+    """
+    Exportação antiga: a lista inteira em memória, depois um único json.dump.
+    """
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump([dict(row) for row in database_queries.get_all_events()], output, ensure_ascii=False, default=str)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    arg_parser.add_argument('--chunk-size', type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    exporter = EventExporter(chunk_size=args.chunk_size)
+    variants = [
+        ('ndjson', None),
+        ('ndjson', 'gzip'),
+        ('parquet', DEFAULT_COMPRESSION['parquet']),
+        ('arrow', None),
+        ('arrow', 'lz4'),
+    ]
+    print(f"{'eventos':>8} {'exportação':>18} {'tempo (s)':>10} {'linhas/s':>10} {'arquivo (KB)':>13} {'pico (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            load_database(size)
+            path = os.path.join(directory, 'all_events.json')
+            elapsed, peak, _ = measure(lambda: export_all_events(path))
+            print(f"{size:>8} {'get_all_events':>18} {elapsed:>10.3f} {size / elapsed:>10.0f} "
+                  f"{os.path.getsize(path) / 1024:>13.0f} {peak / 2 ** 20:>10.1f}")
+
+            for format, compression in variants:
+                label = f"{format}/{compression or 'none'}"
+                path = os.path.join(directory, f"events-{format}-{compression}")
+                elapsed, peak, run = measure(
+                    lambda: exporter.export(path, format=format, compression=compression, name='bench'))
+                if run is None:
+                    raise SystemExit(f"A exportação {label} falhou.")
+                print(f"{size:>8} {label:>18} {elapsed:>10.3f} {run.rows / elapsed:>10.0f} "
+                      f"{run.bytes_written / 1024:>13.0f} {peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_parse_pool.py
+"""
+Escalabilidade do ParallelEventParser com 1, 2, 4 e 8 processos worker sobre
+um corpus sintético de páginas da grade MEC.
+
+Uso: python -m benchmarks.bench_parse_pool [--pages 200] [--events-per-page 50] [--workers 1 2 4 8]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from benchmarks.corpus import make_event, make_grid_html
+from src.parsers.event_parser import EventParser
+from src.parsers.parallel_parser import ParallelEventParser
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--pages', type=int, default=200)
+    arg_parser.add_argument('--events-per-page', type=int, default=50)
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    arg_parser.add_argument('--engine', choices=('fast', 'soup'), default='soup')
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    corpus = [
+        make_grid_html([make_event(page * args.events_per_page + i) for i in range(args.events_per_page)])
+        for page in range(args.pages)
+    ]
+    size_mb = sum(len(html) for html in corpus) / 1024 / 1024
+    print(f"Corpus: {args.pages} páginas, {args.pages * args.events_per_page} eventos, {size_mb:.1f} MB "
+          f"| motor: {args.engine} | núcleos: {os.cpu_count()}")
+
+    baseline = None
+    print(f"{'workers':>8} {'tempo (s)':>10} {'páginas/s':>10} {'eventos/s':>10} {'speedup':>8}")
+    for workers in args.workers:
+        stage = ParallelEventParser(EventParser(engine=args.engine), workers=workers)
+        try:
+            # Aquece o pool para não medir a criação dos processos.
+            list(stage.parse_many(corpus[:workers]))
+            start = time.perf_counter()
+            events = sum(len(parsed) for _, parsed in stage.parse_many(corpus))
+            elapsed = time.perf_counter() - start
+        finally:
+            stage.close()
+
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {args.pages / elapsed:>10.0f} "
+              f"{events / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
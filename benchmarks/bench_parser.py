@@ -0,0 +1,55 @@
+# benchmarks/bench_parser.py
+"""
+Micro-benchmark do EventParser: extrator rápido de JSON-LD contra a árvore
+completa do BeautifulSoup, em páginas sintéticas da grade MEC. Antes de medir,
+confere que os dois motores produzem exatamente os mesmos eventos.
+
+Uso: python -m benchmarks.bench_parser [--sizes 12 100 1000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.corpus import make_event, make_grid_html, make_page_html
+from src.parsers.event_parser import EventParser
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[12, 100, 1000])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    fast = EventParser(engine='fast')
+    soup = EventParser(engine='soup')
+
+    print(f"{'página':>16} {'eventos':>8} {'KB':>8} {'soup (ms)':>10} {'fast (ms)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        events = [make_event(i) for i in range(size)]
+        pages = {'grade AJAX': make_grid_html(events), 'página inicial': make_page_html(events)}
+        for label, html in pages.items():
+            expected = soup.parse_events_from_html(html)
+            if fast.parse_events_from_html(html) != expected:
+                raise SystemExit(f"Saídas divergentes entre os motores para {label} com {size} eventos")
+
+            soup_time = best_time(lambda: soup.parse_events_from_html(html), args.repeat)
+            fast_time = best_time(lambda: fast.parse_events_from_html(html), args.repeat)
+            print(
+                f"{label:>16} {size:>8} {len(html) / 1024:>8.0f} {soup_time * 1000:>10.2f} "
+                f"{fast_time * 1000:>10.2f} {soup_time / fast_time:>7.1f}x"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pipeline.py
+"""
+Compara a gravação evento a evento do DatabasePipeline com o upsert em lote
+(process_events_batch), em páginas de eventos sintéticos, em linhas por segundo.
+Cada tamanho roda em tabelas recém-criadas: primeiro uma carga inicial, depois
+a mesma carga de novo (eventos já gravados, que a impressão digital permite pular).
+
+Uso: python -m benchmarks.bench_pipeline [--sizes 1000 10000 100000] [--page-size 50]
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.corpus import make_event
+from src.db.database import database
+from src.db.init_db import initialize_db
+from src.db.models import Event, Venue, EventData, Metadata, EventDetails, EventSearch
+from src.parsers.event_parser import EventParser
+from src.pipelines.database_pipeline import DatabasePipeline
+
+
+def make_parsed_events(count):
+    parser = EventParser()
+    return [parser.extract_event_data(make_event(i)) for i in range(count)]
+
+
+def reset_tables():
+    with database:
+        database.drop_tables([EventSearch, EventDetails, Metadata, EventData, Venue, Event], safe=True)
+    initialize_db()
+
+
+def count_rows():
+    return sum(model.select().count() for model in (Event, EventData, EventDetails, Metadata))
+
+
+def run(write_page, events, page_size):
+    start = time.perf_counter()
+    for offset in range(0, len(events), page_size):
+        write_page(events[offset:offset + page_size])
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--page-size', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    pipeline = DatabasePipeline()
+    modes = {
+        'evento a evento': pipeline.process_events_individually,
+        'lote': pipeline.process_events_batch,
+    }
+
+    print(f"{'eventos':>8} {'modo':>16} {'linhas':>8} {'carga (s)':>10} {'linhas/s':>10} {'reenvio (s)':>11} {'linhas/s':>10}")
+    for size in args.sizes:
+        events = make_parsed_events(size)
+        for label, write_page in modes.items():
+            reset_tables()
+            pipeline.identity_map.clear()
+            insert_time = run(write_page, events, args.page_size)
+            rows = count_rows()
+            update_time = run(write_page, events, args.page_size)
+            print(f"{size:>8} {label:>16} {rows:>8} {insert_time:>10.2f} {rows / insert_time:>10.0f} "
+                  f"{update_time:>11.2f} {rows / update_time:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
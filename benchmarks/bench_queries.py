@@ -0,0 +1,99 @@
+# benchmarks/bench_queries.py
+"""
+Conta os statements SQL e mede a latência de cada função de
+src/queries/database_queries.py em bancos de tamanhos diferentes.
+
+Uma função sem N+1 executa o mesmo número de statements qualquer que seja
+o número de eventos; se a contagem variar entre os tamanhos, o benchmark
+termina com erro, indicando qual função voltou a fazer consultas por linha.
+
+Uso: python -m benchmarks.bench_queries [--sizes 100 1000] [--repeat 3]
+"""
+
+import argparse
+import logging
+import time
+from contextlib import contextmanager
+
+from peewee import chunked
+
+from benchmarks.bench_pipeline import make_parsed_events
+from benchmarks.suite import QUERY_FUNCTIONS, reset_database
+from src.db.database import database
+from src.db.models import EventDetails
+from src.pipelines.database_pipeline import DatabasePipeline
+from src.queries import database_queries
+
+# Um em cada OUTDOOR_EVERY eventos recebe event_type = 'Ao ar livre' nos detalhes,
+# para que get_outdoor_events tenha linhas a devolver.
+OUTDOOR_EVERY = 3
+
+
+@contextmanager
+def count_statements():
+    """
+    Conta as chamadas a database.execute_sql dentro do bloco.
+    O contador é uma lista de um elemento, lida depois do bloco.
+    """
+    counter = [0]
+    execute_sql = database.execute_sql
+
+    def counting_execute_sql(sql, params=None, *args, **kwargs):
+        counter[0] += 1
+        return execute_sql(sql, params, *args, **kwargs)
+
+    database.execute_sql = counting_execute_sql
+    try:
+        yield counter
+    finally:
+        del database.execute_sql
+
+
+def load_database(size):
+    reset_database()
+    pipeline = DatabasePipeline()
+    events = make_parsed_events(size)
+    for offset in range(0, size, 100):
+        pipeline.process_events(events[offset:offset + 100])
+
+    event_ids = [event_id for (event_id,) in EventDetails.select(EventDetails.event).tuples()]
+    with database.atomic():
+        for ids in chunked(event_ids[::OUTDOOR_EVERY], 200):
+            EventDetails.update(event_type='Ao ar livre').where(EventDetails.event.in_(ids)).execute()
+
+
+def measure(query_function, repeat):
+    with count_statements() as counter:
+        result = query_function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query_function()
+        timings.append(time.perf_counter() - start)
+    return counter[0], len(result), min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.INFO)
+    statements = {}
+
+    print(f"{'eventos':>8} {'consulta':>24} {'statements':>10} {'linhas':>8} {'ms':>10}")
+    for size in args.sizes:
+        load_database(size)
+        for name in QUERY_FUNCTIONS:
+            count, rows, elapsed = measure(getattr(database_queries, name), args.repeat)
+            statements.setdefault(name, set()).add(count)
+            print(f"{size:>8} {name:>24} {count:>10} {rows:>8} {elapsed * 1000:>10.2f}")
+
+    scaling = [name for name, counts in statements.items() if len(counts) > 1]
+    if scaling:
+        raise SystemExit(f"Número de statements varia com o tamanho do banco (N+1): {', '.join(scaling)}")
+
+
+if __name__ == '__main__':
+    main()
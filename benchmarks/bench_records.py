@@ -0,0 +1,142 @@
+# benchmarks/bench_records.py
+"""
+Compara, com tracemalloc, a memória dos registros de evento compactos com a
+dos dicionários usados antes, em um corpus de 100k eventos por padrão:
+
+- parse: a lista de todos os eventos extraídos do corpus, como ParsedEvent
+  (tupla nomeada, com tipo, local, moeda e disponibilidade internados) e
+  como o dicionário de 12 chaves que extract_event_data devolvia;
+- consulta: o resultado de get_all_events() sobre o banco carregado com os
+  mesmos eventos, como EventRow (__slots__, strings compartilhadas) e como
+  o dicionário com as chaves de exibição que as consultas montavam.
+
+"retido" é a memória ainda alocada quando a lista fica pronta; "pico" inclui
+os temporários do parse ou do cursor. O tempo vem de uma execução sem o
+tracemalloc, que distorce as medições de tempo.
+
+Uso: python -m benchmarks.bench_records [--size 100000] [--skip-queries]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import time
+import tracemalloc
+
+from benchmarks.bench_queries import load_database
+from benchmarks.corpus import make_corpus_pages
+from src.db.models import Event, EventData
+from src.parsers.event_parser import EventParser
+from src.queries import database_queries
+
+
+def legacy_extract(data):
+    """
+    O dicionário que EventParser.extract_event_data devolvia antes do ParsedEvent.
+    """
+    location = data.get('location', {})
+    offers = data.get('offers', {})
+    if not all([data.get('name'), data.get('@type'), data.get('startDate')]):
+        return None
+    return {
+        'name': data.get('name'),
+        'type': data.get('@type'),
+        'description': data.get('description'),
+        'start_date': data.get('startDate'),
+        'end_date': data.get('endDate'),
+        'location': location.get('name'),
+        'address': location.get('address'),
+        'image': data.get('image'),
+        'url': data.get('url'),
+        'price': offers.get('price'),
+        'price_currency': offers.get('priceCurrency'),
+        'availability': offers.get('availability'),
+    }
+
+
+def parse_corpus(size, extract):
+    parser = EventParser()
+    events = []
+    for html in make_corpus_pages(size):
+        for script in parser.extract_jsonld_scripts(html):
+            data = json.loads(script)
+            for item in data if isinstance(data, list) else [data]:
+                if item.get('@type') == 'Event':
+                    event = extract(item)
+                    if event:
+                        events.append(event)
+    return events
+
+
+def legacy_event_rows():
+    """
+    As linhas de get_all_events() como dicionários, como eram montadas antes do EventRow.
+    """
+    query = (EventData
+             .select(Event.name, Event.type, Event.description, EventData.date, EventData.location)
+             .join(Event)
+             .order_by(Event.name, EventData.date)
+             .tuples())
+    return [
+        {'Nome': name, 'Tipo': event_type, 'Descrição': description,
+         'Data': date.strftime('%Y-%m-%d'), 'Localização': location}
+        for name, event_type, description, date, location in query
+    ]
+
+
+def measure(build):
+    """
+    Retorna (resultado, segundos, bytes retidos, bytes no pico).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def report(stage, variants):
+    baseline = None
+    for label, build in variants:
+        result, elapsed, retained, peak = measure(build)
+        count = len(result)
+        del result
+        baseline = baseline or retained
+        print(f"{stage:>9} {label:>12} {count:>8} {elapsed:>10.2f} {retained / 2 ** 20:>12.1f} "
+              f"{peak / 2 ** 20:>10.1f} {retained / max(count, 1):>12.0f} {retained / baseline:>8.0%}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--size', type=int, default=100000)
+    arg_parser.add_argument('--skip-queries', action='store_true', help="Só a etapa de parse (sem carregar o banco)")
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    parser = EventParser()
+    print(f"{'etapa':>9} {'registro':>12} {'linhas':>8} {'tempo (s)':>10} {'retido (MB)':>12} "
+          f"{'pico (MB)':>10} {'bytes/linha':>12} {'relativo':>8}")
+    report('parse', [
+        ('dict', lambda: parse_corpus(args.size, legacy_extract)),
+        ('ParsedEvent', lambda: parse_corpus(args.size, parser.extract_event_data)),
+    ])
+    if args.skip_queries:
+        return
+
+    load_database(args.size)
+    report('consulta', [
+        ('dict', legacy_event_rows),
+        ('EventRow', database_queries.get_all_events),
+    ])
+
+
+if __name__ == '__main__':
+    main()
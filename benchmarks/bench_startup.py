@@ -0,0 +1,161 @@
+# benchmarks/bench_startup.py
+"""
+Mede a inicialização dos pontos de entrada em processos novos, com
+`python -X importtime`: o tempo de parede do processo inteiro e o tempo
+gasto em imports, sem contar a inicialização do interpretador (site).
+
+Cada ponto de entrada tem um orçamento de imports (BUDGETS_MS) e uma lista
+de módulos pesados que não pode importar (FORBIDDEN): `--help` e o menu
+não carregam o scraper, o peewee nem as configurações; uma consulta não
+carrega requests, aiohttp nem bs4. Com --check, sai com código 1 se algum
+ponto de entrada estourar o orçamento ou importar um módulo proibido.
+Os resultados também entram no relatório de benchmarks/suite.py.
+
+Uso: python -m benchmarks.bench_startup [--repeat 5] [--check]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Argumentos do interpretador de cada ponto de entrada. O menu é medido até
+# ser montado, sem esperar pela entrada do usuário.
+ENTRY_POINTS = {
+    'help': ['-m', 'src.main', '--help'],
+    'menu': ['-c', 'from src.menu.menu import create_menu; create_menu()'],
+    'query': ['-m', 'src.main', 'query', 'upcoming', '--json'],
+    'stats': ['-m', 'src.main', 'stats', '--json'],
+    'scraper': ['-c', 'import src.scraper'],
+}
+
+# Orçamento do tempo de imports de cada ponto de entrada, em milissegundos.
+BUDGETS_MS = {
+    'help': 60,
+    'menu': 60,
+    'query': 450,
+    'stats': 450,
+    'scraper': 600,
+}
+
+HEAVY_MODULES = ('requests', 'aiohttp', 'bs4', 'peewee', 'pydantic_settings')
+SCRAPER_MODULES = ('requests', 'aiohttp', 'bs4')
+FORBIDDEN = {
+    'help': HEAVY_MODULES,
+    'menu': HEAVY_MODULES,
+    'query': SCRAPER_MODULES,
+    'stats': SCRAPER_MODULES,
+}
+
+
+def parse_importtime(output):
+    """
+    Lê a saída de -X importtime. Retorna (tempo de imports em segundos,
+    {módulo de primeiro nível: segundos}, conjunto de todos os módulos).
+    A inicialização do interpretador (tudo até o site, inclusive) fica de fora.
+    """
+    top_level = {}
+    modules = set()
+    started = False
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # cabeçalho
+        module = name.strip()
+        modules.add(module)
+        if not name[1:].startswith(' '):
+            if started:
+                top_level[module] = top_level.get(module, 0) + int(cumulative) / 1e6
+            started = started or module == 'site'
+    return sum(top_level.values()), top_level, modules
+
+
+def run_entry_point(args, env):
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=ROOT, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    return time.perf_counter() - start, process.stderr
+
+
+def measure_startup(repeat=5):
+    """
+    Executa cada ponto de entrada `repeat` vezes (vale a melhor). Retorna
+    ({métrica: valor}, {ponto de entrada: (maiores imports, módulos proibidos importados)}).
+    """
+    from src.db.init_db import initialize_db
+
+    # As consultas rodam contra o banco temporário dos benchmarks, já com as tabelas criadas.
+    initialize_db()
+    env = dict(os.environ)
+    env['SCRAPER_LOG'] = os.path.join(tempfile.mkdtemp(prefix='event_scraper_startup_'), 'startup.log')
+
+    results = {}
+    details = {}
+    for name, args in ENTRY_POINTS.items():
+        best_wall = best_import = None
+        for _ in range(repeat):
+            wall, output = run_entry_point(args, env)
+            import_seconds, run_top_level, modules = parse_importtime(output)
+            best_wall = wall if best_wall is None else min(best_wall, wall)
+            if best_import is None or import_seconds < best_import:
+                best_import, top_level = import_seconds, run_top_level
+        largest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:3]
+        forbidden = sorted(module for module in FORBIDDEN.get(name, ()) if module in modules)
+        results[f'startup_{name}_wall_seconds'] = best_wall
+        results[f'startup_{name}_import_seconds'] = best_import
+        details[name] = (largest, forbidden)
+    return results, details
+
+
+def check_budgets(results, details=None):
+    """
+    Retorna a lista de problemas: pontos de entrada acima do orçamento e
+    módulos proibidos importados.
+    """
+    problems = []
+    for name, budget in BUDGETS_MS.items():
+        value = results.get(f'startup_{name}_import_seconds')
+        if value is not None and value * 1000 > budget:
+            problems.append(f"{name}: imports em {value * 1000:.0f} ms, orçamento de {budget} ms")
+    for name, (_, forbidden) in (details or {}).items():
+        if forbidden:
+            problems.append(f"{name}: importa {', '.join(forbidden)}")
+    return problems
+
+
+def print_report(results, details):
+    print(f"{'entrada':>8} {'parede (ms)':>12} {'imports (ms)':>13} {'orçamento':>10}  maiores imports")
+    for name in ENTRY_POINTS:
+        largest, forbidden = details[name]
+        wall = results[f'startup_{name}_wall_seconds'] * 1000
+        imports = results[f'startup_{name}_import_seconds'] * 1000
+        top = ', '.join(f"{module} {seconds * 1000:.0f}" for module, seconds in largest)
+        flag = f"  IMPORTA {', '.join(forbidden)}" if forbidden else ''
+        print(f"{name:>8} {wall:>12.0f} {imports:>13.0f} {BUDGETS_MS[name]:>10}  {top}{flag}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Execuções de cada ponto de entrada (vale a melhor)")
+    arg_parser.add_argument('--check', action='store_true', help="Sai com código 1 se algum orçamento estourar")
+    args = arg_parser.parse_args()
+
+    results, details = measure_startup(args.repeat)
+    print_report(results, details)
+    problems = check_budgets(results, details)
+    for problem in problems:
+        print(f"ACIMA DO ORÇAMENTO: {problem}")
+    if args.check and problems:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_throttle.py
+"""
+Testa o controle de tráfego do AsyncEventCrawler (token bucket, concorrência
+adaptativa AIMD e novas tentativas com backoff) contra o servidor stub
+configurado para recusar com 429 + Retry-After tudo o que passar de
+`--server-concurrency` requisições simultâneas ou `--server-rate` por segundo.
+
+Compara o crawler sem controle (sem novas tentativas, sem limite de taxa)
+com o controle ligado, e termina com erro se o controle ligado perder
+alguma página.
+
+Uso: python -m benchmarks.bench_throttle [--windows 60] [--concurrency 16]
+     [--server-concurrency 4] [--server-rate 40] [--retry-after 1]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.stub_server import StubServer
+from src.crawlers.async_event_crawler import AsyncEventCrawler
+from src.crawlers.throttle import CrawlerThrottle
+from src.utils.metrics import metrics, FETCH_REQUESTS, FETCH_RETRIES
+
+ACTION = 'mec_grid_load_more'
+
+
+def make_windows(count):
+    first = datetime(2024, 12, 1)
+    return [((first + timedelta(days=i)).strftime('%Y-%m-%d'), 0) for i in range(count)]
+
+
+async def crawl(url, windows, throttle):
+    fetched = failed = 0
+    async with AsyncEventCrawler(url, concurrency=throttle.limit.maximum, throttle=throttle) as crawler:
+        async for _, _, response_json in crawler.fetch_windows(ACTION, windows):
+            if response_json:
+                fetched += 1
+            else:
+                failed += 1
+    return fetched, failed
+
+
+def run(label, args, throttle):
+    metrics.reset()
+    windows = make_windows(args.windows)
+    with StubServer(latency=args.latency, max_concurrent=args.server_concurrency,
+                    rate_limit=args.server_rate, retry_after=args.retry_after) as server:
+        start = time.perf_counter()
+        fetched, failed = asyncio.run(crawl(server.url, windows, throttle))
+        elapsed = time.perf_counter() - start
+        throttled = server.throttled_count
+        max_in_flight = server.max_in_flight
+
+    requests = FETCH_REQUESTS.total()
+    errors = FETCH_REQUESTS.value(result='throttled') + FETCH_REQUESTS.value(result='error')
+    print(
+        f"{label:>14} {elapsed:>8.2f} {fetched:>6} {failed:>6} {throttled:>6} {FETCH_RETRIES.total():>8} "
+        f"{requests / elapsed:>8.1f} {errors / requests if requests else 0:>8.1%} "
+        f"{max_in_flight:>6} {throttle.limit.current:>6}"
+    )
+    return failed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--windows', type=int, default=60)
+    arg_parser.add_argument('--latency', type=float, default=0.05)
+    arg_parser.add_argument('--concurrency', type=int, default=16, help="Concorrência máxima do crawler")
+    arg_parser.add_argument('--rate', type=float, default=0, help="Limite de taxa do crawler (0 = sem limite)")
+    arg_parser.add_argument('--server-concurrency', type=int, default=4)
+    arg_parser.add_argument('--server-rate', type=float, default=40)
+    arg_parser.add_argument('--retry-after', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    print(f"Janelas: {args.windows} | servidor: {args.server_concurrency} simultâneas, "
+          f"{args.server_rate:g} req/s, Retry-After {args.retry_after}s")
+    print(f"{'crawler':>14} {'tempo (s)':>8} {'ok':>6} {'falhas':>6} {'429':>6} {'retries':>8} "
+          f"{'req/s':>8} {'erros':>8} {'pico':>6} {'limite':>6}")
+
+    run('sem controle', args, CrawlerThrottle(concurrency=args.concurrency, rate=0, min_concurrency=args.concurrency,
+                                           max_retries=0, latency_target=0))
+    failed = run('adaptativo', args, CrawlerThrottle(concurrency=args.concurrency, rate=args.rate))
+    if failed:
+        raise SystemExit(f"O controle adaptativo perdeu {failed} páginas.")
+
+
+if __name__ == '__main__':
+    main()
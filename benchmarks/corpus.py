@@ -0,0 +1,149 @@
+# benchmarks/corpus.py
+"""
+Gerador de páginas sintéticas no formato da grade do Modern Events Calendar (MEC),
+com um bloco JSON-LD `Event` por evento.
+"""
+
+import json
+import zlib
+from datetime import datetime, timedelta
+
+
+DEFAULT_BASE_DATE = datetime(2024, 12, 1)
+
+# Bairros e cidades sorteados de forma determinística, para que as consultas
+# por localização tenham acertos e erros realistas.
+PLACES = (
+    ('Copacabana', 'Rio de Janeiro', 'RJ'),
+    ('Botafogo', 'Rio de Janeiro', 'RJ'),
+    ('Barra da Tijuca', 'Rio de Janeiro', 'RJ'),
+    ('Centro', 'Rio de Janeiro', 'RJ'),
+    ('Lapa', 'Rio de Janeiro', 'RJ'),
+    ('Icaraí', 'Niterói', 'RJ'),
+    ('Pinheiros', 'São Paulo', 'SP'),
+)
+EVENT_KINDS = ('Teatro', 'Show', 'Exposição', 'Feira', 'Festival', 'Stand-up')
+AVAILABILITY = ('https://schema.org/InStock', 'https://schema.org/SoldOut', 'https://schema.org/PreOrder')
+
+
+def make_event(index, start_date=None, base_date=None):
+    """
+    Monta um objeto JSON-LD do tipo 'Event' com os campos lidos pelo EventParser.
+
+    A variação segue o que aparece nos sites MEC: um em cada cinco endereços
+    vem como `PostalAddress` aninhado, alguns endereços em texto vêm sem a UF
+    ("Bairro, Cidade" ou só a cidade), um em cada sete eventos não tem
+    `offers` e os locais se espalham por bairros do Rio e por outras cidades.
+    """
+    start = start_date or (base_date or DEFAULT_BASE_DATE) + timedelta(days=index % 90)
+    neighborhood, city, state = PLACES[index % len(PLACES)]
+    kind = EVENT_KINDS[index % len(EVENT_KINDS)]
+    street = f'Rua Exemplo, {index % 500}'
+
+    if index % 5 == 0:
+        address = {
+            '@type': 'PostalAddress',
+            'streetAddress': street,
+            'addressLocality': city,
+            'addressRegion': state,
+            'postalCode': f'{22000 + index % 999:05d}-000',
+            'addressCountry': 'BR',
+        }
+    elif index % 11 == 0:
+        address = f'{neighborhood}, {city}'
+    elif index % 13 == 0:
+        address = city
+    else:
+        address = f'{street} - {neighborhood}, {city} - {state}'
+
+    event = {
+        '@context': 'http://schema.org',
+        '@type': 'Event',
+        'name': f'{kind} Sintético {index}',
+        'description': f'Descrição do evento sintético número {index}. ' * (1 + index % 4),
+        'startDate': start.strftime('%Y-%m-%d'),
+        'endDate': (start + timedelta(days=1 + index % 3)).strftime('%Y-%m-%d'),
+        'location': {
+            '@type': 'Place',
+            'name': f'{kind} {neighborhood} {index % 50}',
+            'address': address,
+        },
+        'image': f'https://example.com/wp-content/uploads/evento-{index}.jpg',
+        'url': f'https://example.com/events/evento-{index}/',
+    }
+    if index % 7:
+        event['offers'] = {
+            'price': str(index % 120),
+            'priceCurrency': 'BRL',
+            'availability': AVAILABILITY[index % len(AVAILABILITY)],
+        }
+    return event
+
+
+def make_corpus_pages(total_events, page_size=12, base_date=None):
+    """
+    Gera as páginas da grade MEC (HTML) para `total_events` eventos, `page_size`
+    por página, sem manter o corpus inteiro em memória.
+    """
+    for first in range(0, total_events, page_size):
+        count = min(page_size, total_events - first)
+        yield make_grid_html([make_event(first + i, base_date=base_date) for i in range(count)])
+
+
+def make_grid_html(events):
+    """
+    Renderiza uma lista de eventos JSON-LD como um trecho de grade MEC, com a
+    marcação que acompanha cada card (imagem, data, local, preço e botão).
+    """
+    articles = []
+    for event in events:
+        event_id = zlib.crc32(event['url'].encode('utf-8')) % 100000
+        articles.append(
+            '<div class="col-md-4 col-sm-4">'
+            f'<article data-style="" class="mec-event-article mec-clear mec-divider-toggle mec-toggle-{event_id}" itemscope>'
+            '<div class="mec-event-image">'
+            f'<a data-event-id="{event_id}" href="{event["url"]}" target="_self" rel="noopener">'
+            f'<img width="300" height="300" src="{event["image"]}" class="attachment-thumblist size-thumblist wp-post-image" '
+            f'alt="{event["name"]}" decoding="async" loading="lazy" /></a></div>'
+            '<div class="mec-event-content">'
+            '<div class="mec-event-date mec-color"><i class="mec-sl-calendar"></i> '
+            f'<span class="mec-start-date-label">{event["startDate"]}</span></div>'
+            f'<h4 class="mec-event-title"><a class="mec-color-hover" data-event-id="{event_id}" '
+            f'href="{event["url"]}" target="_self" rel="noopener">{event["name"]}</a></h4>'
+            '<div class="mec-event-detail"><div class="mec-event-loc-place">'
+            f'{event["location"]["name"]}</div></div>'
+            '<!-- mec price -->'
+            f'<div class="mec-price-details"><i class="mec-sl-wallet"></i><span>R$ {event.get("offers", {}).get("price", 0)},00</span></div>'
+            f'<p class="mec-grid-event-excerpt">{event["description"]}</p>'
+            '</div>'
+            '<div class="mec-event-footer">'
+            f'<a class="mec-booking-button" data-event-id="{event_id}" href="{event["url"]}" target="_self" '
+            'rel="noopener">Comprar Ingressos</a></div>'
+            f'<script type="application/ld+json">{json.dumps(event, ensure_ascii=False)}</script>'
+            '</article></div>'
+        )
+    return (
+        '<div class="mec-wrap mec-skin-grid-container"><div class="mec-event-grid-classic">'
+        '<div class="row">' + ''.join(articles) + '</div></div></div>'
+        '<script type="text/javascript">jQuery(document).ready(function(){ mecGridViewLoadMore(); });</script>'
+    )
+
+
+def make_page_html(events):
+    """
+    Envolve a grade em uma página WordPress completa, como a página inicial.
+    """
+    head = (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="UTF-8" />'
+        '<title>Agenda Cultural Rio de Janeiro</title>'
+        + ''.join(
+            f'<link rel="stylesheet" id="style-{i}-css" href="https://example.com/wp-content/style-{i}.css" media="all" />'
+            for i in range(20)
+        )
+        + '<script type="application/ld+json">{"@context":"https://schema.org","@type":"WebSite",'
+        '"name":"Agenda Cultural","url":"https://example.com/"}</script>'
+        '<script type="text/javascript">var mecdata = {"ajax_url":"https://example.com/wp-admin/admin-ajax.php"};</script>'
+        '</head>'
+    )
+    nav = '<nav><ul>' + ''.join(f'<li class="menu-item"><a href="/categoria-{i}/">Categoria {i}</a></li>' for i in range(30)) + '</ul></nav>'
+    return f'{head}<body class="home page-template">{nav}<main>{make_grid_html(events)}</main><footer>Rodapé</footer></body></html>'
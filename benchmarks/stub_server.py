@@ -0,0 +1,164 @@
+# benchmarks/stub_server.py
+"""
+Servidor HTTP local que imita a página inicial e o endpoint `admin-ajax.php`
+de um site WordPress com Modern Events Calendar.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from benchmarks.corpus import make_event, make_grid_html, make_page_html
+
+
+class StubServer:
+    """
+    Sobe o servidor em uma thread de fundo. Cada requisição espera `latency`
+    segundos antes de responder, simulando a latência da rede e do WordPress.
+    Cada janela de data tem `pages_per_window` páginas de `page_size` eventos.
+    As respostas trazem ETag e respeitam If-None-Match com 304.
+
+    Para simular um WordPress que se protege de sobrecarga, `max_concurrent`
+    e `rate_limit` (requisições por segundo, com rajada de até `rate_limit`)
+    fazem o servidor recusar o excesso com `throttle_status` (429 por padrão)
+    e o cabeçalho Retry-After de `retry_after` segundos (None omite o cabeçalho).
+    """
+
+    def __init__(self, latency=0.1, page_size=12, pages_per_window=1,
+                 max_concurrent=None, rate_limit=None, retry_after=1, throttle_status=429):
+        self.latency = latency
+        self.page_size = page_size
+        self.pages_per_window = pages_per_window
+        self.max_concurrent = max_concurrent
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.throttle_status = throttle_status
+        self.request_count = 0
+        self.throttled_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._tokens = rate_limit or 0
+        self._tokens_updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def admit(self):
+        """
+        Decide se a requisição é atendida ou recusada por excesso de
+        concorrência ou de taxa. Requisições atendidas contam em `in_flight`
+        até release().
+        """
+        with self._lock:
+            self.request_count += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._tokens_updated) * self.rate_limit)
+                self._tokens_updated = now
+            over_rate = self.rate_limit and self._tokens < 1
+            over_concurrency = self.max_concurrent and self.in_flight >= self.max_concurrent
+            if over_rate or over_concurrency:
+                self.throttled_count += 1
+                return False
+            if self.rate_limit:
+                self._tokens -= 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def window_page(self, start_date, offset):
+        """
+        Monta a resposta JSON do MEC para uma janela de data e um offset.
+        """
+        total = self.page_size * self.pages_per_window
+        if offset >= total:
+            return {'html': '', 'count': 0, 'offset': offset, 'has_more_event': 0}
+
+        seed = sum(ord(c) for c in start_date) * 1000
+        count = min(self.page_size, total - offset)
+        events = [make_event(seed + offset + i) for i in range(count)]
+        next_offset = offset + count
+        return {
+            'html': make_grid_html(events),
+            'count': count,
+            'offset': next_offset,
+            'has_more_event': int(next_offset < total),
+        }
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body, content_type):
+                payload = body.encode('utf-8')
+                etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _throttle(self):
+                self.send_response(stub.throttle_status)
+                if stub.retry_after is not None:
+                    self.send_header('Retry-After', str(stub.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def _handle(self, respond):
+                if not stub.admit():
+                    self._throttle()
+                    return
+                try:
+                    time.sleep(stub.latency)
+                    respond()
+                finally:
+                    stub.release()
+
+            def do_GET(self):
+                def respond():
+                    events = [make_event(i) for i in range(stub.page_size)]
+                    self._send(make_page_html(events), 'text/html; charset=utf-8')
+                self._handle(respond)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                start_date = form.get('mec_start_date', [''])[0]
+                offset = int(form.get('mec_offset', ['0'])[0])
+                self._handle(lambda: self._send(json.dumps(stub.window_page(start_date, offset)), 'application/json'))
+
+        return Handler
@@ -0,0 +1,280 @@
+# benchmarks/suite.py
+"""
+Suíte de benchmarks do Event Scraper sobre um corpus sintético da grade MEC.
+
+Para cada tamanho (1k, 10k e 100k eventos por padrão) mede:
+- EventParser.parse_events_from_html sobre todas as páginas do corpus;
+- DatabasePipeline.process_events gravando página a página em tabelas vazias;
+- cada função de src/queries/database_queries.py sobre o banco resultante;
+- o custo do logging em parse + gravação: desligado, com um FileHandler
+  síncrono no logger raiz e com o QueueHandler de src/utils/log_config.py.
+
+Antes dos tamanhos, mede a inicialização dos pontos de entrada
+(benchmarks/bench_startup.py, seção "startup" do relatório); --compare
+também marca os pontos de entrada acima do orçamento de imports.
+
+Os resultados são gravados em JSON (com o commit atual) para comparar
+regressões entre commits:
+
+    python -m benchmarks.suite --output benchmarks/results/antes.json
+    python -m benchmarks.suite --output benchmarks/results/depois.json
+    python -m benchmarks.suite --compare benchmarks/results/antes.json benchmarks/results/depois.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_startup import check_budgets, measure_startup
+from benchmarks.corpus import make_corpus_pages
+from src.db.database import database
+from src.db.init_db import initialize_db
+from src.db.models import Event, Venue, EventData, Metadata, EventDetails, CrawlWindow, CrawlPage, EventSearch
+from src.parsers.event_parser import EventParser
+from src.pipelines.database_pipeline import DatabasePipeline
+from src.queries import database_queries
+from src.utils.log_config import LOG_FORMAT, setup_logging, stop_logging
+
+QUERY_FUNCTIONS = (
+    'get_all_events',
+    'get_upcoming_events',
+    'get_events_in_rio',
+    'get_outdoor_events',
+    'get_metadata_per_event',
+)
+
+# Termos usados para medir a busca textual (search_events).
+SEARCH_TERMS = ('festival', 'teatro copacabana')
+
+# Páginas do corpus usadas para medir o custo do logging.
+LOGGING_PAGES = 100
+
+# Variação relativa acima da qual --compare marca uma métrica como regressão.
+REGRESSION_THRESHOLD = 0.10
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_database():
+    with database:
+        database.drop_tables([EventSearch, CrawlWindow, CrawlPage, EventDetails, Metadata, EventData, Venue, Event], safe=True)
+    initialize_db()
+
+
+def best_of(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def parse_and_write(pages):
+    """
+    Parse e gravação página a página em tabelas vazias. Retorna a duração.
+    """
+    reset_database()
+    parser = EventParser()
+    pipeline = DatabasePipeline()
+    start = time.perf_counter()
+    for html in pages:
+        pipeline.process_events(parser.parse_events_from_html(html))
+    return time.perf_counter() - start
+
+
+def bench_logging(pages, repeat):
+    """
+    Mede parse + gravação de `pages` com o logging desligado, com um
+    FileHandler síncrono direto no logger raiz e com a fila de
+    setup_logging(), em INFO e em DEBUG (que inclui as linhas por evento).
+    Retorna {métrica: valor}.
+    """
+    root = logging.getLogger()
+    level = root.level
+    log_file = os.path.join(tempfile.mkdtemp(prefix='event_scraper_log_'), 'bench.log')
+
+    def direct(level):
+        handler = logging.FileHandler(log_file, encoding='utf-8')
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(level)
+        try:
+            return parse_and_write(pages)
+        finally:
+            root.removeHandler(handler)
+            handler.close()
+
+    def queued(level):
+        setup_logging(level=level, log_file=log_file, console=False)
+        try:
+            return parse_and_write(pages)
+        finally:
+            stop_logging()
+
+    results = {'logging_disabled_seconds': min(parse_and_write(pages) for _ in range(repeat))}
+    logging.disable(logging.NOTSET)
+    try:
+        for name, log_level in (('info', logging.INFO), ('debug', logging.DEBUG)):
+            results[f'logging_{name}_direct_seconds'] = min(direct(log_level) for _ in range(repeat))
+            results[f'logging_{name}_queue_seconds'] = min(queued(log_level) for _ in range(repeat))
+            results[f'logging_{name}_queue_overhead'] = (
+                results[f'logging_{name}_queue_seconds'] / results['logging_disabled_seconds'] - 1)
+    finally:
+        logging.disable(logging.INFO)
+        root.setLevel(level)
+    return results
+
+
+def bench_size(size, page_size, repeat):
+    """
+    Executa parse, gravação e consultas para um corpus de `size` eventos.
+    Retorna um dicionário {métrica: valor}.
+    """
+    parser = EventParser()
+    pipeline = DatabasePipeline()
+    base_date = datetime.today()
+    results = {}
+
+    pages = list(make_corpus_pages(size, page_size, base_date=base_date))
+    results['corpus_mb'] = round(sum(len(html) for html in pages) / 1024 / 1024, 2)
+
+    start = time.perf_counter()
+    parsed_pages = [parser.parse_events_from_html(html) for html in pages]
+    elapsed = time.perf_counter() - start
+    events = sum(len(page) for page in parsed_pages)
+    results['parse_seconds'] = elapsed
+    results['parse_events_per_second'] = events / elapsed
+    results.update(bench_logging(pages[:LOGGING_PAGES], repeat))
+    del pages
+
+    reset_database()
+    start = time.perf_counter()
+    for page in parsed_pages:
+        pipeline.process_events(page)
+    elapsed = time.perf_counter() - start
+    rows = sum(model.select().count() for model in (Event, EventData, EventDetails, Metadata))
+    results['pipeline_seconds'] = elapsed
+    results['pipeline_rows'] = rows
+    results['pipeline_rows_per_second'] = rows / elapsed
+    del parsed_pages
+
+    for name in QUERY_FUNCTIONS:
+        query_function = getattr(database_queries, name)
+        elapsed, result = best_of(query_function, repeat)
+        results[f'query_{name}_seconds'] = elapsed
+        results[f'query_{name}_rows'] = len(result)
+
+    for term in SEARCH_TERMS:
+        elapsed, result = best_of(lambda: database_queries.search_events(term, limit=None), repeat)
+        metric = term.replace(' ', '_')
+        results[f'query_search_{metric}_seconds'] = elapsed
+        results[f'query_search_{metric}_rows'] = len(result)
+
+    return results
+
+
+def run_suite(sizes, page_size, repeat):
+    logging.disable(logging.INFO)
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'page_size': page_size,
+        'results': {},
+    }
+    print("--- startup ---")
+    startup, details = measure_startup(repeat)
+    for metric, value in startup.items():
+        print(f"  {metric:<45} {value:>14.4f}")
+    for problem in check_budgets(startup, details):
+        print(f"  ACIMA DO ORÇAMENTO: {problem}")
+    report['results']['startup'] = startup
+    for size in sizes:
+        print(f"--- {size} eventos ---")
+        results = bench_size(size, page_size, repeat)
+        for metric, value in results.items():
+            print(f"  {metric:<45} {value:>14.4f}" if isinstance(value, float) else f"  {metric:<45} {value:>14}")
+        report['results'][str(size)] = results
+    return report
+
+
+def is_higher_better(metric):
+    return metric.endswith('_per_second')
+
+
+def compare(before_path, after_path):
+    """
+    Compara dois relatórios JSON e marca as métricas de tempo/vazão que
+    pioraram mais que REGRESSION_THRESHOLD e os pontos de entrada acima do
+    orçamento de inicialização. Retorna o número de regressões.
+    """
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+
+    print(f"Antes: {before.get('commit')} ({before.get('timestamp')})")
+    print(f"Depois: {after.get('commit')} ({after.get('timestamp')})")
+    regressions = 0
+    for size, after_results in after['results'].items():
+        before_results = before['results'].get(size)
+        if not before_results:
+            continue
+        print(f"--- {size} eventos ---" if size.isdigit() else f"--- {size} ---")
+        for metric, new in after_results.items():
+            old = before_results.get(metric)
+            if not (metric.endswith('_seconds') or is_higher_better(metric)) or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if is_higher_better(metric) else change
+            flag = 'REGRESSÃO' if worse > REGRESSION_THRESHOLD else ''
+            regressions += bool(flag)
+            print(f"  {metric:<45} {old:>12.4f} -> {new:>12.4f} ({change:+.1%}) {flag}")
+    for problem in check_budgets(after['results'].get('startup', {})):
+        print(f"ACIMA DO ORÇAMENTO: {problem}")
+        regressions += 1
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--page-size', type=int, default=12)
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Execuções de cada consulta (vale a melhor)")
+    arg_parser.add_argument('--output', help="Arquivo JSON de saída (padrão: benchmarks/results/<commit>-<data>.json)")
+    arg_parser.add_argument('--compare', nargs=2, metavar=('ANTES', 'DEPOIS'))
+    args = arg_parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(1 if compare(*args.compare) else 0)
+
+    report = run_suite(args.sizes, args.page_size, args.repeat)
+    output = args.output or os.path.join(
+        'benchmarks', 'results',
+        f"{report['commit'] or 'sem-commit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json",
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Linha de comando não interativa, para cron, systemd e scripts. Sem argumentos,
+`python -m src.main` continua abrindo o menu interativo.
+
+    python -m src.main scrape [--full]
+    python -m src.main daemon [--interval MINUTOS] [--full] [--runs N]
+    python -m src.main query {all,upcoming,rio,outdoor,metadata,search} [TEXTO] [--json] [--limit N]
+    python -m src.main export [--format {ndjson,parquet,arrow}] [--output ARQUIVO] [--compression C] [--incremental]
+    python -m src.main stats [--json]
+    python -m src.main menu
+
+O código de saída é 0 em caso de sucesso e 1 se o scraping falhou ou foi
+pulado porque outra execução estava em andamento.
+"""
+import argparse
+import json
+import sys
+from src.export.writers import FORMATS
+from src.utils.log_config import setup_logging
+
+# Cada subcomando importa o que usa dentro do próprio handler: `--help`, um
+# erro de argumento ou uma consulta não carregam o scraper (requests, aiohttp,
+# bs4), e as configurações só são lidas depois que os argumentos são validados.
+
+QUERIES = ('all', 'upcoming', 'rio', 'outdoor', 'metadata', 'search')
+
+
+def write_json_lines(rows, output):
+    """
+    Escreve uma linha JSON por registro, à medida que os registros chegam.
+    """
+    total = 0
+    for row in rows:
+        output.write(json.dumps(row, ensure_ascii=False, default=str))
+        output.write('\n')
+        total += 1
+    return total
+
+
+def iter_query_pages(args):
+    """
+    Blocos de linhas da consulta escolhida, no mesmo formato usado pelo menu.
+    """
+    from src.queries import database_queries as queries
+
+    if args.query == 'all':
+        return queries.iter_all_events()
+    if args.query == 'upcoming':
+        return [queries.get_upcoming_events(limit=args.limit or 2)]
+    if args.query == 'rio':
+        return queries.iter_events_in_rio()
+    if args.query == 'outdoor':
+        return queries.iter_outdoor_events()
+    if args.query == 'metadata':
+        return ([{'Evento': name, 'Metadados': metas} for name, metas in page]
+                for page in queries.iter_metadata_per_event())
+    return [queries.search_events(args.text, limit=args.limit or 50)]
+
+
+def command_scrape(args):
+    from src.scraper import scraper
+    return 0 if scraper(full_recrawl=True if args.full else None) else 1
+
+
+def command_daemon(args):
+    from src.config import settings
+    from src.daemon import ScraperDaemon
+
+    interval = settings.daemon_interval_minutes if args.interval is None else args.interval
+    daemon = ScraperDaemon(interval_minutes=interval, full_recrawl=True if args.full else None,
+                           max_runs=args.runs)
+    failures = daemon.run()
+    return 1 if args.runs and failures else 0
+
+
+def command_query(args):
+    if args.query == 'search' and not args.text:
+        print("Informe o texto da busca.", file=sys.stderr)
+        return 2
+    pages = iter_query_pages(args)
+    if args.json:
+        write_json_lines((dict(row) for page in pages for row in page), sys.stdout)
+        return 0
+
+    from src.menu.menu import print_event_pages
+    if args.query != 'metadata':
+        print_event_pages(pages, f"Consulta {args.query}", "Nenhum evento encontrado.")
+        return 0
+    total = 0
+    for page in pages:
+        for row in page:
+            print(f"Evento: {row['Evento']}")
+            for key, value in row['Metadados'].items():
+                print(f"  {key}: {value}")
+            print("---------------------------")
+        total += len(page)
+    if not total:
+        print("Nenhum metadado encontrado.")
+    return 0
+
+
+def command_export(args):
+    from src.config import settings
+    from src.db.init_db import initialize_db
+    from src.export.event_export import EventExporter
+    from src.export.writers import DEFAULT_COMPRESSION
+
+    initialize_db()
+    compression = DEFAULT_COMPRESSION if args.compression is None else (
+        None if args.compression == 'none' else args.compression)
+    output = args.output if args.output is not None or args.format != 'ndjson' else '-'
+    try:
+        run = EventExporter(chunk_size=args.chunk_size or settings.export_chunk_size).export(
+            output, format=args.format, compression=compression, incremental=args.incremental, name=args.name)
+    except (ValueError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    if run is None:
+        return 1
+    if run.path != '-':
+        print(run.path)
+    return 0
+
+
+def command_stats(args):
+    from src.queries.database_queries import get_database_stats
+
+    stats = get_database_stats()
+    if not stats:
+        return 1
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, default=str, indent=2))
+        return 0
+
+    print("Linhas por tabela:")
+    for table, count in stats['tables'].items():
+        print(f"  {table}: {count}")
+    for label, key in (("Última execução", 'last_run'), ("Última execução com sucesso", 'last_success')):
+        run = stats[key]
+        if run is None:
+            print(f"{label}: nenhuma")
+            continue
+        print(f"{label}: #{run['id']} em {run['started_at']} ({run['crawler_mode']}, "
+              f"{'completa' if run['full_recrawl'] else 'incremental'}), "
+              f"{'sucesso' if run['success'] else 'sem sucesso'}, {run['duration']}s, "
+              f"{run['requests']} requisições, {run['events_parsed']} eventos extraídos, "
+              f"{run['events_inserted']} inseridos, {run['events_updated']} atualizados")
+    if stats['crawl_jobs']:
+        print("Fila de trabalho: " + ", ".join(f"{status} {count}" for status, count in sorted(stats['crawl_jobs'].items())))
+    return 0
+
+
+def command_menu(args):
+    from src.menu.menu import create_menu
+    create_menu().display()
+    return 0
+
+
+def build_parser():
+    arg_parser = argparse.ArgumentParser(prog='python -m src.main', description=__doc__,
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    scrape = commands.add_parser('scrape', help="Executa o scraper uma vez")
+    scrape.add_argument('--full', action='store_true', help="Re-crawl completo, ignorando o modo incremental")
+    scrape.set_defaults(handler=command_scrape, console=True)
+
+    daemon = commands.add_parser('daemon', help="Executa o scraper periodicamente até receber SIGTERM/SIGINT")
+    daemon.add_argument('--interval', type=float,
+                        help="Minutos entre o início de duas execuções (padrão: DAEMON_INTERVAL_MINUTES)")
+    daemon.add_argument('--full', action='store_true', help="Re-crawl completo em todas as execuções")
+    daemon.add_argument('--runs', type=int, help="Encerra depois de N execuções")
+    daemon.set_defaults(handler=command_daemon, console=True)
+
+    query = commands.add_parser('query', help="Executa uma das consultas do menu")
+    query.add_argument('query', choices=QUERIES)
+    query.add_argument('text', nargs='?', help="Texto da busca (consulta search)")
+    query.add_argument('--limit', type=int, help="Máximo de resultados (upcoming e search)")
+    query.add_argument('--json', action='store_true', help="Uma linha JSON por resultado")
+    query.set_defaults(handler=command_query, console=False)
+
+    export = commands.add_parser('export', help="Exporta os eventos em NDJSON, Parquet ou Arrow, em streaming")
+    export.add_argument('--format', '-f', choices=FORMATS, default='ndjson')
+    export.add_argument('--output', '-o',
+                        help="Arquivo de saída; '-' = saída padrão (padrão: saída padrão para NDJSON, "
+                             "arquivo novo em EXPORT_DIR para Parquet/Arrow)")
+    export.add_argument('--compression', '-c',
+                        help="none, gzip, bz2 ou xz (NDJSON); snappy, zstd, gzip, lz4 ou brotli (Parquet, padrão zstd); "
+                             "zstd ou lz4 (Arrow)")
+    export.add_argument('--incremental', action='store_true',
+                        help="Só os eventos alterados desde a última exportação com o mesmo --name")
+    export.add_argument('--name', help="Nome da exportação, dono da marca d'água (padrão: o formato)")
+    export.add_argument('--chunk-size', type=int, help="Eventos por bloco (padrão: EXPORT_CHUNK_SIZE)")
+    export.set_defaults(handler=command_export, console=False)
+
+    stats = commands.add_parser('stats', help="Resumo do banco, da última execução e da fila de trabalho")
+    stats.add_argument('--json', action='store_true')
+    stats.set_defaults(handler=command_stats, console=False)
+
+    menu = commands.add_parser('menu', help="Abre o menu interativo")
+    menu.set_defaults(handler=command_menu, console=True)
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Só os comandos que não escrevem resultados na saída padrão registram no console.
+    setup_logging(console=args.console)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
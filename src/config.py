@@ -1,16 +1,72 @@
 # config.py
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, SettingsConfigDict, NoDecode
 from pydantic import Field, field_validator, computed_field
 from pathlib import Path
+from typing import Annotated
 
 class Settings(BaseSettings):
     # Configurações Gerais
     app_name: str = Field(default="VictorMoraesPbTP5", env="APP_NAME")
     environment: str = Field(default="DEV", env="ENVIRONMENT")
     target_url: str = Field(default="https://google.com", env="TARGET_URL")
+    target_urls: Annotated[list[str], NoDecode] = Field(default=[], env="TARGET_URLS")  # separados por vírgula
     database_url: str = Field(default="sqlite:///src/data/tp5_data.db", env="DATABASE_URL")
     scraper_log: str = Field(default="src/logs/scraper.log", env="SCRAPER_LOG")
+    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+
+    # Configurações do Crawler
+    crawler_mode: str = Field(default="sync", env="CRAWLER_MODE")
+    crawler_concurrency: int = Field(default=8, env="CRAWLER_CONCURRENCY")  # máximo do controle adaptativo
+    crawler_min_concurrency: int = Field(default=1, env="CRAWLER_MIN_CONCURRENCY")
+    crawler_latency_target: float = Field(default=5.0, env="CRAWLER_LATENCY_TARGET")  # segundos; 0 = ignora latência
+    crawler_rate_limit: float = Field(default=20.0, env="CRAWLER_RATE_LIMIT")  # requisições/s; 0 = sem limite
+    crawler_rate_burst: int = Field(default=0, env="CRAWLER_RATE_BURST")  # 0 = igual à concorrência
+    crawler_max_retries: int = Field(default=4, env="CRAWLER_MAX_RETRIES")
+    crawler_backoff_base: float = Field(default=0.5, env="CRAWLER_BACKOFF_BASE")  # segundos
+    crawler_backoff_max: float = Field(default=30.0, env="CRAWLER_BACKOFF_MAX")  # segundos
+    crawler_timeout: float = Field(default=10.0, env="CRAWLER_TIMEOUT")
+    crawler_horizon_days: int = Field(default=21, env="CRAWLER_HORIZON_DAYS")
+    crawler_window_days: int = Field(default=7, env="CRAWLER_WINDOW_DAYS")
+    crawler_page_size: int = Field(default=12, env="CRAWLER_PAGE_SIZE")
+    crawler_max_pages: int = Field(default=100, env="CRAWLER_MAX_PAGES")
+    scrape_mode: str = Field(default="incremental", env="SCRAPE_MODE")
+    crawler_refresh_hours: float = Field(default=6.0, env="CRAWLER_REFRESH_HOURS")
+    scrape_resume: bool = Field(default=True, env="SCRAPE_RESUME")  # retoma execuções interrompidas do último checkpoint
+    scrape_lock_file: str = Field(default="src/data/scraper.lock", env="SCRAPE_LOCK_FILE")  # impede execuções simultâneas
+    daemon_interval_minutes: float = Field(default=60.0, env="DAEMON_INTERVAL_MINUTES")  # entre inícios de execução
+
+    # Fila de trabalho (CRAWLER_MODE=queue)
+    queue_workers: int = Field(default=2, env="QUEUE_WORKERS")  # processos worker locais; 0 = só workers externos
+    queue_lease_seconds: float = Field(default=120.0, env="QUEUE_LEASE_SECONDS")
+    queue_max_attempts: int = Field(default=3, env="QUEUE_MAX_ATTEMPTS")
+    queue_poll_seconds: float = Field(default=0.5, env="QUEUE_POLL_SECONDS")
+
+    # Configurações do Parser
+    parser_engine: str = Field(default="fast", env="PARSER_ENGINE")
+    parser_workers: int = Field(default=0, env="PARSER_WORKERS")  # 0 = número de núcleos
+
+    # Configurações do Pipeline
+    pipeline_batch_writes: bool = Field(default=True, env="PIPELINE_BATCH_WRITES")
+    pipeline_identity_map_size: int = Field(default=10000, env="PIPELINE_IDENTITY_MAP_SIZE")
+
+    # Configurações das Consultas
+    query_chunk_size: int = Field(default=500, env="QUERY_CHUNK_SIZE")
+    query_cache_enabled: bool = Field(default=True, env="QUERY_CACHE_ENABLED")
+    query_cache_max_mb: int = Field(default=32, env="QUERY_CACHE_MAX_MB")
+
+    # Exportação de eventos
+    export_dir: str = Field(default="src/data/exports", env="EXPORT_DIR")
+    export_chunk_size: int = Field(default=5000, env="EXPORT_CHUNK_SIZE")  # eventos por bloco (row group / record batch)
+
+    # Métricas de execução
+    metrics_file: str = Field(default="src/data/metrics/scraper.prom", env="METRICS_FILE")  # vazio = não exporta
+
+    # Cache HTTP
+    http_cache_enabled: bool = Field(default=True, env="HTTP_CACHE_ENABLED")
+    http_cache_path: str = Field(default="src/data/http_cache.db", env="HTTP_CACHE_PATH")
+    http_cache_ttl: int = Field(default=900, env="HTTP_CACHE_TTL")  # segundos
+    http_cache_max_mb: int = Field(default=64, env="HTTP_CACHE_MAX_MB")
     
     
     @field_validator("environment")
@@ -21,6 +77,90 @@ class Settings(BaseSettings):
             raise ValueError("environment must be 'DEV', 'TEST', or 'PROD'")
         return v_upper
 
+    @field_validator("log_level")
+    def validate_log_level(cls, v):
+        v_upper = v.upper()
+        allowed = ("DEBUG", "INFO", "WARNING", "ERROR")
+        if v_upper not in allowed:
+            raise ValueError("log_level must be 'DEBUG', 'INFO', 'WARNING' or 'ERROR'")
+        return v_upper
+
+    @field_validator("crawler_mode")
+    def validate_crawler_mode(cls, v):
+        v_lower = v.lower()
+        allowed = ("sync", "async", "queue")
+        if v_lower not in allowed:
+            raise ValueError("crawler_mode must be 'sync', 'async' or 'queue'")
+        return v_lower
+
+    @field_validator("target_urls", mode="before")
+    def split_target_urls(cls, v):
+        if isinstance(v, str):
+            return [url.strip() for url in v.split(",") if url.strip()]
+        return v
+
+    @field_validator("scrape_mode")
+    def validate_scrape_mode(cls, v):
+        v_lower = v.lower()
+        allowed = ("full", "incremental")
+        if v_lower not in allowed:
+            raise ValueError("scrape_mode must be 'full' or 'incremental'")
+        return v_lower
+
+    @field_validator("parser_engine")
+    def validate_parser_engine(cls, v):
+        v_lower = v.lower()
+        allowed = ("fast", "soup")
+        if v_lower not in allowed:
+            raise ValueError("parser_engine must be 'fast' or 'soup'")
+        return v_lower
+
+    @field_validator("parser_workers")
+    def validate_parser_workers(cls, v):
+        if v < 0:
+            raise ValueError("parser_workers must be 0 (all cores) or a positive number")
+        return v
+
+    @field_validator(
+        "crawler_latency_target",
+        "crawler_rate_limit",
+        "crawler_rate_burst",
+        "crawler_max_retries",
+        "crawler_backoff_base",
+        "crawler_backoff_max",
+        "queue_workers",
+        "queue_lease_seconds",
+        "queue_poll_seconds",
+        "daemon_interval_minutes",
+    )
+    def validate_non_negative(cls, v, info):
+        if v < 0:
+            raise ValueError(f"{info.field_name} must not be negative")
+        return v
+
+    @field_validator(
+        "crawler_concurrency",
+        "crawler_min_concurrency",
+        "crawler_horizon_days",
+        "crawler_window_days",
+        "crawler_page_size",
+        "crawler_max_pages",
+        "queue_max_attempts",
+        "pipeline_identity_map_size",
+        "query_chunk_size",
+        "query_cache_max_mb",
+        "export_chunk_size",
+    )
+    def validate_positive(cls, v, info):
+        if v < 1:
+            raise ValueError(f"{info.field_name} must be at least 1")
+        return v
+
+    @computed_field
+    def targets(self) -> list[str]:
+        """Sites a buscar: TARGET_URLS ou, se vazio, só TARGET_URL."""
+        return self.target_urls or [self.target_url]
+
     @computed_field
     def database_path(self) -> Path:
         return Path(self.database_url.replace("sqlite:///", ""))
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import time
+import aiohttp
+from urllib.parse import urljoin
+from src.config import settings
+from src.crawlers.event_crawler import next_page_offset
+from src.crawlers.throttle import AdaptiveSemaphore, CrawlerThrottle, RETRY_STATUSES, THROTTLE_STATUSES, parse_retry_after
+from src.utils.metrics import FETCH_SECONDS, FETCH_REQUESTS, FETCH_BYTES, FETCH_RETRIES
+import logging
+
+class AsyncEventCrawler:
+    """
+    Alternativa assíncrona ao EventCrawler.
+
+    Usa uma única ClientSession do aiohttp com pool de conexões keep-alive e
+    dispara as requisições AJAX em paralelo. O número de requisições em voo
+    é ajustado pelo controle adaptativo do `throttle` (AIMD), até no máximo
+    `settings.crawler_concurrency`, e a taxa é limitada por um token bucket.
+    """
+
+    def __init__(self, base_url=settings.target_url, concurrency=None, throttle=None):
+        self.base_url = base_url
+        self.ajax_endpoint = "/wp-admin/admin-ajax.php"
+        self.concurrency = concurrency or settings.crawler_concurrency
+        self.headers = {
+            'User-Agent': f'{settings.app_name}-{settings.environment}/1.0 (+https://google.com)'
+        }
+        self.throttle = throttle or CrawlerThrottle(concurrency=self.concurrency)
+        self.session = None
+        self._semaphore = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Cria a sessão HTTP compartilhada. O connector mantém as conexões abertas
+        entre requisições e nunca abre mais do que `concurrency` ao mesmo tempo.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+            timeout = aiohttp.ClientTimeout(total=settings.crawler_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers)
+            self._semaphore = AdaptiveSemaphore(self.throttle.limit)
+
+    async def _request(self, method, url, data=None):
+        """
+        Executa a requisição dentro do limite de concorrência e de taxa e
+        retorna o corpo como texto. Erros de conexão, timeouts e respostas
+        429/502/503/504 são repetidos até `crawler_max_retries` vezes, com
+        backoff exponencial e jitter (ou o Retry-After do servidor), fora do
+        semáforo. A latência registrada não inclui as esperas.
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                await self.throttle.acquire_async()
+                start = time.perf_counter()
+                try:
+                    async with self.session.request(method, url, data=data) as response:
+                        status = response.status
+                        if status in RETRY_STATUSES and attempt < self.throttle.max_retries:
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            text = await response.text()
+                except aiohttp.ClientResponseError as e:
+                    FETCH_SECONDS.observe(time.perf_counter() - start)
+                    FETCH_REQUESTS.inc(result='throttled' if e.status in THROTTLE_STATUSES else 'error')
+                    if e.status in RETRY_STATUSES:
+                        self.throttle.record_failure(e.status)
+                    raise
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                    FETCH_SECONDS.observe(time.perf_counter() - start)
+                    FETCH_REQUESTS.inc(result='error')
+                    self.throttle.record_failure()
+                    if attempt >= self.throttle.max_retries:
+                        raise
+                    reason = str(e) or e.__class__.__name__
+                else:
+                    latency = time.perf_counter() - start
+                    FETCH_SECONDS.observe(latency)
+                    if status not in RETRY_STATUSES:
+                        self.throttle.record_success(latency)
+                        FETCH_REQUESTS.inc(result='ok')
+                        FETCH_BYTES.inc(len(body))
+                        return text
+                    FETCH_REQUESTS.inc(result='throttled' if status in THROTTLE_STATUSES else 'error')
+                    self.throttle.record_failure(status, retry_after)
+                    reason = f"HTTP {status}"
+
+            delay = self.throttle.backoff(attempt, retry_after)
+            attempt += 1
+            self.logger.warning(
+                "Falha transitória em %s (%s). Nova tentativa (%s de %s) em %.1fs.",
+                url, reason, attempt, self.throttle.max_retries, delay
+            )
+            FETCH_RETRIES.inc()
+            await asyncio.sleep(delay)
+
+    async def fetch_initial_page(self):
+        """
+        Busca por dados iniciais da página, extrai eventos de destaque diréto da página
+        """
+        url = self.base_url
+        try:
+            self.logger.info("Buscando a página: %s", url)
+            html = await self._request('GET', url)
+            self.logger.info("Página obtida com sucesso: %s", url)
+            return html
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error("Erro ao buscar a página %s: %s", url, e)
+            return None
+
+    async def fetch_events_ajax(self, action: str, start_date: str, offset: int):
+        """
+        Faz a simulação de uma requisição Ajax para pegar os eventos do site.
+        """
+        ajax_url = urljoin(self.base_url, self.ajax_endpoint)
+        payload = {
+            'action': action,
+            'mec_start_date': start_date,
+            'mec_offset': offset
+        }
+
+        try:
+            self.logger.debug("Enviando requisição AJAX para data %s, offset %s...", start_date, offset)
+            response_json = json.loads(await self._request('POST', ajax_url, data=payload))
+            self.logger.debug("Requisição AJAX para data %s, offset %s bem-sucedida.", start_date, offset)
+            return response_json
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.logger.error("Erro na requisição AJAX para data %s, offset %s: %s", start_date, offset, e)
+            return None
+
+    async def fetch_windows(self, action: str, windows):
+        """
+        Dispara todas as janelas (start_date, offset) de uma vez e devolve os
+        resultados na ordem em que as respostas chegam, como tuplas
+        (start_date, offset, response_json).
+        """
+        async def fetch(start_date, offset):
+            response_json = await self.fetch_events_ajax(action, start_date, offset)
+            return start_date, offset, response_json
+
+        tasks = [asyncio.ensure_future(fetch(start_date, offset)) for start_date, offset in windows]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_windows_paginated(self, action: str, start_dates, page_size: int = None, max_pages: int = None,
+                                      resume_points=None):
+        """
+        Dispara o offset 0 de todas as janelas de uma vez e, à medida que cada
+        página chega, agenda a próxima página daquela janela até o endpoint
+        indicar que terminou. Gera tuplas (start_date, offset, response_json)
+        e, quando uma janela chega ao fim sem erros, (start_date, None, None).
+        `resume_points` mapeia janelas retomadas para (offset da próxima
+        página, páginas já buscadas).
+        """
+        page_size = page_size or settings.crawler_page_size
+        max_pages = max_pages or settings.crawler_max_pages
+
+        async def fetch(start_date, offset, page_number):
+            response_json = await self.fetch_events_ajax(action, start_date, offset)
+            return start_date, offset, page_number, response_json
+
+        resume_points = resume_points or {}
+        pending = set()
+        for start_date in start_dates:
+            offset, pages_done = resume_points.get(start_date, (0, 0))
+            pending.add(asyncio.ensure_future(fetch(start_date, offset, pages_done + 1)))
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start_date, offset, page_number, response_json = task.result()
+                    if not response_json:
+                        continue
+                    if not response_json.get('html', '').strip():
+                        yield start_date, None, None
+                        continue
+
+                    next_offset = next_page_offset(response_json, offset, page_size)
+                    window_done = next_offset is None or page_number >= max_pages
+                    if next_offset is not None:
+                        if page_number < max_pages:
+                            pending.add(asyncio.ensure_future(fetch(start_date, next_offset, page_number + 1)))
+                        else:
+                            self.logger.warning("Limite de %s páginas atingido para data %s.", max_pages, start_date)
+
+                    yield start_date, offset, response_json
+                    if window_done:
+                        yield start_date, None, None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -1,32 +1,203 @@
+import hashlib
+import json
+import time
 import requests
 from urllib.parse import urljoin
 from src.config import settings
+from src.crawlers.throttle import CrawlerThrottle, RETRY_STATUSES, THROTTLE_STATUSES, parse_retry_after
+from src.utils.metrics import FETCH_SECONDS, FETCH_REQUESTS, FETCH_BYTES, FETCH_RETRIES
 import logging
 
+# Ação do admin-ajax.php do Modern Events Calendar que devolve as páginas da grade.
+AJAX_ACTION = 'mec_grid_load_more'
+
+
+TRUE_VALUES = ('1', 'true', 'yes', 'sim')
+FALSE_VALUES = ('0', 'false', 'no', 'não', 'nao', '')
+
+
+def parse_has_more(value):
+    """
+    Normaliza o `has_more_event` do MEC, que chega como bool, número ou texto
+    ("1", "true", "false"...) conforme a versão do plugin. Retorna True,
+    False ou None quando o valor está ausente ou não é reconhecido.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+    return None
+
+
+def next_page_offset(response_json, offset: int, page_size: int = settings.crawler_page_size):
+    """
+    Decide, a partir da resposta do MEC, qual o próximo `mec_offset` a pedir.
+    Retorna None quando a janela terminou: `html` vazio, `has_more_event` falso
+    ou, na falta desse campo (ou com um valor não reconhecido), uma página com
+    menos de `page_size` eventos.
+    """
+    if not response_json or not response_json.get('html', '').strip():
+        return None
+
+    count = response_json.get('count')
+    try:
+        count = int(count) if count is not None else None
+    except (TypeError, ValueError):
+        count = None
+
+    has_more = parse_has_more(response_json.get('has_more_event', response_json.get('has_more')))
+    if has_more is not None:
+        if not has_more:
+            return None
+    elif count is not None and count < page_size:
+        return None
+
+    try:
+        reported_offset = int(response_json.get('offset'))
+    except (TypeError, ValueError):
+        reported_offset = None
+
+    if reported_offset is not None and reported_offset > offset:
+        return reported_offset
+    return offset + (count or page_size)
+
+
+def content_hash(body):
+    """
+    sha256 do corpo de uma resposta, comparado com o de crawl_page para
+    saber se os eventos da página já estão gravados.
+    """
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
 class EventCrawler:
-    def __init__(self, base_url=settings.target_url):
+    def __init__(self, base_url=settings.target_url, cache=None, throttle=None):
         self.base_url = base_url
         self.ajax_endpoint = "/wp-admin/admin-ajax.php"
         self.session = requests.Session()
         self.headers = {
             'User-Agent': f'{settings.app_name}-{settings.environment}/1.0 (+https://google.com)'
         }
-        logging.basicConfig(level=logging.INFO)
+        self.cache = cache
+        # Requisições sequenciais: só o limitador de taxa e as novas tentativas se aplicam.
+        self.throttle = throttle or CrawlerThrottle(concurrency=1)
+        # Hash do corpo da última resposta (vinda do servidor ou do cache).
+        self.last_content_hash = None
+        # Indica se a última janela percorrida por iter_event_pages chegou ao fim
+        # (e não parou por erro de requisição).
+        self.last_window_complete = False
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    def _request(self, method, url, data=None):
+        """
+        Executa a requisição passando pelo cache, quando houver.
+        Retorna o corpo da resposta como texto e guarda o seu hash em
+        `last_content_hash`.
+        """
+        self.last_content_hash = None
+        body = self._fetch_body(method, url, data)
+        self.last_content_hash = content_hash(body)
+        return body
+
+    def _fetch_body(self, method, url, data):
+        """
+        Corpo da resposta: do cache (hit fresco ou 304) ou do servidor.
+        """
+        key = entry = None
+        headers = self.headers
+
+        if self.cache is not None:
+            key = self.cache.make_key(method, url, data)
+            entry = self.cache.get(key)
+            if entry is not None and self.cache.is_fresh(entry):
+                self.cache.record_hit()
+                FETCH_REQUESTS.inc(result='cache_hit')
+                return entry.body
+            if entry is not None:
+                headers = {**self.headers, **self.cache.conditional_headers(entry)}
+
+        response = self._send(method, url, data, headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_not_modified(key, response.headers)
+            FETCH_REQUESTS.inc(result='not_modified')
+            return entry.body
+
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            # Status de RETRY_STATUSES já foram contados em _send.
+            if response.status_code not in RETRY_STATUSES:
+                FETCH_REQUESTS.inc(result='error')
+            raise
+
+        FETCH_REQUESTS.inc(result='ok')
+        FETCH_BYTES.inc(len(response.content))
+        if self.cache is not None:
+            self.cache.store(key, url, response.text, response.headers)
+        return response.text
+
+    def _send(self, method, url, data, headers):
+        """
+        Envia a requisição respeitando o limitador de taxa. Erros de conexão,
+        timeouts e respostas 429/502/503/504 são repetidos até
+        `crawler_max_retries` vezes, com backoff exponencial e jitter (ou o
+        Retry-After do servidor). Retorna a última resposta; se a última
+        tentativa falhar por erro de conexão, a exceção é propagada.
+        """
+        attempt = 0
+        while True:
+            self.throttle.acquire()
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = self.session.request(method, url, data=data, headers=headers, timeout=settings.crawler_timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                FETCH_SECONDS.observe(time.perf_counter() - start)
+                FETCH_REQUESTS.inc(result='error')
+                self.throttle.record_failure()
+                if attempt >= self.throttle.max_retries:
+                    raise
+                reason = e
+            else:
+                latency = time.perf_counter() - start
+                FETCH_SECONDS.observe(latency)
+                if response.status_code not in RETRY_STATUSES:
+                    self.throttle.record_success(latency)
+                    return response
+                FETCH_REQUESTS.inc(result='throttled' if response.status_code in THROTTLE_STATUSES else 'error')
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.throttle.record_failure(response.status_code, retry_after)
+                if attempt >= self.throttle.max_retries:
+                    return response
+                reason = f"HTTP {response.status_code}"
+
+            delay = self.throttle.backoff(attempt, retry_after)
+            attempt += 1
+            self.logger.warning(
+                "Falha transitória em %s (%s). Nova tentativa (%s de %s) em %.1fs.",
+                url, reason, attempt, self.throttle.max_retries, delay
+            )
+            FETCH_RETRIES.inc()
+            time.sleep(delay)
+
     def fetch_initial_page(self):
         """
         Busca por dados iniciais da página, extrai eventos de destaque diréto da página
         """
         url = self.base_url
         try:
-            self.logger.info(f"Buscando a página: {url}")
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            self.logger.info(f"Página obtida com sucesso: {url}")
-            return response.text
+            self.logger.info("Buscando a página: %s", url)
+            html = self._request('GET', url)
+            self.logger.info("Página obtida com sucesso: %s", url)
+            return html
         except requests.RequestException as e:
-            self.logger.error(f"Erro ao buscar a página {url}: {e}")
+            self.logger.error("Erro ao buscar a página %s: %s", url, e)
             return None
         
     def fetch_events_ajax(self, action: str, start_date: str, offset: int):
@@ -41,16 +212,52 @@ class EventCrawler:
         }
         
         try:
-            self.logger.info(f"Enviando requisição AJAX para offset {offset}...")
+            self.logger.debug("Enviando requisição AJAX para offset %s...", offset)
             
-            response = self.session.post(ajax_url, data=payload, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            body = self._request('POST', ajax_url, data=payload)
             
-            self.logger.info(f"Requisição AJAX para offset {offset} bem-sucedida.")
-            return response.json()
-        except requests.RequestException as e:
-            self.logger.error(f"Erro na requisição AJAX para offset {offset}: {e}")
+            self.logger.debug("Requisição AJAX para offset %s bem-sucedida.", offset)
+            return json.loads(body)
+        except (requests.RequestException, ValueError) as e:
+            self.logger.error("Erro na requisição AJAX para offset %s: %s", offset, e)
             return None
 
+    def iter_event_pages(self, action: str, start_date: str, page_size: int = None, max_pages: int = None,
+                         start_offset: int = 0, pages_done: int = 0):
+        """
+        Percorre todas as páginas de uma janela de data, aumentando `mec_offset`
+        até o endpoint indicar que não há mais eventos.
+        Gera tuplas (offset, response_json), uma página por vez.
+        Para retomar uma janela, `start_offset` é o offset da próxima página e
+        `pages_done` quantas páginas já foram buscadas (contam para `max_pages`).
+        """
+        page_size = page_size or settings.crawler_page_size
+        max_pages = max_pages or settings.crawler_max_pages
+        offset = start_offset
+        self.last_window_complete = False
+
+        for _ in range(pages_done, max_pages):
+            response_json = self.fetch_events_ajax(action, start_date, offset)
+            if not response_json:
+                return
+            if not response_json.get('html', '').strip():
+                self.logger.info("Fim da paginação para data %s no offset %s.", start_date, offset)
+                self.last_window_complete = True
+                return
+
+            yield offset, response_json
+
+            next_offset = next_page_offset(response_json, offset, page_size)
+            if next_offset is None:
+                self.last_window_complete = True
+                return
+            offset = next_offset
+
+        self.logger.warning("Limite de %s páginas atingido para data %s.", max_pages, start_date)
+        self.last_window_complete = True
+
     def close(self):
-        self.session.close()
\ No newline at end of file
+        self.session.close()
+        if self.cache is not None:
+            self.cache.log_stats()
+            self.cache.close()
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Worker da fila de trabalho (CRAWLER_MODE=queue). O scraper inicia
+`QUEUE_WORKERS` processos locais; outras máquinas com acesso ao mesmo banco
+podem rodar mais workers com:
+
+    python -m src.crawlers.queue_worker [--wait]
+"""
+import argparse
+import logging
+import multiprocessing
+import time
+from src.config import settings
+from src.crawlers.event_crawler import EventCrawler, AJAX_ACTION, next_page_offset
+from src.crawlers.response_cache import ResponseCache
+from src.parsers.event_parser import EventParser
+from src.pipelines.crawl_pages import page_persisted
+from src.pipelines.work_queue import WorkQueue, INITIAL_PAGE, worker_name
+from src.utils.log_config import setup_logging, setup_worker_logging, active_log_file
+
+
+class QueueWorker:
+    """
+    Arrenda jobs da fila, busca a página com o EventCrawler do site, faz o
+    parse com o EventParser e devolve os eventos à fila. Não escreve nas
+    tabelas de eventos: isso fica com o único DatabasePipeline do scraper.
+    """
+
+    def __init__(self, queue=None, name=None):
+        self.queue = queue or WorkQueue()
+        self.name = name or worker_name()
+        self.parser = EventParser()
+        self.crawlers = {}
+        self.pages = 0
+        self.events = 0
+        self.failed = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def crawler_for(self, site):
+        if site not in self.crawlers:
+            cache = ResponseCache() if settings.http_cache_enabled else None
+            self.crawlers[site] = EventCrawler(site, cache=cache)
+        return self.crawlers[site]
+
+    def fetch(self, job):
+        """
+        Busca e faz o parse da página do job. Retorna (events, next_offset,
+        content_hash) ou None se a requisição falhou. Páginas cujo conteúdo
+        já foi gravado (mesmo hash em crawl_page) não passam pelo parse.
+        """
+        crawler = self.crawler_for(job.site)
+        if job.start_date == INITIAL_PAGE:
+            html_content = crawler.fetch_initial_page()
+            if not html_content:
+                return None
+            return self.parse(job, crawler, html_content), None, crawler.last_content_hash
+
+        response_json = crawler.fetch_events_ajax(AJAX_ACTION, job.start_date, job.offset)
+        if not response_json:
+            return None
+        html_content = response_json.get('html', '')
+        if not html_content.strip():
+            return [], None, crawler.last_content_hash
+        return (self.parse(job, crawler, html_content), next_page_offset(response_json, job.offset),
+                crawler.last_content_hash)
+
+    def parse(self, job, crawler, html_content):
+        if page_persisted(job.site, job.start_date, job.offset, crawler.last_content_hash):
+            self.logger.debug("Job %s já gravado com o mesmo conteúdo. Pulando o parse.", job.id)
+            return []
+        return self.parser.parse_events_from_html(html_content)
+
+    def process(self, job):
+        try:
+            result = self.fetch(job)
+        except Exception as e:
+            self.logger.exception("Erro ao processar o job %s: %s", job.id, e)
+            result = None
+        if result is None:
+            status = self.queue.fail(job, self.name, "Falha na requisição.")
+            self.failed += 1
+            self.logger.warning("Job %s (%s, data %s, offset %s) falhou; tentativa %s de %s, agora %s.",
+                                job.id, job.site, job.start_date or "inicial", job.offset,
+                                job.attempts, self.queue.max_attempts, status)
+            return
+        events, next_offset, content_hash = result
+        if self.queue.complete(job, self.name, events, next_offset, content_hash):
+            self.pages += 1
+            self.events += len(events)
+
+    def run(self, wait=False):
+        """
+        Processa jobs até a fila não ter mais nada a buscar. Com `wait`,
+        continua esperando novos jobs até ser interrompido.
+        """
+        start = time.perf_counter()
+        try:
+            while True:
+                job = self.queue.claim(self.name)
+                if job is not None:
+                    self.process(job)
+                    continue
+                if not wait and not self.queue.has_work():
+                    break
+                time.sleep(settings.queue_poll_seconds)
+        finally:
+            for crawler in self.crawlers.values():
+                crawler.close()
+            self.logger.info("Worker %s: %s páginas, %s eventos, %s falhas em %.1fs.",
+                             self.name, self.pages, self.events, self.failed, time.perf_counter() - start)
+
+
+def run_worker(log_file=None, level=None):
+    """
+    Alvo dos processos worker locais.
+    """
+    setup_worker_logging(log_file, level=level or settings.log_level)
+    QueueWorker().run()
+
+
+def start_queue_workers(count):
+    """
+    Inicia `count` processos worker. Usa spawn: cada worker abre sua própria
+    conexão com o SQLite, em vez de herdar a do processo principal.
+    """
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(target=run_worker, args=(active_log_file(),), name=f'queue-worker-{number}', daemon=True)
+        for number in range(1, count + 1)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--wait', action='store_true', help="Continua esperando novos jobs quando a fila esvazia")
+    args = arg_parser.parse_args()
+
+    setup_logging()
+    QueueWorker().run(wait=args.wait)
+
+
+if __name__ == '__main__':
+    main()
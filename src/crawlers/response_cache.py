@@ -0,0 +1,160 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from peewee import Model, SqliteDatabase, CharField, TextField, IntegerField, FloatField, fn
+from src.config import settings
+
+# Banco próprio do cache, separado do banco de eventos para não inflar o WAL
+# principal com páginas HTML inteiras.
+cache_database = SqliteDatabase(None)
+
+
+class CachedResponse(Model):
+    key = CharField(primary_key=True)  # sha256 de método + URL + payload
+    url = TextField()
+    body = TextField()
+    body_hash = CharField()
+    etag = CharField(null=True)
+    last_modified = CharField(null=True)
+    size = IntegerField()
+    fetched_at = FloatField()  # Última vez que o conteúdo foi confirmado no servidor
+    last_access = FloatField()  # Usado na evicção LRU
+
+    class Meta:
+        database = cache_database
+        table_name = 'http_cache'
+
+
+class ResponseCache:
+    """
+    Cache persistente de respostas HTTP com TTL, evicção LRU por tamanho e
+    revalidação condicional via ETag / Last-Modified.
+    """
+
+    def __init__(self, path=settings.http_cache_path, ttl=settings.http_cache_ttl,
+                 max_bytes=settings.http_cache_max_mb * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.unchanged = 0
+        self.misses = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        if cache_database.is_closed():
+            cache_database.init(path, pragmas={'journal_mode': 'wal', 'synchronous': 'NORMAL'})
+        cache_database.create_tables([CachedResponse], safe=True)
+
+    @staticmethod
+    def make_key(method, url, payload=None):
+        """
+        Gera a chave do cache a partir do método, da URL e do payload do POST.
+        """
+        raw = json.dumps([method.upper(), url, sorted((payload or {}).items())], default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        entry = CachedResponse.get_or_none(CachedResponse.key == key)
+        if entry is not None:
+            entry.last_access = time.time()
+            CachedResponse.update(last_access=entry.last_access).where(CachedResponse.key == key).execute()
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.fetched_at < self.ttl
+
+    def conditional_headers(self, entry):
+        """
+        Cabeçalhos If-None-Match / If-Modified-Since para revalidar uma entrada vencida.
+        """
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def record_hit(self):
+        self.hits += 1
+
+    def record_not_modified(self, key, response_headers):
+        """
+        Registra um 304: o conteúdo em cache continua válido por mais um TTL.
+        """
+        self.revalidated += 1
+        now = time.time()
+        updates = {'fetched_at': now, 'last_access': now}
+        if response_headers.get('ETag'):
+            updates['etag'] = response_headers['ETag']
+        if response_headers.get('Last-Modified'):
+            updates['last_modified'] = response_headers['Last-Modified']
+        CachedResponse.update(**updates).where(CachedResponse.key == key).execute()
+
+    def store(self, key, url, body, response_headers):
+        """
+        Guarda uma resposta 200. Retorna True se o corpo é idêntico ao que já
+        estava em cache, ou seja, o conteúdo não mudou.
+        """
+        body_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        previous = CachedResponse.get_or_none(CachedResponse.key == key)
+        unchanged = previous is not None and previous.body_hash == body_hash
+        if unchanged:
+            self.unchanged += 1
+        else:
+            self.misses += 1
+
+        now = time.time()
+        CachedResponse.replace(
+            key=key,
+            url=url,
+            body=body,
+            body_hash=body_hash,
+            etag=response_headers.get('ETag'),
+            last_modified=response_headers.get('Last-Modified'),
+            size=len(body.encode('utf-8')),
+            fetched_at=now,
+            last_access=now,
+        ).execute()
+        self.evict()
+        return unchanged
+
+    def evict(self):
+        """
+        Remove as entradas acessadas há mais tempo até o cache caber em `max_bytes`.
+        """
+        total = CachedResponse.select(fn.COALESCE(fn.SUM(CachedResponse.size), 0)).scalar()
+        if total <= self.max_bytes:
+            return
+
+        removed = 0
+        with cache_database.atomic():
+            for entry in CachedResponse.select(CachedResponse.key, CachedResponse.size).order_by(CachedResponse.last_access):
+                if total <= self.max_bytes:
+                    break
+                CachedResponse.delete().where(CachedResponse.key == entry.key).execute()
+                total -= entry.size
+                removed += 1
+        self.logger.info("Cache HTTP: %s entradas removidas por limite de tamanho.", removed)
+
+    def log_stats(self):
+        """
+        Registra os contadores desde o último registro e os zera, para que um
+        processo de longa duração (o daemon) registre os números de cada execução.
+        """
+        if not (self.hits or self.revalidated or self.unchanged or self.misses):
+            return
+        self.logger.info(
+            "Cache HTTP: %s hits, %s revalidadas (304), "
+            "%s inalteradas, %s misses.",
+            self.hits, self.revalidated, self.unchanged, self.misses
+        )
+        self.hits = self.revalidated = self.unchanged = self.misses = 0
+
+    def close(self):
+        if not cache_database.is_closed():
+            cache_database.close()
@@ -0,0 +1,189 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from src.config import settings
+from src.utils.metrics import FETCH_CONCURRENCY
+
+# Respostas que indicam falha transitória do servidor: a requisição é repetida.
+RETRY_STATUSES = (429, 502, 503, 504)
+# Entre elas, as que pedem explicitamente para o cliente desacelerar.
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos
+    de espera. Retorna None se o cabeçalho estiver ausente ou for inválido.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Limitador de taxa: até `burst` requisições imediatas e, depois, `rate`
+    por segundo. Cada chamada reserva um token e espera a vez dele, então
+    requisições concorrentes saem espaçadas em vez de todas de uma vez.
+    `pause(seconds)` suspende todas as requisições (usado com Retry-After).
+    Com `rate` 0 não há limite de taxa, só as pausas.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self):
+        """
+        Reserva um token e retorna quantos segundos esperar antes de usá-lo.
+        """
+        now = time.monotonic()
+        wait = 0.0
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+        return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AIMDLimit:
+    """
+    Limite de concorrência adaptativo (AIMD, como o controle de congestionamento
+    do TCP): cada resposta rápida soma 1/limite ao limite, ou seja, +1 a cada
+    rodada completa de requisições; um 429/503 ou uma latência acima de
+    `latency_target` multiplica o limite por `decrease`. Só há uma redução por
+    rodada (a latência média recente), para que as respostas de requisições
+    que já estavam em voo não derrubem o limite várias vezes seguidas.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.latency = None  # média móvel exponencial das latências
+        self._last_decrease = float('-inf')
+        FETCH_CONCURRENCY.set(self.current)
+
+    @property
+    def current(self):
+        return int(self.limit)
+
+    def on_success(self, latency):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        if self.latency_target and latency > self.latency_target:
+            self.on_throttle()
+            return
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        FETCH_CONCURRENCY.set(self.current)
+
+    def on_throttle(self):
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        FETCH_CONCURRENCY.set(self.current)
+
+
+class AdaptiveSemaphore:
+    """
+    Semáforo assíncrono cujo número de vagas segue um AIMDLimit.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit.current)
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+
+class CrawlerThrottle:
+    """
+    Controle de tráfego de um crawler: limitador de taxa, limite de
+    concorrência adaptativo e política de novas tentativas com backoff
+    exponencial e jitter. Usado por uma única thread (EventCrawler) ou por
+    um único event loop (AsyncEventCrawler).
+    """
+
+    def __init__(self, concurrency=None, rate=settings.crawler_rate_limit, burst=settings.crawler_rate_burst,
+                 min_concurrency=settings.crawler_min_concurrency, latency_target=settings.crawler_latency_target,
+                 max_retries=settings.crawler_max_retries, backoff_base=settings.crawler_backoff_base,
+                 backoff_max=settings.crawler_backoff_max):
+        concurrency = concurrency or settings.crawler_concurrency
+        self.bucket = TokenBucket(rate, burst or concurrency)
+        self.limit = AIMDLimit(concurrency, min(min_concurrency, concurrency), concurrency, latency_target)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def acquire(self):
+        self.bucket.acquire()
+
+    async def acquire_async(self):
+        await self.bucket.acquire_async()
+
+    def record_success(self, latency):
+        self.limit.on_success(latency)
+
+    def record_failure(self, status=None, retry_after=None):
+        """
+        Registra uma falha transitória (status HTTP ou erro de conexão, com
+        status None). 429/503 reduzem a concorrência; Retry-After pausa
+        todas as requisições pelo tempo pedido.
+        """
+        if status is None or status in THROTTLE_STATUSES:
+            self.limit.on_throttle()
+        if retry_after:
+            self.bucket.pause(retry_after)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Espera antes da tentativa `attempt + 1`: backoff exponencial com
+        "full jitter" (uniforme entre 0 e base * 2^attempt, até backoff_max),
+        nunca menor que o Retry-After do servidor.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
@@ -0,0 +1,66 @@
+import logging
+import signal
+import threading
+import time
+from src.config import settings
+from src.scraper import scraper, ScraperSession
+
+
+class ScraperDaemon:
+    """
+    Executa o scraper periodicamente, sem terminal, para rodar como serviço
+    (systemd, container). As execuções são agendadas de início a início a
+    cada `interval_minutes`; se uma execução passar do intervalo, a próxima
+    começa logo em seguida, sem acumular atrasos. A mesma ScraperSession é
+    reaproveitada entre os ciclos.
+
+    SIGTERM e SIGINT pedem a parada: uma execução em andamento termina
+    normalmente e o daemon sai sem começar outra. Um segundo SIGINT
+    interrompe a execução; ela é retomada do checkpoint na próxima.
+    """
+
+    def __init__(self, interval_minutes=settings.daemon_interval_minutes, full_recrawl=None, max_runs=None):
+        self.interval = interval_minutes * 60
+        self.full_recrawl = full_recrawl
+        self.max_runs = max_runs
+        self.runs = 0
+        self.failures = 0
+        self.stop_event = threading.Event()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def stop(self, signum=None, frame=None):
+        if signum == signal.SIGINT and self.stop_event.is_set():
+            raise KeyboardInterrupt
+        if signum is not None:
+            self.logger.info("Sinal %s recebido. Encerrando depois da execução atual.", signal.Signals(signum).name)
+        self.stop_event.set()
+
+    def install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self):
+        """
+        Laço principal. Retorna o número de execuções que falharam.
+        """
+        self.install_signal_handlers()
+        session = ScraperSession()
+        self.logger.info("Daemon iniciado: uma execução a cada %.1f minutos.", self.interval / 60)
+        try:
+            while not self.stop_event.is_set():
+                started = time.monotonic()
+                self.runs += 1
+                if not scraper(full_recrawl=self.full_recrawl, session=session):
+                    self.failures += 1
+                if self.max_runs is not None and self.runs >= self.max_runs:
+                    break
+                wait = max(0.0, self.interval - (time.monotonic() - started))
+                if wait:
+                    self.logger.info("Próxima execução em %.0f segundos.", wait)
+                self.stop_event.wait(wait)
+        finally:
+            session.close()
+            self.logger.info("Daemon encerrado: %s execuções, %s sem sucesso.", self.runs, self.failures)
+        return self.failures
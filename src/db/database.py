@@ -1,29 +1,107 @@
+import logging
 import os
+import threading
+from peewee import chunked
 from playhouse.sqlite_ext import SqliteExtDatabase
-from src.config import settings
-
-db_url = settings.database_url
-if db_url.startswith("sqlite:///"):
-    db_path = settings.database_path
-    db_dir = os.path.dirname(db_path)
-
-    # Criar o diretório se não existir
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
-        print(f"Diretório para o banco de dados criado em: {db_dir}")
-
-    # Usar SqliteExtDatabase para possíveis extensões
-    database = SqliteExtDatabase(
-        db_path,
-        pragmas={
-            'journal_mode': 'wal',
-            'cache_size': -1024 * 64,  # 64MB
-            'foreign_keys': 1,
-            'ignore_check_constraints': 0,
-            'synchronous': 'NORMAL'
-        },
-        timeout=30  
-    )
-    print(f"Banco de dados configurado em: {db_path}")
-else:
-    raise ValueError(f"Unsupported database URL: {db_url}")
+
+logger = logging.getLogger(__name__)
+
+PRAGMAS = {
+    'journal_mode': 'wal',
+    'cache_size': -1024 * 64,  # 64MB
+    'foreign_keys': 1,
+    'ignore_check_constraints': 0,
+    'synchronous': 'NORMAL'
+}
+TIMEOUT = 30
+
+# Limite de variáveis por statement (SQLITE_MAX_VARIABLE_NUMBER) nas versões
+# do SQLite anteriores à 3.32; as mais novas aceitam 32766.
+SQLITE_MAX_VARIABLES = 999
+
+
+def insert_chunks(rows):
+    """
+    Divide `rows` (dicionários com as mesmas colunas) em blocos que cabem em
+    um único INSERT: cada linha usa uma variável por coluna, então o bloco
+    tem SQLITE_MAX_VARIABLES // colunas linhas.
+    """
+    if not rows:
+        return []
+    return chunked(rows, max(1, SQLITE_MAX_VARIABLES // len(rows[0])))
+
+
+class LazySqliteExtDatabase(SqliteExtDatabase):
+    """
+    SqliteExtDatabase configurado só na primeira conexão: importar os
+    modelos não lê as configurações nem cria o diretório do banco, então
+    subcomandos e opções do menu que não usam o banco não pagam por ele.
+    A primeira conexão do processo também prepara o esquema (ver
+    prepare_schema), para que as consultas funcionem em um banco criado por
+    uma versão anterior antes de o scraper rodar.
+    """
+
+    _configure_lock = threading.Lock()
+    _schema_lock = threading.RLock()
+    schema_ready = False
+    _schema_running = False
+
+    def connect(self, reuse_if_open=False):
+        if self.deferred:
+            configure_database(self)
+        opened = super().connect(reuse_if_open)
+        if not self.schema_ready:
+            prepare_schema(self)
+        return opened
+
+
+def configure_database(db):
+    """
+    Aponta `db` para o arquivo de settings.database_url, criando o diretório
+    se preciso. Chamado uma vez, na primeira conexão.
+    """
+    from src.config import settings
+
+    with db._configure_lock:
+        if not db.deferred:
+            return
+        db_url = settings.database_url
+        if not db_url.startswith("sqlite:///"):
+            raise ValueError(f"Unsupported database URL: {db_url}")
+        db_path = settings.database_path
+        db_dir = os.path.dirname(db_path)
+
+        # Criar o diretório se não existir
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+            logger.info("Diretório para o banco de dados criado em: %s", db_dir)
+
+        db.init(db_path, pragmas=PRAGMAS, timeout=TIMEOUT)
+        logger.info("Banco de dados configurado em: %s", db_path)
+
+
+def prepare_schema(db):
+    """
+    Cria as tabelas que faltam, adiciona as colunas novas e preenche as
+    tabelas derivadas (venue, event_details, índice de busca), uma vez por
+    processo, na primeira conexão. Tudo é idempotente: em um banco já
+    atualizado, são só algumas consultas ao catálogo. Uma falha é registrada
+    e não impede a conexão; a próxima execução do scraper tenta de novo.
+    """
+    from src.db.init_db import setup_schema
+
+    with db._schema_lock:
+        if db.schema_ready or db._schema_running:
+            return
+        db._schema_running = True
+        try:
+            setup_schema()
+        except Exception as e:
+            logger.error("Erro ao preparar o esquema do banco de dados: %s", e)
+        finally:
+            db._schema_running = False
+            db.schema_ready = True
+
+
+# Usar SqliteExtDatabase para possíveis extensões
+database = LazySqliteExtDatabase(None, pragmas=PRAGMAS, timeout=TIMEOUT)
@@ -1,8 +1,139 @@
+import copy
+import logging
+from playhouse.migrate import SqliteMigrator, migrate
 from src.db.database import database
-from src.db.models import Event, EventData, Metadata  
+from src.db.models import (
+    Event, Venue, EventData, Metadata, EventDetails, CrawlWindow, EventSearch, ScrapeRun, CrawlJob, CrawlPage,
+    ExportRun,
+)
+from src.pipelines.venues import backfill_venues
+from src.pipelines.details import backfill_details
+from src.queries.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+# Colunas adicionadas depois da criação original das tabelas. Bancos antigos
+# recebem essas colunas via ALTER TABLE em initialize_db(), antes de
+# create_tables: os índices de create_tables já referenciam essas colunas.
+ADDED_COLUMNS = (
+    (Event, 'fingerprint'),
+    (Event, 'updated_at'),
+    (EventData, 'venue'),
+    (ScrapeRun, 'throttled'),
+    (ScrapeRun, 'requests_per_second'),
+    (ScrapeRun, 'error_rate'),
+    (ScrapeRun, 'resumed_from'),
+    (ScrapeRun, 'initial_page_done'),
+    (CrawlWindow, 'next_offset'),
+    (CrawlWindow, 'run'),
+    (CrawlJob, 'content_hash'),
+)
+
+# Valor das colunas NOT NULL adicionadas nas linhas que já existiam, quando
+# não é o padrão do campo.
+BACKFILLED_COLUMNS = {
+    (Event, 'updated_at'): Event.created_at,
+}
+
+def migrate_db():
+    """
+    Add columns introduced after the tables were first created.
+
+    Every column is added as nullable (a plain ALTER TABLE ... ADD COLUMN) and
+    NOT NULL columns are then filled with UPDATE. Adding them as NOT NULL
+    would make SqliteMigrator rebuild the table (DROP TABLE + CREATE TABLE),
+    and with foreign_keys on, dropping `event` or `scrape_run` cascades to
+    every event_data, metadata and crawl_window row.
+    """
+    migrator = SqliteMigrator(database)
+    operations = []
+    backfills = []
+    for model, field_name in ADDED_COLUMNS:
+        table = model._meta.table_name
+        if not database.table_exists(table):
+            continue
+        existing = {column.name for column in database.get_columns(table)}
+        field = model._meta.fields[field_name]
+        if field.column_name not in existing:
+            # O índice da coluna fica por conta de create_tables, com o nome usual.
+            column = copy.copy(field)
+            column.index = False
+            column.null = True
+            operations.append(migrator.add_column(table, column.column_name, column))
+            if not field.null:
+                backfills.append((model, field))
+    if operations:
+        with database.atomic():
+            migrate(*operations)
+            for model, field in backfills:
+                value = BACKFILLED_COLUMNS.get((model, field.name))
+                if value is None:
+                    value = field.default() if callable(field.default) else field.default
+                model.update({field: value}).where(field.is_null()).execute()
+        logger.info("%s column(s) added to existing tables.", len(operations))
+
+# Triggers que mantêm o índice FTS5 `event_search` em sincronia com
+# event_data / event, inclusive nas escritas em lote (INSERT ... ON CONFLICT).
+SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS event_data_search_insert AFTER INSERT ON event_data BEGIN
+        INSERT INTO event_search (rowid, name, description, location)
+        SELECT NEW.id, event.name, event.description, NEW.location FROM event WHERE event.id = NEW.event_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_data_search_update AFTER UPDATE OF event_id, location ON event_data BEGIN
+        DELETE FROM event_search WHERE rowid = OLD.id;
+        INSERT INTO event_search (rowid, name, description, location)
+        SELECT NEW.id, event.name, event.description, NEW.location FROM event WHERE event.id = NEW.event_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_data_search_delete AFTER DELETE ON event_data BEGIN
+        DELETE FROM event_search WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_search_update AFTER UPDATE OF name, description ON event BEGIN
+        UPDATE event_search SET name = NEW.name, description = NEW.description
+        WHERE rowid IN (SELECT id FROM event_data WHERE event_id = NEW.id);
+    END
+    """,
+)
+
+def rebuild_search_index():
+    """Repopulate the FTS5 index from event / event_data"""
+    with database.atomic():
+        EventSearch.delete().execute()
+        database.execute_sql(
+            "INSERT INTO event_search (rowid, name, description, location) "
+            "SELECT event_data.id, event.name, event.description, event_data.location "
+            "FROM event_data JOIN event ON event.id = event_data.event_id"
+        )
+        EventSearch.optimize()
+    query_cache.bump_generation()
+
+def create_search_index():
+    """Create the FTS5 table and its sync triggers, backfilling existing rows"""
+    database.create_tables([EventSearch], safe=True)
+    for trigger in SEARCH_TRIGGERS:
+        database.execute_sql(trigger)
+    if EventSearch.select().count() != EventData.select().count():
+        rebuild_search_index()
+        logger.info("Search index rebuilt.")
+
+def setup_schema():
+    """Create missing tables, migrate old ones and backfill derived tables, on the open connection"""
+    migrate_db()
+    database.create_tables(
+        [Event, Venue, EventData, Metadata, EventDetails, ScrapeRun, CrawlWindow, CrawlJob, CrawlPage, ExportRun],
+        safe=True)
+    create_search_index()
+    backfill_venues()
+    backfill_details()
 
 def initialize_db():
     """Connect to Database and Create New Tables"""
     with database:
-        database.create_tables([Event, EventData, Metadata], safe=True)
-        print("Tables successfully created.")
\ No newline at end of file
+        setup_schema()
+        logger.info("Tables successfully created.")
@@ -1,8 +1,16 @@
 from .event import Event
+from .venue import Venue
 from .event_data import EventData
 from .metadata import Metadata
+from .event_details import EventDetails
+from .crawl_window import CrawlWindow
+from .event_search import EventSearch
+from .scrape_run import ScrapeRun
+from .crawl_job import CrawlJob
+from .crawl_page import CrawlPage
+from .export_run import ExportRun
 
-__all__ = ["Event", "EventData", "Metadata"]
+__all__ = ["Event", "Venue", "EventData", "Metadata", "EventDetails", "CrawlWindow", "EventSearch", "ScrapeRun", "CrawlJob", "CrawlPage", "ExportRun"]
 
 
 """
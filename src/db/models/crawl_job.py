@@ -0,0 +1,36 @@
+import datetime
+from peewee import Model, AutoField, CharField, IntegerField, DateTimeField, TextField
+from src.db.database import database
+
+class CrawlJob(Model):
+    """
+    Uma página a buscar na fila de trabalho do modo `queue`: (site, janela,
+    offset). Workers arrendam o job por um tempo limitado (`leased_until`),
+    fazem a busca e o parse e deixam os eventos em `result` para o processo
+    que grava no banco. Um lease vencido volta a ficar disponível.
+    """
+    id = AutoField()
+    site = CharField()  # target_url do site MEC
+    start_date = CharField()  # mec_start_date da janela; '' = página inicial do site
+    offset = IntegerField()  # mec_offset da página
+    status = CharField(default='pending')  # pending, leased, fetched, done, failed
+    attempts = IntegerField(default=0)
+    worker = CharField(null=True)  # host:pid do worker com o lease
+    leased_until = DateTimeField(null=True)
+    next_offset = IntegerField(null=True)  # None se a janela acabou nesta página
+    event_count = IntegerField(default=0)
+    result = TextField(null=True)  # eventos extraídos, em JSON, até serem gravados
+    content_hash = CharField(null=True)  # sha256 do corpo da resposta (vai para crawl_page na gravação)
+    error = TextField(null=True)
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    class Meta:
+        database = database
+        table_name = 'crawl_job'
+        indexes = (
+            (('site', 'start_date', 'offset'), True),
+            (('status', 'id'), False),
+        )
+
+    def __str__(self):
+        return f"CrawlJob(site={self.site}, start_date={self.start_date}, offset={self.offset}, status={self.status})"
@@ -0,0 +1,28 @@
+import datetime
+from peewee import Model, AutoField, CharField, IntegerField, DateTimeField
+from src.db.database import database
+
+class CrawlPage(Model):
+    """
+    Última versão gravada de cada página buscada: o hash do corpo da resposta
+    cujos eventos foram gravados. Escrita na mesma transação que os eventos,
+    então só existe se eles foram gravados; uma página que volta com o mesmo
+    hash não precisa passar pelo parse de novo. Ao contrário de crawl_window,
+    não é apagada quando uma janela é buscada de novo.
+    """
+    id = AutoField()
+    site = CharField()  # target_url do site MEC
+    start_date = CharField()  # mec_start_date da janela; '' = página inicial do site
+    offset = IntegerField()  # mec_offset da página
+    content_hash = CharField()  # sha256 do corpo da resposta
+    persisted_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    class Meta:
+        database = database
+        table_name = 'crawl_page'
+        indexes = (
+            (('site', 'start_date', 'offset'), True),
+        )
+
+    def __str__(self):
+        return f"CrawlPage(site={self.site}, start_date={self.start_date}, offset={self.offset})"
@@ -0,0 +1,24 @@
+import datetime
+from peewee import Model, CharField, IntegerField, BooleanField, DateTimeField, AutoField, ForeignKeyField
+from src.db.database import database
+from src.db.models.scrape_run import ScrapeRun
+
+class CrawlWindow(Model):
+    id = AutoField()
+    start_date = CharField()  # mec_start_date da janela AJAX
+    offset = IntegerField()  # mec_offset da página
+    event_count = IntegerField(default=0)
+    next_offset = IntegerField(null=True)  # mec_offset da página seguinte; None se a janela acabou nesta página
+    run = ForeignKeyField(ScrapeRun, null=True, backref='pages')  # Execução que gravou a página
+    fetched_at = DateTimeField(default=datetime.datetime.utcnow)
+    window_complete = BooleanField(default=False)  # Todas as páginas da janela foram gravadas
+
+    class Meta:
+        database = database
+        table_name = 'crawl_window'
+        indexes = (
+            (('start_date', 'offset'), True),
+        )
+
+    def __str__(self):
+        return f"CrawlWindow(start_date={self.start_date}, offset={self.offset}, fetched_at={self.fetched_at})"
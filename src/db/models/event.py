@@ -7,7 +7,9 @@ class Event(Model):
     name = CharField(unique=True)
     type = TextField()  # Armazena o tipo do evento
     description = CharField(null=True) 
+    fingerprint = CharField(max_length=40, null=True)  # sha1 do conteúdo extraído, ver DatabasePipeline
     created_at = DateTimeField(default=datetime.datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.datetime.utcnow, index=True)  # última mudança de conteúdo (marca d'água das exportações)
 
     class Meta:
         database = database
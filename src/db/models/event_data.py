@@ -1,5 +1,6 @@
 from peewee import Model, ForeignKeyField, TextField, DateTimeField, AutoField
 from src.db.models.event import Event
+from src.db.models.venue import Venue
 from src.db.database import database
 
 class EventData(Model):
@@ -7,6 +8,7 @@ class EventData(Model):
     event = ForeignKeyField(Event, backref='data', on_delete='CASCADE')
     date = DateTimeField()
     location = TextField() 
+    venue = ForeignKeyField(Venue, null=True, backref='event_data', on_delete='SET NULL')  # Local normalizado
 
     class Meta:
         database = database  
@@ -0,0 +1,30 @@
+import datetime
+from peewee import Model, ForeignKeyField, CharField, TextField, FloatField, DateTimeField
+from src.db.models.event import Event
+from src.db.database import database
+
+class EventDetails(Model):
+    """
+    Projeção tipada dos metadados mais usados, uma linha por evento.
+    Chaves raras continuam na tabela metadata (chave/valor).
+    """
+    event = ForeignKeyField(Event, primary_key=True, backref='details', on_delete='CASCADE')
+    price = FloatField(null=True)
+    price_currency = CharField(null=True)
+    availability = CharField(null=True)
+    url = TextField(null=True)
+    image = TextField(null=True)
+    event_type = CharField(null=True)  # Ao ar livre / ambiente fechado
+    updated_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    class Meta:
+        database = database
+        table_name = 'event_details'
+        indexes = (
+            (('event_type',), False),
+            (('availability',), False),
+            (('price',), False),
+        )
+
+    def __str__(self):
+        return f"EventDetails(event={self.event_id}, price={self.price}, event_type={self.event_type})"
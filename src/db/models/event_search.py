@@ -0,0 +1,22 @@
+from playhouse.sqlite_ext import FTS5Model, SearchField, RowIDField
+from src.db.database import database
+
+class EventSearch(FTS5Model):
+    """
+    Índice FTS5 de busca textual: uma linha por EventData (rowid = event_data.id),
+    com o nome e a descrição do evento e a localização da ocorrência.
+    Mantido em sincronia pelos triggers criados em init_db.
+    """
+    rowid = RowIDField()
+    name = SearchField()
+    description = SearchField()
+    location = SearchField()
+
+    class Meta:
+        database = database
+        table_name = 'event_search'
+        # remove_diacritics: "Niterói" também é encontrado por "niteroi"
+        options = {'tokenize': 'unicode61 remove_diacritics 2'}
+
+    def __str__(self):
+        return f"EventSearch(rowid={self.rowid}, name={self.name}, location={self.location})"
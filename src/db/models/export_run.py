@@ -0,0 +1,35 @@
+import datetime
+from peewee import Model, AutoField, CharField, BooleanField, IntegerField, FloatField, TextField, DateTimeField
+from src.db.database import database
+
+class ExportRun(Model):
+    """
+    Uma exportação de eventos (src/export). `watermark` é o maior
+    Event.updated_at exportado; a próxima exportação incremental com o mesmo
+    `name` só escreve eventos alterados depois dele.
+    """
+    id = AutoField()
+    name = CharField()  # consumidor da exportação; cada nome tem sua própria marca d'água
+    format = CharField()  # ndjson / parquet / arrow
+    compression = CharField(null=True)
+    path = TextField()  # '-' = saída padrão
+    incremental = BooleanField(default=False)
+    since = DateTimeField(null=True)  # marca d'água de partida (exportações incrementais)
+    watermark = DateTimeField(null=True)
+    started_at = DateTimeField(default=datetime.datetime.utcnow)
+    duration = FloatField(default=0)  # segundos
+    events = IntegerField(default=0)
+    rows = IntegerField(default=0)
+    chunks = IntegerField(default=0)  # blocos lidos do banco (row groups / record batches)
+    bytes_written = IntegerField(default=0)
+    success = BooleanField(default=False)
+
+    class Meta:
+        database = database
+        table_name = 'export_run'
+        indexes = (
+            (('name', 'success', 'id'), False),
+        )
+
+    def __str__(self):
+        return f"ExportRun(id={self.id}, name={self.name}, format={self.format}, rows={self.rows}, watermark={self.watermark})"
@@ -0,0 +1,52 @@
+import datetime
+from peewee import (
+    Model, AutoField, CharField, BooleanField, IntegerField, FloatField, TextField, DateTimeField, ForeignKeyField,
+)
+from src.db.database import database
+
+class ScrapeRun(Model):
+    """
+    Resumo das métricas de uma execução do scraper, uma linha por execução.
+    A coluna `metrics` guarda o snapshot completo (todas as séries) em JSON.
+
+    A linha é criada no início da execução, e seu id identifica as páginas
+    gravadas por ela em crawl_window (os checkpoints). `finished_at` vazio
+    indica uma execução em andamento ou encerrada no meio.
+    """
+    id = AutoField()
+    started_at = DateTimeField(default=datetime.datetime.utcnow)
+    finished_at = DateTimeField(null=True)
+    duration = FloatField(default=0)  # segundos
+    success = BooleanField(default=False)
+    crawler_mode = CharField()  # sync / async
+    full_recrawl = BooleanField(default=False)
+    resumed_from = ForeignKeyField('self', null=True, backref='resumed_by')  # execução interrompida retomada por esta
+    initial_page_done = BooleanField(default=False)  # página inicial já gravada (checkpoint)
+    requests = IntegerField(default=0)
+    request_errors = IntegerField(default=0)
+    throttled = IntegerField(default=0)  # respostas 429/503
+    retries = IntegerField(default=0)
+    requests_per_second = FloatField(null=True)  # requisições HTTP (sem hits do cache) por segundo
+    error_rate = FloatField(null=True)  # fração das requisições HTTP com 429/503 ou erro
+    bytes_downloaded = IntegerField(default=0)
+    fetch_seconds = FloatField(default=0)
+    fetch_p95 = FloatField(null=True)
+    events_parsed = IntegerField(default=0)
+    parse_seconds = FloatField(default=0)
+    events_per_second = FloatField(null=True)  # eventos extraídos por segundo de parse
+    events_inserted = IntegerField(default=0)
+    events_updated = IntegerField(default=0)
+    events_unchanged = IntegerField(default=0)
+    rows_written = IntegerField(default=0)
+    write_seconds = FloatField(default=0)
+    metrics = TextField(null=True)
+
+    class Meta:
+        database = database
+        table_name = 'scrape_run'
+        indexes = (
+            (('started_at',), False),
+        )
+
+    def __str__(self):
+        return f"ScrapeRun(id={self.id}, started_at={self.started_at}, duration={self.duration:.1f}s, success={self.success})"
@@ -0,0 +1,24 @@
+from peewee import Model, CharField, AutoField
+from src.db.database import database
+
+class Venue(Model):
+    id = AutoField()
+    key = CharField(max_length=40, unique=True)  # sha1 dos campos normalizados, ver address_parser.venue_key
+    name = CharField(null=True)  # Nome do local (location.name do JSON-LD)
+    street = CharField(null=True)
+    neighborhood = CharField(null=True, collation='NOCASE')
+    city = CharField(null=True, collation='NOCASE')
+    region = CharField(null=True, collation='NOCASE')  # UF
+    postal_code = CharField(null=True)
+    country = CharField(null=True)
+
+    class Meta:
+        database = database
+        table_name = 'venue'
+        indexes = (
+            (('city', 'neighborhood'), False),
+            (('region', 'city'), False),
+        )
+
+    def __str__(self):
+        return f"Venue(id={self.id}, name={self.name}, city={self.city}, neighborhood={self.neighborhood})"
@@ -0,0 +1,213 @@
+# src/export/event_export.py
+import logging
+import os
+import time
+from datetime import datetime
+from peewee import JOIN
+from src.config import settings
+from src.db.database import database
+from src.db.models.event import Event
+from src.db.models.event_data import EventData
+from src.db.models.event_details import EventDetails
+from src.db.models.metadata import Metadata
+from src.db.models.venue import Venue
+from src.db.models.export_run import ExportRun
+from src.pipelines.details import PROJECTED_KEYS
+from src.export.writers import (
+    DEFAULT_COMPRESSION, INT, FLOAT, STRING, TIMESTAMP, check_options, default_suffix, open_writer,
+)
+
+# Colunas fixas: uma linha por (evento, data), com o local normalizado e os
+# detalhes tipados de EventDetails. As chaves de Metadata viram colunas meta_<chave>.
+BASE_COLUMNS = (
+    ('event_id', INT),
+    ('name', STRING),
+    ('type', STRING),
+    ('description', STRING),
+    ('date', TIMESTAMP),
+    ('location', STRING),
+    ('venue_name', STRING),
+    ('neighborhood', STRING),
+    ('city', STRING),
+    ('region', STRING),
+    *[(key, FLOAT if key == 'price' else STRING) for key in PROJECTED_KEYS],
+    ('created_at', TIMESTAMP),
+    ('updated_at', TIMESTAMP),
+)
+METADATA_PREFIX = 'meta_'
+
+
+def _timestamp(value):
+    """
+    Converte a data gravada pelo peewee ('2024-12-01 00:00:00[.ffffff]') em datetime.
+    """
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class EventExporter:
+    """
+    Exporta Event x EventData x metadados (EventDetails e Metadata pivotados
+    em colunas) em blocos de `chunk_size` eventos, paginados por Event.id:
+    cada bloco são quatro SELECTs e vira um row group (Parquet), um record
+    batch (Arrow) ou um trecho do arquivo NDJSON, e só ele fica em memória.
+
+    A exportação inteira lê um único snapshot do banco (uma transação de
+    leitura; no modo WAL o scraper continua gravando ao mesmo tempo). Uma
+    exportação incremental só escreve os eventos com Event.updated_at depois
+    da marca d'água da última exportação bem-sucedida com o mesmo nome.
+    """
+
+    def __init__(self, chunk_size=settings.export_chunk_size):
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def metadata_keys():
+        return [key for (key,) in Metadata.select(Metadata.key).distinct().order_by(Metadata.key).tuples()]
+
+    def columns(self, metadata_keys):
+        return list(BASE_COLUMNS) + [(METADATA_PREFIX + key, STRING) for key in metadata_keys]
+
+    @staticmethod
+    def last_watermark(name):
+        """
+        Marca d'água da última exportação bem-sucedida com o nome `name`, ou None.
+        """
+        last = (ExportRun
+                .select(ExportRun.watermark)
+                .where((ExportRun.name == name) & ExportRun.success)
+                .order_by(ExportRun.id.desc())
+                .first())
+        return last.watermark if last is not None else None
+
+    def iter_chunks(self, metadata_keys, since=None):
+        """
+        Gera (eventos, linhas) por bloco de até `chunk_size` eventos, em ordem
+        de Event.id; as linhas seguem a ordem de `columns(metadata_keys)`.
+        Eventos sem nenhuma data geram uma linha com as colunas da data vazias.
+
+        As consultas são lidas direto do cursor, sem a conversão de valores do
+        peewee: as datas vêm como texto ISO e são convertidas aqui com
+        datetime.fromisoformat, bem mais barato que o strptime do peewee.
+        """
+        last_id = 0
+        empty_data = (None,) * 6
+        empty_details = (None,) * len(PROJECTED_KEYS)
+        changed = (Event.updated_at > since) if since is not None else True
+        while True:
+            query = (Event
+                     .select(Event.id, Event.name, Event.type, Event.description, Event.created_at, Event.updated_at)
+                     .where((Event.id > last_id) & changed)
+                     .order_by(Event.id)
+                     .limit(self.chunk_size))
+            events = database.execute(query).fetchall()
+            if not events:
+                return
+            # As tabelas relacionadas são filtradas pelo intervalo de ids do bloco
+            # (e pela mesma marca d'água), e não por um IN com milhares de ids.
+            in_chunk = Event.id.between(events[0][0], events[-1][0]) & changed
+            last_id = events[-1][0]
+
+            dates = {}
+            data_query = (EventData
+                          .select(EventData.event, EventData.date, EventData.location,
+                                  Venue.name, Venue.neighborhood, Venue.city, Venue.region)
+                          .join(Event)
+                          .switch(EventData)
+                          .join(Venue, JOIN.LEFT_OUTER)
+                          .where(in_chunk)
+                          .order_by(EventData.event, EventData.date))
+            for event_id, date, *values in database.execute(data_query):
+                dates.setdefault(event_id, []).append((_timestamp(date), *values))
+
+            details_query = (EventDetails
+                             .select(EventDetails.event, *[getattr(EventDetails, key) for key in PROJECTED_KEYS])
+                             .join(Event)
+                             .where(in_chunk))
+            details = {event_id: tuple(values) for event_id, *values in database.execute(details_query)}
+
+            extras = {}
+            if metadata_keys:
+                metadata_query = (Metadata
+                                  .select(Metadata.event, Metadata.key, Metadata.value)
+                                  .join(Event)
+                                  .where(in_chunk))
+                for event_id, key, value in database.execute(metadata_query):
+                    extras.setdefault(event_id, {})[key] = value
+
+            rows = []
+            for event_id, name, event_type, description, created_at, updated_at in events:
+                event_extras = extras.get(event_id, {})
+                tail = (details.get(event_id, empty_details) + (_timestamp(created_at), _timestamp(updated_at)) +
+                        tuple(event_extras.get(key) for key in metadata_keys))
+                for data in dates.get(event_id) or [empty_data]:
+                    rows.append((event_id, name, event_type, description) + data + tail)
+            yield len(events), rows
+
+    def export(self, path=None, format='ndjson', compression=DEFAULT_COMPRESSION, incremental=False, name=None):
+        """
+        Exporta os eventos para `path` ('-' = saída padrão, só NDJSON; None =
+        arquivo novo em `settings.export_dir`). `compression` None desliga a
+        compressão; o padrão depende do formato. Arquivos são escritos em um
+        temporário e renomeados só no fim, então uma exportação que falhou
+        nunca deixa um arquivo pela metade. Retorna o ExportRun gravado ou
+        None em caso de erro.
+        """
+        if compression is DEFAULT_COMPRESSION:
+            compression = DEFAULT_COMPRESSION[format]
+        check_options(format, compression, path)
+        name = name or format
+        if path is None:
+            os.makedirs(settings.export_dir, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            kind = 'incremental' if incremental else 'full'
+            path = os.path.join(settings.export_dir, f"events-{name}-{kind}-{stamp}{default_suffix(format, compression)}")
+        temp_path = path if path == '-' else f"{path}.tmp"
+
+        run = ExportRun(name=name, format=format, compression=compression, path=path, incremental=incremental,
+                        started_at=datetime.utcnow())
+        start = time.perf_counter()
+        writer = None
+        try:
+            # Uma transação de leitura: todos os blocos e a marca d'água vêm do mesmo snapshot.
+            with database.atomic():
+                run.since = self.last_watermark(name) if incremental else None
+                newest = Event.select(Event.updated_at).order_by(Event.updated_at.desc()).first()
+                run.watermark = newest.updated_at if newest is not None else run.since
+                metadata_keys = self.metadata_keys()
+                writer = open_writer(format, temp_path, self.columns(metadata_keys), compression)
+                for event_count, rows in self.iter_chunks(metadata_keys, run.since):
+                    writer.write(rows)
+                    run.chunks += 1
+                    run.events += event_count
+                    run.rows += len(rows)
+                    self.logger.debug("Bloco %s exportado: %s eventos, %s linhas.", run.chunks, event_count, len(rows))
+            writer.close()
+            writer = None
+            if path != '-':
+                os.replace(temp_path, path)
+                run.bytes_written = os.path.getsize(path)
+            run.success = True
+        except Exception as e:
+            self.logger.exception("Erro ao exportar os eventos para %s: %s", path, e)
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            if path != '-' and os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            run.duration = time.perf_counter() - start
+            run.save()
+
+        if not run.success:
+            return None
+        self.logger.info(
+            "Exportação %s (%s%s): %s eventos, %s linhas em %s blocos, %s bytes em %.2fs para %s. "
+            "Marca d'água: %s%s.",
+            name, format, f", {compression}" if compression else "", run.events, run.rows, run.chunks,
+            run.bytes_written, run.duration, path, run.watermark,
+            f" (desde {run.since})" if run.since else ""
+        )
+        return run
@@ -0,0 +1,152 @@
+# src/export/writers.py
+"""
+Escritores dos formatos de exportação. Todos recebem as linhas bloco a bloco
+(`write`), sem nunca ter a exportação inteira em memória:
+
+- ndjson: uma linha JSON por registro, opcionalmente gzip, bz2 ou xz;
+- parquet: um row group por bloco, com compressão por coluna;
+- arrow: arquivo Arrow IPC, um record batch por bloco.
+
+Parquet e Arrow usam o pyarrow, dependência opcional importada só quando
+um desses formatos é pedido.
+"""
+import bz2
+import gzip
+import io
+import json
+import lzma
+import sys
+from datetime import date, datetime
+
+FORMATS = ('ndjson', 'parquet', 'arrow')
+EXTENSIONS = {'ndjson': '.ndjson', 'parquet': '.parquet', 'arrow': '.arrow'}
+COMPRESSIONS = {
+    'ndjson': ('gzip', 'bz2', 'xz'),
+    'parquet': ('snappy', 'zstd', 'gzip', 'lz4', 'brotli'),
+    'arrow': ('zstd', 'lz4'),
+}
+DEFAULT_COMPRESSION = {'ndjson': None, 'parquet': 'zstd', 'arrow': None}
+NDJSON_OPENERS = {'gzip': (gzip.open, '.gz'), 'bz2': (bz2.open, '.bz2'), 'xz': (lzma.open, '.xz')}
+
+# Tipos das colunas exportadas (ver EventExporter.columns).
+INT, FLOAT, STRING, TIMESTAMP = 'int', 'float', 'str', 'timestamp'
+
+
+def check_options(format, compression, path=None):
+    """
+    Valida o formato, a compressão e a saída ('-' = saída padrão). Lança
+    ValueError se a combinação não existe.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {format}. Use um de {', '.join(FORMATS)}.")
+    if compression is not None and compression not in COMPRESSIONS[format]:
+        raise ValueError(f"Compressão {compression} não disponível para {format}. "
+                         f"Use uma de {', '.join(COMPRESSIONS[format])} ou 'none'.")
+    if path == '-' and format != 'ndjson':
+        raise ValueError(f"O formato {format} precisa de um arquivo de saída.")
+
+
+def default_suffix(format, compression):
+    suffix = EXTENSIONS[format]
+    if format == 'ndjson' and compression:
+        suffix += NDJSON_OPENERS[compression][1]
+    return suffix
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Exportar em Parquet ou Arrow requer o pacote pyarrow (pip install pyarrow).") from None
+    return pyarrow
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class NdjsonWriter:
+    def __init__(self, path, columns, compression=None):
+        self.names = [name for name, _ in columns]
+        if path == '-':
+            if compression:
+                opener = NDJSON_OPENERS[compression][0]
+                self.output = opener(sys.stdout.buffer, 'wt', encoding='utf-8')
+            else:
+                self.output = sys.stdout
+            self._owns_output = bool(compression)
+        else:
+            opener = NDJSON_OPENERS[compression][0] if compression else io.open
+            self.output = opener(path, 'wt', encoding='utf-8')
+            self._owns_output = True
+
+    def write(self, rows):
+        names = self.names
+        self.output.writelines(
+            json.dumps(dict(zip(names, row)), ensure_ascii=False, default=_json_default) + '\n'
+            for row in rows
+        )
+
+    def close(self):
+        if self._owns_output:
+            self.output.close()
+        else:
+            self.output.flush()
+
+
+class ArrowTableWriter:
+    """
+    Base dos escritores pyarrow: converte cada bloco de linhas (tuplas) em
+    colunas tipadas pelo schema.
+    """
+
+    def __init__(self, columns):
+        self.pa = import_pyarrow()
+        pa = self.pa
+        types = {INT: pa.int64(), FLOAT: pa.float64(), STRING: pa.string(), TIMESTAMP: pa.timestamp('us')}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+
+    def to_batch(self, rows):
+        columns = list(zip(*rows)) if rows else [[] for _ in self.schema]
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        return self.pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class ParquetWriter(ArrowTableWriter):
+    def __init__(self, path, columns, compression=None):
+        super().__init__(columns)
+        self.writer = self.pa.parquet.ParquetWriter(path, self.schema, compression=compression or 'none')
+
+    def write(self, rows):
+        # Um row group por bloco: leitores podem pular blocos inteiros pelas estatísticas.
+        self.writer.write_batch(self.to_batch(rows), row_group_size=max(len(rows), 1))
+
+    def close(self):
+        self.writer.close()
+
+
+class ArrowWriter(ArrowTableWriter):
+    def __init__(self, path, columns, compression=None):
+        super().__init__(columns)
+        self.sink = self.pa.OSFile(path, 'wb')
+        options = self.pa.ipc.IpcWriteOptions(compression=compression)
+        self.writer = self.pa.ipc.new_file(self.sink, self.schema, options=options)
+
+    def write(self, rows):
+        self.writer.write_batch(self.to_batch(rows))
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+
+
+WRITERS = {'ndjson': NdjsonWriter, 'parquet': ParquetWriter, 'arrow': ArrowWriter}
+
+
+def open_writer(format, path, columns, compression=None):
+    check_options(format, compression, path)
+    return WRITERS[format](path, columns, compression)
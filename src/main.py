@@ -1,9 +1,20 @@
-from src.menu.menu import create_menu
+import sys
 
 
-def main():
+def main(argv=None):
+    """
+    Sem argumentos, abre o menu interativo; com argumentos, executa o
+    subcomando da CLI (ver src/cli.py).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from src.cli import main as cli_main
+        return cli_main(argv)
+
+    # O menu configura o logging na primeira opção escolhida (ver Menu.display).
+    from src.menu.menu import create_menu
     menu = create_menu()
     menu.display()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
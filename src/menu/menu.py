@@ -4,14 +4,40 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 import logging
 import sys
-from src.scraper import scraper  # Importa a função scraper
-from src.queries.database_queries import (
-    get_all_events,
-    get_upcoming_events,
-    get_events_in_rio,
-    get_outdoor_events,
-    get_metadata_per_event
-)
+from src.utils.log_config import setup_logging
+
+# O scraper (requests, aiohttp, bs4) e as consultas (peewee, configurações) são
+# importados dentro de cada opção, na primeira vez que ela é executada: o menu
+# aparece sem esperar por eles.
+
+def print_event(event: dict):
+    """
+    Imprime os campos de um evento retornado pelas consultas.
+    """
+    print(f"Nome: {event['Nome']}")
+    print(f"Tipo: {event['Tipo']}")
+    print(f"Descrição: {event['Descrição']}")
+    print(f"Data: {event['Data']}")
+    print(f"Localização: {event['Localização']}")
+    if 'Tipo de Evento' in event:
+        print(f"Tipo de Evento: {event['Tipo de Evento']}")
+    print("---------------------------")
+
+def print_event_pages(pages, title: str, empty_message: str) -> int:
+    """
+    Imprime os eventos bloco a bloco, à medida que o cursor da consulta os entrega,
+    sem carregar o resultado inteiro em memória. Retorna o total impresso.
+    """
+    total = 0
+    for page in pages:
+        if not total and page:
+            print(f"\n--- {title} ---")
+        for event in page:
+            print_event(event)
+        total += len(page)
+    if not total:
+        print(empty_message)
+    return total
 
 class MenuOption(ABC):
     """
@@ -35,14 +61,22 @@ class MenuOption(ABC):
 class ScraperOption(MenuOption):
     """
     Opção de menu para executar o scraper.
+    Com `full_recrawl=True`, busca todas as janelas de datas, ignorando o modo incremental.
     """
 
+    def __init__(self, full_recrawl: bool = False):
+        self.full_recrawl = full_recrawl
+
     def display_name(self) -> str:
+        if self.full_recrawl:
+            return "Executar Scraper (Re-crawl Completo)"
         return "Executar Scraper"
 
     def execute(self):
-        logging.info("Opção selecionada: Executar Scraper")
-        scraper()
+        from src.scraper import scraper
+
+        logging.info("Opção selecionada: %s", self.display_name())
+        scraper(full_recrawl=True if self.full_recrawl else None)
         logging.info("Scraping concluído. Retornando ao menu principal.")
 
 class ShowAllEventsOption(MenuOption):
@@ -54,19 +88,10 @@ class ShowAllEventsOption(MenuOption):
         return "(QUERY) Mostrar Todos os Eventos"
 
     def execute(self):
+        from src.queries.database_queries import iter_all_events
+
         logging.info("Opção selecionada: Mostrar Todos os Eventos")
-        events = get_all_events()
-        if events:
-            print("\n--- Todos os Eventos ---")
-            for event in events:
-                print(f"Nome: {event['Nome']}")
-                print(f"Tipo: {event['Tipo']}")
-                print(f"Descrição: {event['Descrição']}")
-                print(f"Data: {event['Data']}")
-                print(f"Localização: {event['Localização']}")
-                print("---------------------------")
-        else:
-            print("Nenhum evento encontrado.")
+        print_event_pages(iter_all_events(), "Todos os Eventos", "Nenhum evento encontrado.")
         logging.info("Consulta 'Mostrar Todos os Eventos' concluída.")
 
 class ShowUpcomingEventsOption(MenuOption):
@@ -78,19 +103,11 @@ class ShowUpcomingEventsOption(MenuOption):
         return "(QUERY) Mostrar os 2 Eventos Mais Próximos de Iniciar"
 
     def execute(self):
+        from src.queries.database_queries import get_upcoming_events
+
         logging.info("Opção selecionada: Mostrar os 2 Eventos Mais Próximos de Iniciar")
         events = get_upcoming_events(limit=2)
-        if events:
-            print("\n--- 2 Eventos Mais Próximos de Iniciar ---")
-            for event in events:
-                print(f"Nome: {event['Nome']}")
-                print(f"Tipo: {event['Tipo']}")
-                print(f"Descrição: {event['Descrição']}")
-                print(f"Data: {event['Data']}")
-                print(f"Localização: {event['Localização']}")
-                print("---------------------------")
-        else:
-            print("Nenhum evento próximo encontrado.")
+        print_event_pages([events], "2 Eventos Mais Próximos de Iniciar", "Nenhum evento próximo encontrado.")
         logging.info("Consulta 'Mostrar os 2 Eventos Mais Próximos de Iniciar' concluída.")
 
 class ShowEventsInRioOption(MenuOption):
@@ -102,19 +119,10 @@ class ShowEventsInRioOption(MenuOption):
         return "(QUERY) Mostrar Eventos no Rio de Janeiro"
 
     def execute(self):
+        from src.queries.database_queries import iter_events_in_rio
+
         logging.info("Opção selecionada: Mostrar Eventos no Rio de Janeiro")
-        events = get_events_in_rio()
-        if events:
-            print("\n--- Eventos no Rio de Janeiro ---")
-            for event in events:
-                print(f"Nome: {event['Nome']}")
-                print(f"Tipo: {event['Tipo']}")
-                print(f"Descrição: {event['Descrição']}")
-                print(f"Data: {event['Data']}")
-                print(f"Localização: {event['Localização']}")
-                print("---------------------------")
-        else:
-            print("Nenhum evento encontrado no Rio de Janeiro.")
+        print_event_pages(iter_events_in_rio(), "Eventos no Rio de Janeiro", "Nenhum evento encontrado no Rio de Janeiro.")
         logging.info("Consulta 'Mostrar Eventos no Rio de Janeiro' concluída.")
 
 class ShowOutdoorEventsOption(MenuOption):
@@ -126,20 +134,10 @@ class ShowOutdoorEventsOption(MenuOption):
         return "(QUERY) Mostrar Eventos ao Ar Livre"
 
     def execute(self):
+        from src.queries.database_queries import iter_outdoor_events
+
         logging.info("Opção selecionada: Mostrar Eventos ao Ar Livre")
-        events = get_outdoor_events()
-        if events:
-            print("\n--- Eventos ao Ar Livre ---")
-            for event in events:
-                print(f"Nome: {event['Nome']}")
-                print(f"Tipo: {event['Tipo']}")
-                print(f"Descrição: {event['Descrição']}")
-                print(f"Data: {event['Data']}")
-                print(f"Localização: {event['Localização']}")
-                print(f"Tipo de Evento: {event['Tipo de Evento']}")
-                print("---------------------------")
-        else:
-            print("Nenhum evento ao ar livre encontrado.")
+        print_event_pages(iter_outdoor_events(), "Eventos ao Ar Livre", "Nenhum evento ao ar livre encontrado.")
         logging.info("Consulta 'Mostrar Eventos ao Ar Livre' concluída.")
 
 class ShowMetadataPerEventOption(MenuOption):
@@ -151,19 +149,40 @@ class ShowMetadataPerEventOption(MenuOption):
         return "(QUERY) Mostrar Metadados por Evento"
 
     def execute(self):
+        from src.queries.database_queries import iter_metadata_per_event
+
         logging.info("Opção selecionada: Mostrar Metadados por Evento")
-        metadata = get_metadata_per_event()
-        if metadata:
-            print("\n--- Metadados por Evento ---")
-            for event_name, metas in metadata.items():
+        total = 0
+        for page in iter_metadata_per_event():
+            if not total and page:
+                print("\n--- Metadados por Evento ---")
+            for event_name, metas in page:
                 print(f"Evento: {event_name}")
                 for key, value in metas.items():
                     print(f"  {key}: {value}")
                 print("---------------------------")
-        else:
+            total += len(page)
+        if not total:
             print("Nenhum metadado encontrado.")
         logging.info("Consulta 'Mostrar Metadados por Evento' concluída.")
 
+class SearchEventsOption(MenuOption):
+    """
+    Opção de menu para buscar eventos por texto livre (nome, descrição ou localização).
+    """
+
+    def display_name(self) -> str:
+        return "(QUERY) Buscar Eventos por Texto"
+
+    def execute(self):
+        from src.queries.database_queries import search_events
+
+        logging.info("Opção selecionada: Buscar Eventos por Texto")
+        text = input("Digite os termos da busca: ").strip()
+        events = search_events(text) if text else []
+        print_event_pages([events], f"Resultados para '{text}'", "Nenhum evento encontrado para a busca.")
+        logging.info("Consulta 'Buscar Eventos por Texto' concluída.")
+
 class PlaceholderOption(MenuOption):
     """
     Opção de menu sem funcionalidade implementada.
@@ -176,7 +195,7 @@ class PlaceholderOption(MenuOption):
         return self._name
 
     def execute(self):
-        logging.info(f"Opção selecionada: {self._name}")
+        logging.info("Opção selecionada: %s", self._name)
         print(f"A opção '{self._name}' ainda não está implementada.")
         logging.info("Retornando ao menu principal.")
 
@@ -207,7 +226,7 @@ class Menu:
         Adiciona uma opção ao menu.
         """
         self.options.append(option)
-        self.logger.debug(f"Opção adicionada: {option.display_name()}")
+        self.logger.debug("Opção adicionada: %s", option.display_name())
 
     def display(self):
         """
@@ -223,6 +242,8 @@ class Menu:
                 choice = int(input("Selecione uma opção: "))
                 if 1 <= choice <= len(self.options):
                     selected_option = self.options[choice - 1]
+                    # O logging (e com ele as configurações) só é carregado na primeira escolha.
+                    setup_logging()
                     selected_option.execute()
                 else:
                     print("Opção inválida. Por favor, tente novamente.")
@@ -244,5 +265,7 @@ def create_menu() -> Menu:
     menu.add_option(ShowOutdoorEventsOption())
     menu.add_option(ShowMetadataPerEventOption())
     menu.add_option(PlaceholderOption("Ver Logs"))  # Exemplo de opção sem implementação
+    menu.add_option(ScraperOption(full_recrawl=True))
+    menu.add_option(SearchEventsOption())
     menu.add_option(ExitOption())
     return menu
@@ -0,0 +1,257 @@
+import ast
+import hashlib
+import json
+import re
+
+# Campos normalizados de um local (tabela venue), na ordem usada pela chave.
+VENUE_FIELDS = ('name', 'street', 'neighborhood', 'city', 'region', 'postal_code', 'country')
+
+# Valores que o pipeline grava quando o JSON-LD não traz local ou endereço.
+MISSING_VALUES = ('', 'None', 'Desconhecido')
+
+# CEP, com ou sem o rótulo "CEP:", inclusive truncado ("22050-01").
+_POSTAL_CODE_RE = re.compile(r'(?:\bCEP\s*:?\s*)?\b(\d{5}-\d{1,3}|\d{8})(?!\d)', re.IGNORECASE)
+_REGION_RE = re.compile(r'(?:^|[\s,\-–/|])([A-Z]{2})\s*$')
+# Separadores entre logradouro, bairro e cidade: " - ", " – " e "|".
+_SEGMENT_SEPARATOR_RE = re.compile(r'\s+[-–]\s+|\s*\|\s*')
+_STREET_RE = re.compile(
+    r'^(rua|r\.|av\.?|avenida|estrada|estr\.|rodovia|rod\.|praça|pça\.?|largo|travessa|tv\.|alameda|al\.|'
+    r'ladeira|beco|via|km)\b', re.IGNORECASE)
+_STREET_NUMBER_RE = re.compile(r'^(\d+[A-Za-z]?)\s+(.+)$')
+_COUNTRIES = ('brasil', 'brazil', 'br')
+# Caracteres descartados nas pontas de cada trecho.
+_STRIP = ' ,-–|'
+
+# UF de cada estado escrito por extenso ("..., Rio de Janeiro - Rio de Janeiro").
+STATES = {
+    'acre': 'AC', 'alagoas': 'AL', 'amapá': 'AP', 'amazonas': 'AM', 'bahia': 'BA', 'ceará': 'CE',
+    'distrito federal': 'DF', 'espírito santo': 'ES', 'goiás': 'GO', 'maranhão': 'MA', 'mato grosso': 'MT',
+    'mato grosso do sul': 'MS', 'minas gerais': 'MG', 'pará': 'PA', 'paraíba': 'PB', 'paraná': 'PR',
+    'pernambuco': 'PE', 'piauí': 'PI', 'rio de janeiro': 'RJ', 'rio grande do norte': 'RN',
+    'rio grande do sul': 'RS', 'rondônia': 'RO', 'roraima': 'RR', 'santa catarina': 'SC', 'são paulo': 'SP',
+    'sergipe': 'SE', 'tocantins': 'TO',
+}
+# Cidades reconhecidas mesmo sem vírgula antes delas ("210 Maracanã Rio de
+# Janeiro, RJ"), gravadas com esta grafia. Os sites MEC raspados listam
+# eventos do estado do Rio; as capitais cobrem o resto.
+KNOWN_CITIES = (
+    'Rio de Janeiro', 'Niterói', 'São Gonçalo', 'Duque de Caxias', 'Nova Iguaçu', 'São João de Meriti',
+    'Belford Roxo', 'Mesquita', 'Nilópolis', 'Queimados', 'Itaboraí', 'Maricá', 'Magé', 'Petrópolis',
+    'Teresópolis', 'Nova Friburgo', 'Volta Redonda', 'Barra Mansa', 'Resende', 'Angra dos Reis', 'Paraty',
+    'Cabo Frio', 'Búzios', 'Armação dos Búzios', 'Arraial do Cabo', 'Rio das Ostras', 'Macaé',
+    'Campos dos Goytacazes', 'São Paulo', 'Belo Horizonte', 'Vitória', 'Curitiba', 'Florianópolis',
+    'Porto Alegre', 'Brasília', 'Salvador', 'Recife', 'Fortaleza', 'Belém', 'Manaus',
+)
+# Mais longas primeiro: "Armação dos Búzios" antes de "Búzios".
+_CITIES_BY_LENGTH = sorted(KNOWN_CITIES, key=len, reverse=True)
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = ' '.join(str(value).split()).strip(_STRIP)
+    return None if value in MISSING_VALUES else value
+
+
+def parse_postal_address(address):
+    """
+    Lê um `PostalAddress` do schema.org (dicionário do JSON-LD).
+    """
+    locality = _clean(address.get('addressLocality'))
+    return {
+        'street': _clean(address.get('streetAddress')),
+        'neighborhood': None,
+        'city': locality,
+        'region': _clean(address.get('addressRegion')),
+        'postal_code': _clean(address.get('postalCode')),
+        'country': _clean(address.get('addressCountry')),
+    }
+
+
+def _looks_like_street(piece):
+    """
+    Um trecho com número ou que começa com um tipo de logradouro ("Rua",
+    "Av.", "Praça"...) é parte do logradouro, não um bairro ou uma cidade.
+    """
+    return any(char.isdigit() for char in piece) or bool(_STREET_RE.match(piece))
+
+
+def _known_city(piece):
+    """
+    Se `piece` termina com uma cidade de KNOWN_CITIES (sem diferenciar
+    maiúsculas), retorna (o que vem antes, a cidade com a grafia da lista).
+    """
+    folded = piece.casefold()
+    for city in _CITIES_BY_LENGTH:
+        name = city.casefold()
+        if folded == name:
+            return '', city
+        if folded.endswith(' ' + name):
+            return piece[:-len(name)].strip(_STRIP), city
+    return None
+
+
+def _is_known_city(piece):
+    known = _known_city(piece)
+    return known is not None and not known[0]
+
+
+def canonical_city(name):
+    """
+    Grafia de KNOWN_CITIES para `name` ("RIO DE JANEIRO", "niterói"), ou o
+    próprio nome se a cidade não está na lista.
+    """
+    known = _known_city(name)
+    return known[1] if known is not None and not known[0] else name
+
+
+def _state_segment(segments):
+    """
+    UF do último trecho, se ele é um estado por extenso. "Rio de Janeiro" e
+    "São Paulo" também são cidades: só contam como estado depois de uma
+    cidade ("Rua X, 20, Rio de Janeiro - Rio de Janeiro"), não depois de um
+    bairro ("Cosme Velho – Rio de Janeiro") ou de um logradouro.
+    """
+    state = STATES.get(segments[-1].casefold())
+    if state is None:
+        return None
+    if segments[-1].casefold() not in (city.casefold() for city in KNOWN_CITIES):
+        return state
+    return state if _is_known_city(segments[-2].split(',')[-1].strip()) else None
+
+
+def _split_known_city(fields):
+    """
+    Separa a cidade quando ela vem colada ao bairro, sem vírgula ("Botafogo
+    Rio de Janeiro", "210 Maracanã Rio de Janeiro"), ou ao logradouro
+    ("Rua X Glória Macaé"). Um número no início do que sobra é o número do
+    logradouro; o resto é o bairro.
+    """
+    source = 'city' if fields['city'] else 'street'
+    if not fields[source]:
+        return
+    known = _known_city(fields[source])
+    if known is None:
+        return
+    prefix, fields['city'] = known
+    if source == 'street':
+        fields['street'] = prefix or None
+        return
+    number = _STREET_NUMBER_RE.match(prefix)
+    if number and fields['street']:
+        fields['street'] = f"{fields['street']}, {number.group(1)}"
+        prefix = number.group(2)
+    if prefix and not fields['neighborhood'] and not _looks_like_street(prefix):
+        fields['neighborhood'] = prefix
+    elif prefix:
+        fields['street'] = ', '.join(part for part in (fields['street'], prefix) if part)
+
+
+def parse_address_text(text):
+    """
+    Lê um endereço em texto livre no formato usual dos sites brasileiros:
+    "Rua X, 123 - Bairro, Cidade - UF, 00000-000, Brasil", e as variações
+    encontradas nos sites raspados: trechos separados por "–" ou "|", a UF
+    por extenso, o CEP com rótulo ou truncado e a cidade colada ao bairro
+    ("Botafogo Rio de Janeiro, RJ"). Campos que não puderem ser
+    identificados ficam None.
+    """
+    fields = dict.fromkeys(('street', 'neighborhood', 'city', 'region', 'postal_code', 'country'))
+    text = _clean(text)
+    if not text:
+        return fields
+
+    postal_code = _POSTAL_CODE_RE.search(text)
+    if postal_code:
+        fields['postal_code'] = postal_code.group(1)
+        text = (text[:postal_code.start()] + ' ' + text[postal_code.end():])
+    text = text.strip(_STRIP)
+
+    parts = [part.strip() for part in text.split(',')]
+    if len(parts) > 1 and parts[-1].lower() in _COUNTRIES:
+        fields['country'] = parts.pop()
+        text = ', '.join(parts).strip(_STRIP)
+
+    region = _REGION_RE.search(text)
+    if region:
+        fields['region'] = region.group(1)
+        text = text[:region.start()].strip(_STRIP)
+
+    segments = [segment.strip(_STRIP) for segment in _SEGMENT_SEPARATOR_RE.split(text)]
+    segments = [segment for segment in segments if segment]
+    if not segments:
+        return fields
+    if not fields['region'] and len(segments) > 1:
+        fields['region'] = _state_segment(segments)
+        if fields['region']:
+            segments.pop()
+
+    if len(segments) == 1:
+        # Sem " - ": com a UF, o último trecho de "Rua X, 123, Cidade" é a
+        # cidade; sem ela (ou com um trecho só), só se não parecer logradouro
+        # ("Rio de Janeiro", "Centro, Rio de Janeiro"). O que sobra sem número
+        # nem tipo de logradouro é o bairro.
+        pieces = [piece.strip() for piece in segments[0].split(',') if piece.strip()]
+        if (fields['region'] and len(pieces) > 1) or not _looks_like_street(pieces[-1]):
+            fields['city'] = pieces.pop()
+        if len(pieces) == 1 and fields['city'] and not _looks_like_street(pieces[0]):
+            fields['neighborhood'] = pieces.pop()
+        fields['street'] = ', '.join(pieces) or None
+        _split_known_city(fields)
+        return fields
+
+    fields['street'] = segments[0]
+    tail = [piece.strip() for piece in segments[-1].split(',') if piece.strip()]
+    if len(tail) > 1:
+        fields['neighborhood'] = ', '.join(tail[:-1])
+        fields['city'] = tail[-1]
+    elif fields['region'] or (tail and _is_known_city(tail[0])):
+        fields['city'] = tail[0] if tail else None
+        if len(segments) > 2:
+            fields['neighborhood'] = segments[-2]
+    else:
+        fields['neighborhood'] = tail[0] if tail else None
+    _split_known_city(fields)
+    return fields
+
+
+def parse_venue(location, address):
+    """
+    Normaliza o par (nome do local, endereço) extraído do JSON-LD em um
+    dicionário com os campos de VENUE_FIELDS e a chave `key` que identifica o local.
+    """
+    if isinstance(address, dict):
+        fields = parse_postal_address(address)
+    else:
+        fields = parse_address_text(address)
+    fields['name'] = _clean(location)
+    fields['key'] = venue_key(fields)
+    return fields
+
+
+def venue_key(fields):
+    """
+    sha1 dos campos normalizados (sem diferenciar maiúsculas), usado como chave única do local.
+    """
+    content = json.dumps([(fields.get(field) or '').lower() for field in VENUE_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def split_location_text(text):
+    """
+    Separa o texto gravado em event_data.location ("<local>, <endereço>",
+    ver DatabasePipeline.format_location) de volta em (local, endereço).
+    Endereços gravados como repr de um dicionário são convertidos de volta.
+    Usado apenas para preencher a tabela venue a partir de linhas antigas.
+    """
+    text = text or ''
+    if ', {' in text:
+        location, _, raw_address = text.partition(', {')
+        try:
+            address = ast.literal_eval('{' + raw_address)
+            if isinstance(address, dict):
+                return location, address
+        except (ValueError, SyntaxError):
+            pass
+    location, _, address = text.partition(', ')
+    return location, address
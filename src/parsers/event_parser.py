@@ -1,25 +1,92 @@
 from bs4 import BeautifulSoup
+from src.config import settings
+from src.parsers.jsonld_extractor import extract_jsonld_blocks
+from src.utils.metrics import PARSE_SECONDS, EVENTS_PARSED
 import logging
 import json
+import sys
+import time
+from typing import Any, NamedTuple, Optional
+
+def intern_value(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class ParsedEvent(NamedTuple):
+    """
+    Evento extraído de um objeto JSON-LD. Uma tupla nomeada, sem dicionário
+    por instância: vai para o pool de parse (pickle) e para a fila de
+    trabalho (JSON) como uma tupla simples na ordem de EVENT_FIELDS.
+    """
+    name: str
+    type: str
+    description: Optional[str]
+    start_date: str
+    end_date: Optional[str]
+    location: Optional[str]
+    address: Any  # texto ou PostalAddress (dicionário)
+    image: Any
+    url: Optional[str]
+    price: Any  # número ou texto ("Grátis")
+    price_currency: Optional[str]
+    availability: Optional[str]
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Recria o evento de uma sequência na ordem de EVENT_FIELDS (resultado
+        do pool de parse ou da fila de trabalho). Tipo, local, moeda e
+        disponibilidade têm poucos valores distintos, repetidos em milhares de
+        eventos: são internados (sys.intern), e cada valor fica uma única vez
+        em memória.
+        """
+        (name, event_type, description, start_date, end_date, location,
+         address, image, url, price, price_currency, availability) = record
+        return cls(name, intern_value(event_type), description, start_date, end_date, intern_value(location),
+                   address, image, url, price, intern_value(price_currency), intern_value(availability))
+
+
+# Campos de cada evento extraído, na ordem usada pelos registros compactos.
+EVENT_FIELDS = ParsedEvent._fields
 
 class EventParser:
-    def __init__(self):
-        logging.basicConfig(level=logging.INFO)
+    def __init__(self, engine=settings.parser_engine):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.engine = engine
+
+    def extract_jsonld_scripts(self, html_content):
+        """
+        Retorna o texto de cada script JSON-LD do HTML.
+        O motor 'fast' fatia os scripts direto do texto; 'soup' monta a árvore
+        completa com BeautifulSoup e também serve de fallback.
+        """
+        if self.engine == 'fast':
+            try:
+                return extract_jsonld_blocks(html_content)
+            except Exception as e:
+                self.logger.warning("Falha no extrator rápido de JSON-LD, usando BeautifulSoup: %s", e)
+        return self.extract_jsonld_scripts_soup(html_content)
+
+    def extract_jsonld_scripts_soup(self, html_content):
+        """
+        Caminho original: monta a árvore completa do HTML com BeautifulSoup.
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return [script.string for script in soup.find_all('script', type='application/ld+json')]
         
     def parse_events_from_html(self, html_content):
         """
         Extrai eventos dos scripts JSON-LD presentes no conteúdo HTML.
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        scripts = soup.find_all('script', type='application/ld+json')
+        start = time.perf_counter()
+        scripts = self.extract_jsonld_scripts(html_content)
         events = []
 
-        self.logger.info(f"Encontrados {len(scripts)} scripts JSON-LD")
+        self.logger.debug("Encontrados %s scripts JSON-LD", len(scripts))
 
         for script in scripts:
             try:
-                data = json.loads(script.string)
+                data = json.loads(script)
                 # Verifica se o script descreve um Evento
                 if isinstance(data, list):
                     for item in data:
@@ -32,18 +99,21 @@ class EventParser:
                     if event:
                         events.append(event)
             except json.JSONDecodeError as e:
-                self.logger.warning(f"Erro ao decodificar JSON-LD: {e}")
+                self.logger.warning("Erro ao decodificar JSON-LD: %s", e)
                 continue
             except Exception as e:
-                self.logger.error(f"Erro ao processar JSON-LD: {e}")
+                self.logger.error("Erro ao processar JSON-LD: %s", e)
                 continue
 
-        self.logger.info(f"{len(events)} eventos extraídos dos scripts JSON-LD.")
+        PARSE_SECONDS.observe(time.perf_counter() - start)
+        EVENTS_PARSED.inc(len(events))
+        self.logger.debug("%s eventos extraídos dos scripts JSON-LD.", len(events))
         return events
     
     def extract_event_data(self, data):
         """
         Extrai informações relevantes de um objeto JSON-LD de tipo 'Event'.
+        Retorna um ParsedEvent, ou None se faltam campos obrigatórios.
         """
         try:
             name = data.get('name')
@@ -62,25 +132,15 @@ class EventParser:
 
             # Validação dos campos obrigatórios
             if not all([name, event_type, start_date]):
-                self.logger.warning(f"Evento incompleto: {data}")
+                self.logger.warning("Evento incompleto ignorado: %s", name or "(sem nome)")
                 return None
 
-            event = {
-                'name': name,
-                'type': event_type,
-                'description': description,
-                'start_date': start_date,
-                'end_date': end_date,
-                'location': location,
-                'address': address,
-                'image': image,
-                'url': url,
-                'price': price,
-                'price_currency': price_currency,
-                'availability': availability
-            }
-            self.logger.debug(f"Evento extraído: {event}")
+            event = ParsedEvent.from_record((
+                name, event_type, description, start_date, end_date, location,
+                address, image, url, price, price_currency, availability,
+            ))
+            self.logger.debug("Evento extraído: %s", name)
             return event
         except Exception as e:
-            self.logger.error(f"Erro ao extrair dados do evento: {e}")
+            self.logger.error("Erro ao extrair dados do evento: %s", e)
             return None
\ No newline at end of file
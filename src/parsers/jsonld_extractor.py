@@ -0,0 +1,52 @@
+import re
+
+# Uma única varredura encontra comentários HTML (para ignorá-los) e tags <script> de abertura.
+_TOKEN_RE = re.compile(r'<!--.*?-->|<script\b([^>]*)>', re.IGNORECASE | re.DOTALL)
+_SCRIPT_END_RE = re.compile(r'</script\s*>', re.IGNORECASE)
+_TYPE_ATTR_RE = re.compile(
+    r'''(?:^|\s)type\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''',
+    re.IGNORECASE,
+)
+
+JSONLD_TYPE = 'application/ld+json'
+
+
+def _script_type(attrs):
+    match = _TYPE_ATTR_RE.search(attrs)
+    if not match:
+        return None
+    return next(group for group in match.groups() if group is not None)
+
+
+def extract_jsonld_blocks(html_content):
+    """
+    Retorna o conteúdo bruto de cada <script type="application/ld+json">,
+    na ordem do documento, sem montar a árvore HTML.
+
+    O HTML é percorrido uma única vez: cada tag <script> de abertura é
+    localizada por expressão regular e o corpo é fatiado até o </script>
+    correspondente. Comentários HTML são saltados, como faz o BeautifulSoup.
+    """
+    blocks = []
+    if not html_content:
+        return blocks
+
+    position = 0
+    while True:
+        match = _TOKEN_RE.search(html_content, position)
+        if match is None:
+            break
+
+        if match.group(0).startswith('<!--'):
+            position = match.end()
+            continue
+
+        body_start = match.end()
+        end = _SCRIPT_END_RE.search(html_content, body_start)
+        body_end = end.start() if end else len(html_content)
+        position = end.end() if end else len(html_content)
+
+        if _script_type(match.group(1) or '') == JSONLD_TYPE:
+            blocks.append(html_content[body_start:body_end])
+
+    return blocks
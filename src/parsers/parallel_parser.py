@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from src.config import settings
+from src.parsers.event_parser import EventParser, ParsedEvent
+from src.utils.metrics import PARSE_SECONDS, EVENTS_PARSED
+from src.utils.log_config import active_log_file, setup_worker_logging
+
+# Parser de cada processo worker, criado uma única vez pelo initializer do pool.
+_worker_parser = None
+
+
+def _init_worker(engine, log_file):
+    global _worker_parser
+    setup_worker_logging(log_file)
+    _worker_parser = EventParser(engine=engine)
+
+
+def parse_html_records(html_content):
+    """
+    Executado no worker: extrai os eventos do HTML e os devolve como tuplas
+    na ordem de EVENT_FIELDS, junto com a duração do parse, que as métricas
+    do worker não levam de volta. Retorna (duração, registros).
+    """
+    start = time.perf_counter()
+    events = _worker_parser.parse_events_from_html(html_content)
+    return time.perf_counter() - start, [tuple(event) for event in events]
+
+
+def records_to_events(result):
+    """
+    Converte o retorno de parse_html_records em ParsedEvent, registrando a
+    duração e a contagem do parse nas métricas do processo principal. As
+    strings chegam do worker como cópias novas; from_record volta a interná-las.
+    """
+    elapsed, records = result
+    PARSE_SECONDS.observe(elapsed)
+    EVENTS_PARSED.inc(len(records))
+    return [ParsedEvent.from_record(record) for record in records]
+
+
+class ParallelEventParser:
+    """
+    Estágio de parse que distribui o HTML bruto entre processos worker.
+    Os workers só fazem parse; o processo principal recebe os registros e
+    continua sendo o único a escrever no SQLite.
+    """
+
+    def __init__(self, parser=None, workers=settings.parser_workers):
+        self.parser = parser or EventParser()
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.logger.info("Iniciando pool de parse com %s processos.", self.workers)
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.parser.engine, active_log_file()),
+            )
+        return self.executor
+
+    def parse_many(self, items, html_of=lambda item: item, max_pending=None):
+        """
+        Faz o parse de cada item do iterável, mantendo no máximo `max_pending`
+        páginas em andamento nos workers. Gera (item, events) na ordem de entrada.
+        Itens para os quais `html_of` retorna None passam direto, com events None.
+        Com um único worker o parse acontece no próprio processo.
+        """
+        if self.workers == 1:
+            for item in items:
+                html_content = html_of(item)
+                yield item, None if html_content is None else self.parser.parse_events_from_html(html_content)
+            return
+
+        executor = self._get_executor()
+        max_pending = max_pending or self.workers * 2
+        pending = deque()
+
+        def result(future):
+            return None if future is None else records_to_events(future.result())
+
+        for item in items:
+            html_content = html_of(item)
+            future = None if html_content is None else executor.submit(parse_html_records, html_content)
+            pending.append((item, future))
+            if len(pending) >= max_pending:
+                head, future = pending.popleft()
+                yield head, result(future)
+
+        while pending:
+            head, future = pending.popleft()
+            yield head, result(future)
+
+    async def parse_async(self, html_content):
+        """
+        Versão assíncrona: o parse roda no pool sem bloquear o event loop.
+        """
+        if self.workers == 1:
+            return self.parser.parse_events_from_html(html_content)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._get_executor(), parse_html_records, html_content)
+        return records_to_events(result)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
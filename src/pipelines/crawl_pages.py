@@ -0,0 +1,50 @@
+# src/pipelines/crawl_pages.py
+from src.db.models.crawl_page import CrawlPage
+from datetime import datetime
+
+# start_date da página inicial de cada site, nos jobs da fila e em crawl_page.
+INITIAL_PAGE = ''
+
+
+def _page(site, start_date, offset):
+    return (CrawlPage.site == site) & (CrawlPage.start_date == start_date) & (CrawlPage.offset == offset)
+
+
+def page_persisted(site, start_date, offset, content_hash):
+    """
+    True se os eventos desta página, com exatamente este conteúdo, já estão
+    gravados no banco, e ela pode pular o parse. Só o registro em crawl_page
+    confirma isso: o cache HTTP dizer que a resposta não mudou não basta,
+    porque o cache é gravado na busca, antes (ou sem) os eventos chegarem
+    ao banco, e sobrevive a um banco novo.
+    """
+    if content_hash is None:
+        return False
+    return CrawlPage.select().where(_page(site, start_date, offset) & (CrawlPage.content_hash == content_hash)).exists()
+
+
+def record_persisted_page(site, start_date, offset, content_hash):
+    """
+    Registra que os eventos da página foram gravados. Deve ser chamado na
+    mesma transação que grava os eventos. Sem `content_hash` (a página veio
+    de um crawler que não o calcula), o registro anterior da página é
+    apagado: ele descreveria um conteúdo que não é mais o gravado.
+    """
+    if content_hash is None:
+        CrawlPage.delete().where(_page(site, start_date, offset)).execute()
+        return
+    (CrawlPage
+     .insert(site=site, start_date=start_date, offset=offset, content_hash=content_hash,
+             persisted_at=datetime.utcnow())
+     .on_conflict(
+         conflict_target=[CrawlPage.site, CrawlPage.start_date, CrawlPage.offset],
+         preserve=[CrawlPage.content_hash, CrawlPage.persisted_at])
+     .execute())
+
+
+def forget_persisted_pages():
+    """
+    Esquece as páginas gravadas, para que um re-crawl completo faça o parse
+    de todas elas. Retorna o número de registros apagados.
+    """
+    return CrawlPage.delete().execute()
@@ -0,0 +1,195 @@
+# src/pipelines/crawl_state.py
+from src.db.models.crawl_window import CrawlWindow
+from src.db.models.scrape_run import ScrapeRun
+from src.pipelines.crawl_pages import INITIAL_PAGE, page_persisted, record_persisted_page
+from src.config import settings
+from peewee import fn
+import logging
+from datetime import datetime, timedelta
+
+class CrawlState:
+    """
+    Registra quais janelas de datas e offsets já foram buscados e gravados, e
+    quando. No modo incremental, janelas completas e mais novas que
+    `settings.crawler_refresh_hours` não são buscadas de novo.
+
+    Cada página gravada é também um checkpoint da execução atual (`run`):
+    guarda o offset da página seguinte, e uma execução que retoma outra
+    interrompida continua cada janela desse ponto, sem buscar nem fazer o
+    parse das páginas já gravadas.
+
+    Páginas buscadas de novo cujo corpo tem o mesmo hash registrado em
+    crawl_page (ver page_unchanged) também não passam pelo parse.
+    """
+
+    def __init__(self, refresh_hours=settings.crawler_refresh_hours, site=None):
+        self.refresh_interval = timedelta(hours=refresh_hours)
+        self.site = site or settings.targets[0]
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.run = None
+        self.resumed_runs = []  # ids das execuções interrompidas sendo retomadas
+        self.checkpoints = {}  # date_str -> (próximo offset, páginas já gravadas)
+        self.completed_windows = set()  # janelas concluídas pelas execuções retomadas
+        self.initial_page_done = False
+        self.content_hashes = {}  # (date_str, offset) -> hash do corpo, até record_page
+
+    def fresh_windows(self, date_windows):
+        """
+        Retorna o conjunto das janelas completas buscadas dentro do intervalo de atualização.
+        """
+        cutoff = datetime.utcnow() - self.refresh_interval
+        query = (CrawlWindow
+                 .select(CrawlWindow.start_date)
+                 .where(CrawlWindow.start_date.in_(list(date_windows)))
+                 .group_by(CrawlWindow.start_date)
+                 .having(
+                     (fn.MIN(CrawlWindow.window_complete) == 1) &
+                     (fn.MIN(CrawlWindow.fetched_at) >= cutoff))
+                 .tuples())
+        return {start_date for (start_date,) in query}
+
+    def interrupted_run(self):
+        """
+        Retorna a última execução se ela não terminou com sucesso (erro,
+        Ctrl+C ou processo encerrado no meio) e começou dentro do intervalo
+        de atualização; senão None. Checkpoints mais antigos já venceram.
+        """
+        cutoff = datetime.utcnow() - self.refresh_interval
+        last_run = ScrapeRun.select().order_by(ScrapeRun.id.desc()).first()
+        if last_run is None or last_run.success or last_run.started_at < cutoff:
+            return None
+        return last_run
+
+    def begin_run(self, run, resumed=None):
+        """
+        Associa o estado à execução `run` e, se ela retoma a execução
+        `resumed`, carrega os checkpoints de toda a cadeia de execuções
+        interrompidas (uma execução retomada também pode ter sido retomada).
+        """
+        self.run = run
+        self.resumed_runs = []
+        while resumed is not None and resumed.id not in self.resumed_runs:
+            self.resumed_runs.append(resumed.id)
+            resumed = ScrapeRun.get_or_none(ScrapeRun.id == resumed.resumed_from_id)
+        if self.resumed_runs:
+            self.load_checkpoints()
+
+    def load_checkpoints(self):
+        cutoff = datetime.utcnow() - self.refresh_interval
+        self.initial_page_done = (ScrapeRun
+                                  .select()
+                                  .where(ScrapeRun.id.in_(self.resumed_runs) & ScrapeRun.initial_page_done)
+                                  .exists())
+
+        pages = {}
+        query = (CrawlWindow
+                 .select(CrawlWindow.start_date, CrawlWindow.next_offset, CrawlWindow.fetched_at,
+                         CrawlWindow.window_complete)
+                 .where(CrawlWindow.run.in_(self.resumed_runs))
+                 .order_by(CrawlWindow.start_date, CrawlWindow.offset)
+                 .tuples())
+        for start_date, next_offset, fetched_at, window_complete in query:
+            pages.setdefault(start_date, []).append((next_offset, fetched_at, window_complete))
+
+        self.checkpoints = {}
+        self.completed_windows = set()
+        for start_date, rows in pages.items():
+            if any(window_complete for _, _, window_complete in rows):
+                self.completed_windows.add(start_date)
+            elif min(fetched_at for _, fetched_at, _ in rows) >= cutoff:
+                self.checkpoints[start_date] = (rows[-1][0], len(rows))
+
+    def windows_to_fetch(self, date_windows, full=False):
+        """
+        Filtra as janelas que precisam ser buscadas: todas em um re-crawl
+        completo, ou só as novas e vencidas no modo incremental. Ao retomar
+        uma execução, também ficam de fora as janelas que ela já concluiu.
+        """
+        if full:
+            self.logger.info("Re-crawl completo: %s janelas serão buscadas.", len(date_windows))
+            pending = list(date_windows)
+        else:
+            fresh = self.fresh_windows(date_windows)
+            pending = [date_str for date_str in date_windows if date_str not in fresh]
+            self.logger.info(
+                "Modo incremental: %s janelas novas ou vencidas, "
+                "%s atualizadas há menos de %s.",
+                len(pending), len(fresh), self.refresh_interval
+            )
+
+        if not self.resumed_runs:
+            return pending
+
+        pending = [date_str for date_str in pending if date_str not in self.completed_windows]
+        for date_str in [date_str for date_str in pending if date_str in self.checkpoints]:
+            next_offset, _ = self.checkpoints[date_str]
+            if next_offset is None:
+                # A última página da janela foi gravada; só faltou marcá-la como completa.
+                self.complete_window(date_str)
+                pending.remove(date_str)
+        self.logger.info(
+            "Retomando a execução %s: %s janelas já concluídas, %s continuam do último checkpoint.",
+            self.resumed_runs[0], len(self.completed_windows),
+            sum(1 for date_str in pending if date_str in self.checkpoints)
+        )
+        return pending
+
+    def resume_point(self, date_str):
+        """
+        Retorna (offset, páginas já gravadas) de onde a busca da janela deve
+        começar: (0, 0), ou o checkpoint de uma execução interrompida.
+        """
+        return self.checkpoints.get(date_str, (0, 0))
+
+    def start_window(self, date_str):
+        """
+        Descarta o registro anterior da janela antes de buscá-la de novo, para que
+        uma busca interrompida nunca pareça completa. Janelas retomadas de um
+        checkpoint mantêm as páginas já gravadas.
+        """
+        if date_str in self.checkpoints:
+            return
+        CrawlWindow.delete().where(CrawlWindow.start_date == date_str).execute()
+
+    def page_unchanged(self, date_str, offset, content_hash):
+        """
+        Guarda o hash do corpo da página buscada (gravado por record_page) e
+        diz se os eventos desse mesmo conteúdo já estão no banco, caso em que
+        a página pode pular o parse. `date_str` INITIAL_PAGE é a página inicial.
+        """
+        self.content_hashes[(date_str, offset)] = content_hash
+        return page_persisted(self.site, date_str, offset, content_hash)
+
+    def record_page(self, date_str, offset, event_count, next_offset=None):
+        """
+        Registra a página como gravada. Chamado na mesma transação que grava
+        os eventos da página, para que o checkpoint nunca fique à frente dos dados.
+        """
+        record_persisted_page(self.site, date_str, offset, self.content_hashes.pop((date_str, offset), None))
+        (CrawlWindow
+         .insert(start_date=date_str, offset=offset, event_count=event_count, next_offset=next_offset,
+                 run=self.run, fetched_at=datetime.utcnow())
+         .on_conflict(
+             conflict_target=[CrawlWindow.start_date, CrawlWindow.offset],
+             preserve=[CrawlWindow.event_count, CrawlWindow.next_offset, CrawlWindow.run, CrawlWindow.fetched_at])
+         .execute())
+
+    def record_initial_page(self):
+        """
+        Checkpoint da página inicial: uma execução que retoma esta não a busca de novo.
+        """
+        record_persisted_page(self.site, INITIAL_PAGE, 0, self.content_hashes.pop((INITIAL_PAGE, 0), None))
+        if self.run is not None:
+            ScrapeRun.update(initial_page_done=True).where(ScrapeRun.id == self.run.id).execute()
+
+    def complete_window(self, date_str):
+        """
+        Marca a janela como completa depois que todas as suas páginas foram gravadas.
+        """
+        updated = (CrawlWindow
+                   .update(window_complete=True)
+                   .where(CrawlWindow.start_date == date_str)
+                   .execute())
+        if not updated:
+            # Janela sem nenhuma página: registra que foi buscada e estava vazia.
+            CrawlWindow.create(start_date=date_str, offset=0, event_count=0, window_complete=True, run=self.run)
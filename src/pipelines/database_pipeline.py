@@ -2,110 +2,449 @@
 from src.db.models.event import Event
 from src.db.models.event_data import EventData
 from src.db.models.metadata import Metadata
-from peewee import IntegrityError
+from src.db.models.event_details import EventDetails
+from src.config import settings
+from src.db.database import insert_chunks
+from src.pipelines.identity_map import EventIdentityMap
+from src.pipelines.venues import resolve_venue_ids
+from src.pipelines.details import DETAIL_FIELDS, parse_price
+from src.queries.query_cache import query_cache
+from src.parsers.address_parser import parse_venue
+from src.utils.metrics import WRITE_SECONDS, EVENTS_WRITTEN, ROWS_WRITTEN
+from peewee import IntegrityError, EXCLUDED, chunked
+from collections import Counter
+from contextlib import contextmanager
+import hashlib
+import json
 import logging
 from datetime import datetime
 
+# Valores por cláusula IN. Os INSERT em lote usam insert_chunks, que calcula
+# o bloco pelo número de colunas de cada tabela.
+BULK_CHUNK_SIZE = 200
+
 class DatabasePipeline:
     def __init__(self):
-        # Configuração de logging para o pipeline
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.identity_map = EventIdentityMap(settings.pipeline_identity_map_size)
+        self.write_stats = Counter()
+        self.rows_written = Counter()  # tabela -> linhas gravadas
+        # Entradas do mapa de identidade e invalidação do cache de consultas que
+        # aguardam o commit da transação externa (ver remember e transaction).
+        self._pending = {}
+        self._pending_bump = False
+
+    @staticmethod
+    def event_fingerprint(event_data):
+        """
+        Impressão digital estável do conteúdo do evento: sha1 de todos os campos
+        extraídos, na ordem de EVENT_FIELDS, serializados em JSON com chaves
+        ordenadas. Se não mudou, nenhuma das tabelas do evento precisa ser reescrita.
+        """
+        content = json.dumps(list(event_data), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def lookup_events(self, names):
+        """
+        Retorna {nome: (id, fingerprint)} dos eventos já gravados, consultando
+        primeiro o mapa de identidade e depois o banco, em um SELECT por bloco.
+        """
+        known = {}
+        missing = []
+        for name in names:
+            cached = self.identity_map.get(name)
+            if cached is not None:
+                known[name] = cached
+            else:
+                missing.append(name)
+
+        for chunk in chunked(missing, BULK_CHUNK_SIZE):
+            query = (Event
+                     .select(Event.id, Event.name, Event.fingerprint)
+                     .where(Event.name.in_(chunk))
+                     .tuples())
+            for event_id, name, fingerprint in query:
+                known[name] = (event_id, fingerprint)
+        return known
+
+    def remember(self, entries, wrote=False):
+        """
+        Registra no mapa de identidade os eventos (nome, id, fingerprint)
+        gravados ou confirmados e, se houve escrita, invalida o cache de
+        consultas. Só pode valer depois do commit: se o pipeline roda dentro
+        de uma transação externa (a página e o checkpoint do crawl juntos),
+        o que ele gravou ainda pode ser desfeito, e um id revertido no mapa
+        faria execuções seguintes pularem o evento (o SQLite ainda reutiliza
+        o rowid para outro evento). Nesse caso fica pendente até o
+        flush_pending de quem abriu a transação.
+        """
+        if Event._meta.database.in_transaction():
+            for name, event_id, fingerprint in entries:
+                self._pending[name] = (event_id, fingerprint)
+            self._pending_bump = self._pending_bump or wrote
+            return
+        for name, event_id, fingerprint in entries:
+            self.identity_map.put(name, event_id, fingerprint)
+        if wrote:
+            query_cache.bump_generation()
+
+    def flush_pending(self):
+        """
+        Aplica o que remember deixou pendente. Chamado depois do commit da
+        transação externa; se ainda houver uma transação aberta, espera por ela.
+        """
+        if Event._meta.database.in_transaction():
+            return
+        pending, wrote = self._pending, self._pending_bump
+        self._pending, self._pending_bump = {}, False
+        self.remember(((name, event_id, fingerprint) for name, (event_id, fingerprint) in pending.items()), wrote)
+
+    def discard_pending(self):
+        """
+        Chamado quando a transação externa é desfeita: descarta o pendente e
+        esvazia o mapa de identidade. O cache de consultas é invalidado se
+        houve escrita, porque consultas na mesma conexão podem ter visto as
+        linhas desfeitas.
+        """
+        wrote = self._pending_bump
+        self._pending, self._pending_bump = {}, False
+        self.identity_map.clear()
+        if wrote:
+            query_cache.bump_generation()
+
+    @contextmanager
+    def transaction(self, lock_type=None):
+        """
+        Transação externa para gravar eventos junto com outras escritas (o
+        checkpoint de uma página, os jobs da fila). O mapa de identidade e o
+        cache de consultas só veem os eventos depois do commit; se a
+        transação for desfeita, o mapa é esvaziado.
+        """
+        try:
+            with Event._meta.database.atomic(lock_type):
+                yield
+        except BaseException:
+            self.discard_pending()
+            raise
+        self.flush_pending()
+
+    def log_stats(self):
+        self.logger.info(
+            "Eventos gravados: %s inseridos, %s atualizados, %s inalterados, %s com erro.",
+            self.write_stats['inserted'], self.write_stats['updated'],
+            self.write_stats['unchanged'], self.write_stats['failed']
+        )
+        self.identity_map.log_stats()
+
+    def reset_stats(self):
+        self.write_stats = Counter()
+        self.rows_written = Counter()
 
     def process_events(self, events):
+        """
+        Grava um lote de eventos e registra nas métricas a duração da gravação,
+        os eventos por resultado e as linhas gravadas por tabela.
+        """
+        write_stats, rows_written = self.write_stats.copy(), self.rows_written.copy()
+        with WRITE_SECONDS.time():
+            self.write_events(events)
+        for result, count in (self.write_stats - write_stats).items():
+            EVENTS_WRITTEN.inc(count, result=result)
+        for table, count in (self.rows_written - rows_written).items():
+            ROWS_WRITTEN.inc(count, table=table)
+
+    def write_events(self, events):
+        if settings.pipeline_batch_writes:
+            try:
+                self.process_events_batch(events)
+                return
+            except IntegrityError as e:
+                self.logger.error("Erro de integridade no lote de %s eventos, gravando um a um: %s", len(events), e)
+
+        self.process_events_individually(events)
+
+    def process_events_individually(self, events):
+        """
+        Grava cada evento em sua própria transação, isolando falhas por evento.
+        Eventos cuja impressão digital não mudou não são reescritos.
+        """
+        before = self.write_stats.copy()
         for event_data in events:
             try:
+                fingerprint = self.event_fingerprint(event_data)
+                existing = self.lookup_events([event_data.name]).get(event_data.name)
+                if existing is not None and existing[1] == fingerprint:
+                    self.remember([(event_data.name, existing[0], fingerprint)])
+                    self.write_stats['unchanged'] += 1
+                    continue
+
                 with Event._meta.database.atomic():
                     # Processar Event
-                    event = self.process_event(event_data)
+                    event = self.process_event(event_data, fingerprint, existing[0] if existing else None)
                     
                     # Processar EventData
-                    self.process_event_data(event, event_data)
+                    event_data_entry = self.process_event_data(event, event_data)
                     
                     # Processar Metadata
-                    self.process_metadata(event, event_data)
+                    extra_count = self.process_metadata(event, event_data)
+
+                self.rows_written.update({
+                    'event': 1,
+                    'event_data': 1 if event_data_entry else 0,
+                    'event_details': 1,
+                    'metadata': extra_count,
+                })
+                # Só entra no mapa depois do commit, para nunca guardar um id revertido.
+                self.remember([(event.name, event.id, fingerprint)], wrote=True)
+                self.write_stats['updated' if existing else 'inserted'] += 1
                     
             except IntegrityError as e:
-                self.logger.error(f"Erro de integridade ao salvar o evento '{event_data['name']}': {e}")
+                self.logger.error("Erro de integridade ao salvar o evento '%s': %s", event_data.name, e)
+                self.write_stats['failed'] += 1
                 continue
             except Exception as e:
-                self.logger.error(f"Erro inesperado ao processar o evento '{event_data['name']}': {e}")
+                self.logger.error("Erro inesperado ao processar o evento '%s': %s", event_data.name, e)
+                self.write_stats['failed'] += 1
                 continue
 
-    def process_event(self, event_data):
+        processed = self.write_stats - before
+        self.logger.info(
+            "Lote processado evento a evento: %s inseridos, %s atualizados, %s inalterados, %s com erro.",
+            processed['inserted'], processed['updated'], processed['unchanged'], processed['failed']
+        )
+
+    def process_events_batch(self, events):
+        """
+        Grava um lote inteiro de eventos com poucos INSERT ... ON CONFLICT DO UPDATE,
+        usando as chaves únicas event.name, (event, date) e (event, key),
+        tudo em uma única transação. Eventos com a mesma impressão digital já
+        gravada são pulados sem nenhuma escrita.
+
+        Um evento recorrente aparece na página uma vez por data. Como no
+        caminho um a um, a última ocorrência define Event, os detalhes e a
+        impressão digital, e cada ocorrência grava a sua linha de EventData;
+        o evento só é pulado se todas as ocorrências têm a impressão digital
+        gravada.
+        """
+        occurrences = {}
+        for event_data in events:
+            occurrences.setdefault(event_data.name, []).append(event_data)
+        if not occurrences:
+            return
+
+        by_name = {name: datas[-1] for name, datas in occurrences.items()}
+        occurrence_fingerprints = {
+            name: [self.event_fingerprint(data) for data in datas] for name, datas in occurrences.items()
+        }
+        fingerprints = {name: prints[-1] for name, prints in occurrence_fingerprints.items()}
+        existing = self.lookup_events(list(by_name))
+
+        event_ids = {name: event_id for name, (event_id, _) in existing.items()}
+        changed = {
+            name: data for name, data in by_name.items()
+            if name not in existing
+            or any(fingerprint != existing[name][1] for fingerprint in occurrence_fingerprints[name])
+        }
+        inserted = sum(1 for name in changed if name not in existing)
+        updated = len(changed) - inserted
+        unchanged = len(by_name) - len(changed)
+
+        event_data_rows = []
+        details_rows = []
+        metadata_rows = []
+        if changed:
+            database = Event._meta.database
+            now = datetime.utcnow()
+            with database.atomic():
+                event_rows = [
+                    {
+                        'name': name,
+                        'type': data.type,
+                        'description': data.description,
+                        'fingerprint': fingerprints[name],
+                        'created_at': now,
+                        'updated_at': now,
+                    }
+                    for name, data in changed.items()
+                ]
+                for chunk in insert_chunks(event_rows):
+                    (Event
+                     .insert_many(chunk)
+                     .on_conflict(
+                         conflict_target=[Event.name],
+                         update={
+                             Event.type: EXCLUDED.type,
+                             Event.description: EXCLUDED.description,
+                             Event.fingerprint: EXCLUDED.fingerprint,
+                             Event.updated_at: EXCLUDED.updated_at,
+                         })
+                     .execute())
+
+                for names in chunked([name for name in changed if name not in event_ids], BULK_CHUNK_SIZE):
+                    query = Event.select(Event.id, Event.name).where(Event.name.in_(names)).tuples()
+                    event_ids.update({name: event_id for event_id, name in query})
+
+                dated = []
+                for name in changed:
+                    for data in occurrences[name]:
+                        start_date = self.parse_date(data.start_date)
+                        if start_date:
+                            dated.append((event_ids[name], start_date, data, parse_venue(data.location, data.address)))
+                venue_ids = resolve_venue_ids(venue for _, _, _, venue in dated)
+
+                # Uma linha por (evento, data); a última ocorrência repetida prevalece.
+                by_date = {
+                    (event_id, start_date): {
+                        'event': event_id,
+                        'date': start_date,
+                        'location': self.format_location(data),
+                        'venue': venue_ids[venue['key']],
+                    }
+                    for event_id, start_date, data, venue in dated
+                }
+                event_data_rows = list(by_date.values())
+
+                for name, data in changed.items():
+                    event_id = event_ids[name]
+                    details_row, extra_rows = self.build_details(event_id, data, now)
+                    details_rows.append(details_row)
+                    metadata_rows.extend(extra_rows)
+
+                for chunk in insert_chunks(event_data_rows):
+                    (EventData
+                     .insert_many(chunk)
+                     .on_conflict(
+                         conflict_target=[EventData.event, EventData.date],
+                         update={EventData.location: EXCLUDED.location, EventData.venue: EXCLUDED.venue_id})
+                     .execute())
+
+                for chunk in insert_chunks(details_rows):
+                    self.upsert_details(chunk)
+
+                # Metadados de eventos atualizados que agora cabem na projeção.
+                for ids in chunked([event_ids[name] for name in changed if name in existing], BULK_CHUNK_SIZE):
+                    Metadata.delete().where(Metadata.event.in_(ids) & Metadata.key.in_(DETAIL_FIELDS)).execute()
+
+                for chunk in insert_chunks(metadata_rows):
+                    (Metadata
+                     .insert_many(chunk)
+                     .on_conflict(
+                         conflict_target=[Metadata.event, Metadata.key],
+                         update={Metadata.value: EXCLUDED.value, Metadata.updated_at: EXCLUDED.updated_at})
+                     .execute())
+            self.rows_written.update({
+                'event': len(event_rows),
+                'event_data': len(event_data_rows),
+                'event_details': len(details_rows),
+                'metadata': len(metadata_rows),
+            })
+
+        # Só entra no mapa depois do commit, para nunca guardar um id revertido.
+        self.remember(((name, event_id, fingerprints[name]) for name, event_id in event_ids.items()),
+                      wrote=bool(changed))
+
+        self.write_stats['inserted'] += inserted
+        self.write_stats['updated'] += updated
+        self.write_stats['unchanged'] += unchanged
+        self.logger.info(
+            "Lote processado: %s inseridos, %s atualizados, %s inalterados "
+            "(%s dados de eventos, %s detalhes, "
+            "%s metadados gravados).",
+            inserted, updated, unchanged, len(event_data_rows), len(details_rows), len(metadata_rows)
+        )
+
+    def process_event(self, event_data, fingerprint=None, event_id=None):
         """
         Cria ou atualiza um registro na tabela Event.
         Retorna a instância do Event.
         """
-        event, created = Event.get_or_create(
-            name=event_data['name'],
-            defaults={
-                'type': event_data['type'],
-                'description': event_data['description'],
-            }
-        )
-        if created:
-            self.logger.info(f"Evento '{event.name}' criado.")
+        fields = {
+            'type': event_data.type,
+            'description': event_data.description,
+            'fingerprint': fingerprint,
+            'updated_at': datetime.utcnow(),
+        }
+        if event_id is None:
+            event = Event.create(name=event_data.name, **fields)
+            self.logger.debug("Evento '%s' criado.", event.name)
         else:
-            self.logger.info(f"Evento '{event.name}' já existe. Atualizando informações.")
-            event.type = event_data['type']
-            event.description = event_data['description']
-            event.save()
-            self.logger.info(f"Evento '{event.name}' atualizado.")
+            Event.update(**fields).where(Event.id == event_id).execute()
+            event = Event(id=event_id, name=event_data.name, **fields)
+            self.logger.debug("Evento '%s' atualizado.", event.name)
         return event
 
     def process_event_data(self, event, event_data):
         """
         Cria ou atualiza um registro na tabela EventData.
+        Retorna o registro, ou None se o evento não tem data válida.
         """
-        start_date = self.parse_date(event_data.get('start_date'))
-        end_date = self.parse_date(event_data.get('end_date')) if event_data.get('end_date') else None
+        start_date = self.parse_date(event_data.start_date)
+        end_date = self.parse_date(event_data.end_date) if event_data.end_date else None
 
         if start_date:
+            venue = parse_venue(event_data.location, event_data.address)
+            venue_id = resolve_venue_ids([venue])[venue['key']]
             # Verificar se já existe um EventData para este evento e data
             try:
                 event_data_entry = EventData.get(
                     (EventData.event == event) &
                     (EventData.date == start_date)
                 )
-                self.logger.info(f"EventData para '{event.name}' na data {start_date} já existe. Atualizando informações.")
+                self.logger.debug("EventData para '%s' na data %s já existe. Atualizando informações.", event.name, start_date)
                 event_data_entry.location = self.format_location(event_data)
+                event_data_entry.venue = venue_id
                 event_data_entry.save()
             except EventData.DoesNotExist:
                 # Criar um novo EventData
                 event_data_entry = EventData.create(
                     event=event,
                     date=start_date,
-                    location=self.format_location(event_data)
+                    location=self.format_location(event_data),
+                    venue=venue_id
                 )
-                self.logger.info(f"EventData para '{event.name}' na data {start_date} criado.")
+                self.logger.debug("EventData para '%s' na data %s criado.", event.name, start_date)
+            return event_data_entry
+        return None
 
     def process_metadata(self, event, event_data):
         """
-        Cria múltiplas entradas na tabela Metadata para cada evento.
+        Grava os campos de DETAIL_FIELDS na linha de EventDetails do evento,
+        com um único upsert, e na tabela Metadata só o que não cabe na projeção.
+        Retorna o número de metadados gravados.
         """
-        # Defina quais campos devem ser tratados como metadata
-        metadata_fields = {
-            'price': event_data.get('price'),
-            'price_currency': event_data.get('price_currency'),
-            'availability': event_data.get('availability'),
-            'image': event_data.get('image'),
-            'url': event_data.get('url')
-        }
+        now = datetime.utcnow()
+        details_row, metadata_rows = self.build_details(event.id, event_data, now)
+        self.upsert_details([details_row])
+        Metadata.delete().where((Metadata.event == event.id) & Metadata.key.in_(DETAIL_FIELDS)).execute()
+        for row in metadata_rows:
+            Metadata.insert(row).execute()
+        self.logger.debug("Detalhes de '%s' gravados (%s metadados extras).", event.name, len(metadata_rows))
+        return len(metadata_rows)
 
-        for key, value in metadata_fields.items():
-            if value is not None:
-                metadata, meta_created = Metadata.get_or_create(
-                    event=event,
-                    key=key,
-                    defaults={'value': value}
-                )
-                if meta_created:
-                    self.logger.info(f"Metadata '{key}' para '{event.name}' criado com valor '{value}'.")
-                else:
-                    self.logger.info(f"Metadata '{key}' para '{event.name}' já existe. Atualizando valor para '{value}'.")
-                    metadata.value = value
-                    metadata.save()
+    def build_details(self, event_id, event_data, now):
+        """
+        Monta a linha de EventDetails de um evento e as linhas de Metadata
+        para os valores que não têm coluna tipada. Retorna (linha, metadados).
+        """
+        details_row = {field: getattr(event_data, field) for field in DETAIL_FIELDS}
+        details_row.update({'event': event_id, 'updated_at': now})
+        metadata_rows = []
+        if details_row['price'] is not None:
+            price = parse_price(details_row['price'])
+            if price is None:
+                metadata_rows.append({'event': event_id, 'key': 'price', 'value': details_row['price'], 'updated_at': now})
+            details_row['price'] = price
+        return details_row, metadata_rows
+
+    @staticmethod
+    def upsert_details(rows):
+        """
+        INSERT ... ON CONFLICT DO UPDATE das linhas de EventDetails. A coluna
+        event_type não vem do JSON-LD e é preservada.
+        """
+        update = {getattr(EventDetails, field): getattr(EXCLUDED, field) for field in DETAIL_FIELDS}
+        update[EventDetails.updated_at] = EXCLUDED.updated_at
+        EventDetails.insert_many(rows).on_conflict(conflict_target=[EventDetails.event], update=update).execute()
 
     def parse_date(self, date_str):
         """
@@ -114,13 +453,18 @@ class DatabasePipeline:
         try:
             return datetime.strptime(date_str, '%Y-%m-%d')
         except ValueError:
-            self.logger.warning(f"Formato de data desconhecido: {date_str}")
+            self.logger.warning("Formato de data desconhecido: %s", date_str)
             return None
 
     def format_location(self, event_data):
         """
         Formata a localização combinando 'location' e 'address'.
+        Um `PostalAddress` vira texto legível em vez do repr do dicionário.
         """
-        location = event_data.get('location', 'Desconhecido')
-        address = event_data.get('address', 'Desconhecido')
+        location = event_data.location
+        address = event_data.address
+        if isinstance(address, dict):
+            venue = parse_venue(location, address)
+            city = ' - '.join(part for part in (venue['city'], venue['region']) if part)
+            address = ', '.join(part for part in (venue['street'], city, venue['postal_code']) if part) or 'Desconhecido'
         return f"{location}, {address}"
@@ -0,0 +1,85 @@
+from peewee import EXCLUDED, fn
+from src.db.models.event_details import EventDetails
+from src.db.models.metadata import Metadata
+from src.queries.query_cache import query_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Campos do evento gravados nas colunas tipadas de EventDetails. Só o que não
+# cabe na projeção (um preço que não é número) ainda vai para Metadata.
+DETAIL_FIELDS = ('price', 'price_currency', 'availability', 'image', 'url')
+
+# Chaves de Metadata que têm coluna em EventDetails. event_type não vem do
+# JSON-LD, mas pode ter sido gravada por fora como metadado.
+PROJECTED_KEYS = DETAIL_FIELDS + ('event_type',)
+
+
+def parse_price(value):
+    """
+    Converte o preço do JSON-LD ("120", "49.90", "49,90", 35) em número.
+    Retorna None se o valor não for numérico (ex.: "Grátis").
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def backfill_details(chunk_size=100):
+    """
+    Move para EventDetails as linhas de Metadata cujas chaves têm coluna
+    tipada (bancos gravados antes da projeção existir, ou metadados gravados
+    por fora do pipeline). Valores já presentes em EventDetails só são
+    substituídos por valores não nulos. Retorna o número de eventos migrados.
+    """
+    database = Metadata._meta.database
+    update = {
+        getattr(EventDetails, key): fn.COALESCE(getattr(EXCLUDED, key), getattr(EventDetails, key))
+        for key in PROJECTED_KEYS
+    }
+    migrated = 0
+    last_event = 0
+    while True:
+        event_ids = [event_id for (event_id,) in Metadata
+                     .select(Metadata.event)
+                     .where(Metadata.key.in_(PROJECTED_KEYS) & (Metadata.event > last_event))
+                     .group_by(Metadata.event)
+                     .order_by(Metadata.event)
+                     .limit(chunk_size)
+                     .tuples()]
+        if not event_ids:
+            break
+        last_event = event_ids[-1]
+
+        details = {}
+        moved = []
+        query = (Metadata
+                 .select(Metadata.id, Metadata.event, Metadata.key, Metadata.value)
+                 .where(Metadata.event.in_(event_ids) & Metadata.key.in_(PROJECTED_KEYS))
+                 .tuples())
+        for metadata_id, event_id, key, value in query:
+            if key == 'price':
+                value = parse_price(value)
+                if value is None:
+                    continue  # Preço não numérico continua como metadado
+            if event_id not in details:
+                details[event_id] = dict.fromkeys(PROJECTED_KEYS)
+                details[event_id]['event'] = event_id
+            details[event_id][key] = value
+            moved.append(metadata_id)
+
+        with database.atomic():
+            if details:
+                EventDetails.insert_many(list(details.values())).on_conflict(
+                    conflict_target=[EventDetails.event], update=update).execute()
+            if moved:
+                Metadata.delete().where(Metadata.id.in_(moved)).execute()
+        migrated += len(details)
+
+    if migrated:
+        query_cache.bump_generation()
+        logger.info("Metadados de %s eventos movidos para event_details.", migrated)
+    return migrated
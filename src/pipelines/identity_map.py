@@ -0,0 +1,58 @@
+from collections import OrderedDict
+import logging
+
+
+class EventIdentityMap:
+    """
+    Mapa de identidade em memória: nome do evento -> (id, hash dos campos).
+
+    Evita um SELECT por evento repetido dentro da mesma execução (ou de um
+    processo de longa duração) e, quando o hash não mudou, também o UPDATE.
+    Limitado a `max_size` entradas, descartando a menos usada recentemente.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def get(self, name):
+        """
+        Retorna (event_id, fields_hash) ou None, contabilizando hit/miss.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return entry
+
+    def put(self, name, event_id, fields_hash):
+        self._entries[name] = (event_id, fields_hash)
+        self._entries.move_to_end(name)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, name):
+        self._entries.pop(name, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def log_stats(self):
+        self.logger.info(
+            "Mapa de identidade: %s hits, %s misses "
+            "(%.1f%% de acerto), %s/%s entradas.",
+            self.hits, self.misses, self.hit_rate * 100, len(self), self.max_size
+        )
@@ -0,0 +1,125 @@
+from datetime import datetime
+import json
+import time
+import logging
+from src.config import settings
+from src.db.models.scrape_run import ScrapeRun
+from src.utils.metrics import (
+    metrics, FETCH_SECONDS, FETCH_REQUESTS, FETCH_BYTES, FETCH_RETRIES, FETCH_RATE, FETCH_ERROR_RATE,
+    PARSE_SECONDS, EVENTS_PARSED, PARSE_RATE, WRITE_SECONDS, EVENTS_WRITTEN, ROWS_WRITTEN, RUN_DURATION, RUN_TIMESTAMP, RUN_SUCCESS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def http_requests():
+    """
+    Requisições que chegaram ao servidor (todas as tentativas, sem os hits do cache).
+    """
+    return FETCH_REQUESTS.total() - FETCH_REQUESTS.value(result='cache_hit')
+
+
+def finish_run(started_at, success):
+    """
+    Preenche as métricas de nível de execução (duração, sucesso, vazão do
+    crawler e do parse, taxa de erro das requisições).
+    """
+    finished_at = datetime.utcnow()
+    duration = (finished_at - started_at).total_seconds()
+    RUN_DURATION.set(duration)
+    RUN_TIMESTAMP.set(round(time.time(), 3))
+    RUN_SUCCESS.set(int(success))
+    if PARSE_SECONDS.sum:
+        PARSE_RATE.set(round(EVENTS_PARSED.total() / PARSE_SECONDS.sum, 1))
+    requests = http_requests()
+    if requests:
+        failed = FETCH_REQUESTS.value(result='throttled') + FETCH_REQUESTS.value(result='error')
+        FETCH_RATE.set(round(requests / duration, 2) if duration else 0)
+        FETCH_ERROR_RATE.set(round(failed / requests, 4))
+    return finished_at
+
+
+def start_scrape_run(started_at, crawler_mode, full_recrawl, resumed_from=None):
+    """
+    Cria a linha da execução em scrape_run logo no início, para que as páginas
+    gravadas (checkpoints) fiquem associadas ao seu id. Retorna None em caso
+    de erro: o scraper segue, só sem checkpoints.
+    """
+    try:
+        return ScrapeRun.create(
+            started_at=started_at,
+            crawler_mode=crawler_mode,
+            full_recrawl=full_recrawl,
+            resumed_from=resumed_from,
+        )
+    except Exception as e:
+        logger.error("Erro ao registrar o início da execução em scrape_run: %s", e)
+        return None
+
+
+def save_scrape_run(started_at, finished_at, success, crawler_mode, full_recrawl, run=None):
+    """
+    Grava o resumo da execução na tabela scrape_run, com o snapshot completo
+    das métricas em JSON: atualiza a linha `run` criada por start_scrape_run
+    ou, sem ela, cria uma nova. Retorna a linha.
+    """
+    fields = dict(
+        started_at=started_at,
+        finished_at=finished_at,
+        duration=(finished_at - started_at).total_seconds(),
+        success=success,
+        crawler_mode=crawler_mode,
+        full_recrawl=full_recrawl,
+        requests=FETCH_REQUESTS.total(),
+        request_errors=FETCH_REQUESTS.value(result='error'),
+        throttled=FETCH_REQUESTS.value(result='throttled'),
+        retries=FETCH_RETRIES.total(),
+        requests_per_second=FETCH_RATE.value() if http_requests() else None,
+        error_rate=FETCH_ERROR_RATE.value() if http_requests() else None,
+        bytes_downloaded=FETCH_BYTES.total(),
+        fetch_seconds=FETCH_SECONDS.sum,
+        fetch_p95=FETCH_SECONDS.quantile(0.95),
+        events_parsed=EVENTS_PARSED.total(),
+        parse_seconds=PARSE_SECONDS.sum,
+        events_per_second=PARSE_RATE.value() or None,
+        events_inserted=EVENTS_WRITTEN.value(result='inserted'),
+        events_updated=EVENTS_WRITTEN.value(result='updated'),
+        events_unchanged=EVENTS_WRITTEN.value(result='unchanged'),
+        rows_written=ROWS_WRITTEN.total(),
+        write_seconds=WRITE_SECONDS.sum,
+        metrics=json.dumps(metrics.snapshot(), ensure_ascii=False),
+    )
+    if run is None:
+        return ScrapeRun.create(**fields)
+    ScrapeRun.update(**fields).where(ScrapeRun.id == run.id).execute()
+    return run
+
+
+def record_scrape_run(started_at, success, crawler_mode, full_recrawl, run=None):
+    """
+    Fecha as métricas da execução, grava a linha de scrape_run e exporta o
+    arquivo do Prometheus em `settings.metrics_file`. Falhas são registradas
+    no log sem interromper o scraper.
+    """
+    finished_at = finish_run(started_at, success)
+    logger.info(
+        "Métricas da execução: %s requisições (%.1f/s, %.1f%% com erro, %s novas tentativas, %.0f KB, %.2fs), "
+        "%s eventos extraídos (%.2fs), %s linhas gravadas (%.2fs).",
+        http_requests(), FETCH_RATE.value(), FETCH_ERROR_RATE.value() * 100, FETCH_RETRIES.total(),
+        FETCH_BYTES.total() / 1024, FETCH_SECONDS.sum,
+        EVENTS_PARSED.total(), PARSE_SECONDS.sum,
+        ROWS_WRITTEN.total(), WRITE_SECONDS.sum,
+    )
+
+    try:
+        scrape_run = save_scrape_run(started_at, finished_at, success, crawler_mode, full_recrawl, run)
+        logger.info("Execução registrada na tabela scrape_run (id %s).", scrape_run.id)
+    except Exception as e:
+        logger.error("Erro ao gravar as métricas da execução em scrape_run: %s", e)
+
+    if settings.metrics_file:
+        try:
+            metrics.write_textfile(settings.metrics_file)
+            logger.info("Métricas exportadas para %s.", settings.metrics_file)
+        except OSError as e:
+            logger.error("Erro ao exportar as métricas para %s: %s", settings.metrics_file, e)
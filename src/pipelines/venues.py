@@ -0,0 +1,62 @@
+from peewee import chunked
+from src.db.models.venue import Venue
+from src.db.models.event_data import EventData
+from src.db.database import SQLITE_MAX_VARIABLES
+from src.parsers.address_parser import VENUE_FIELDS, parse_venue, split_location_text
+from src.queries.query_cache import query_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Locais por INSERT: cada linha usa uma variável por coluna (key + VENUE_FIELDS).
+VENUE_CHUNK_SIZE = SQLITE_MAX_VARIABLES // (len(VENUE_FIELDS) + 1)
+
+
+def resolve_venue_ids(venues):
+    """
+    Garante que cada local (dicionário de parse_venue) existe na tabela venue
+    e retorna {key: venue_id}. Locais novos são inseridos em lote com
+    ON CONFLICT DO NOTHING; os ids vêm de um SELECT por bloco de chaves.
+    Deve ser chamado dentro da transação de quem grava os EventData.
+    """
+    by_key = {venue['key']: venue for venue in venues}
+    venue_ids = {}
+    for keys in chunked(list(by_key), VENUE_CHUNK_SIZE):
+        rows = [{field: by_key[key][field] for field in ('key',) + VENUE_FIELDS} for key in keys]
+        Venue.insert_many(rows).on_conflict_ignore().execute()
+        query = Venue.select(Venue.id, Venue.key).where(Venue.key.in_(keys)).tuples()
+        venue_ids.update({key: venue_id for venue_id, key in query})
+    return venue_ids
+
+
+def backfill_venues(chunk_size=500):
+    """
+    Preenche event_data.venue das linhas gravadas antes da tabela venue existir,
+    reconstruindo local e endereço a partir do texto de event_data.location.
+    Retorna o número de linhas atualizadas.
+    """
+    database = EventData._meta.database
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(EventData
+                    .select(EventData.id, EventData.location)
+                    .where(EventData.venue.is_null() & (EventData.id > last_id))
+                    .order_by(EventData.id)
+                    .limit(chunk_size)
+                    .tuples())
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        venues = {row_id: parse_venue(*split_location_text(location)) for row_id, location in rows}
+        with database.atomic():
+            venue_ids = resolve_venue_ids(venues.values())
+            for row_id, venue in venues.items():
+                EventData.update(venue=venue_ids[venue['key']]).where(EventData.id == row_id).execute()
+        updated += len(rows)
+
+    if updated:
+        query_cache.bump_generation()
+        logger.info("Locais preenchidos para %s dados de eventos existentes.", updated)
+    return updated
@@ -0,0 +1,212 @@
+# src/pipelines/work_queue.py
+import json
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from peewee import fn
+from src.config import settings
+from src.db.database import database
+from src.db.models.crawl_job import CrawlJob
+from src.parsers.event_parser import ParsedEvent
+from src.pipelines.crawl_pages import INITIAL_PAGE, record_persisted_page
+# Jobs que ainda têm trabalho pela frente (busca ou gravação).
+ACTIVE_STATUSES = ('pending', 'leased', 'fetched')
+
+
+def worker_name():
+    """
+    Identifica o worker nos leases: host e pid, únicos mesmo com workers
+    em várias máquinas usando o mesmo banco.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encode_events(events):
+    """
+    Serializa os eventos de uma página como listas na ordem de EVENT_FIELDS
+    (um ParsedEvent é uma tupla, e o json o escreve como lista).
+    """
+    return json.dumps(events, ensure_ascii=False)
+
+
+def decode_events(result):
+    return [ParsedEvent.from_record(record) for record in json.loads(result or '[]')]
+
+
+class WorkQueue:
+    """
+    Fila de trabalho do modo `queue`, na tabela crawl_job. Cada job é uma
+    página (site, janela, offset). Os workers arrendam jobs com `claim`, em
+    uma transação IMMEDIATE, então dois workers nunca pegam o mesmo job,
+    estejam no mesmo processo, na mesma máquina ou em máquinas diferentes com
+    o mesmo banco. O worker termina o job com `complete`, que já enfileira a
+    página seguinte da janela, ou com `fail`. Um lease vencido (worker morto
+    ou travado) volta para a fila até `max_attempts` tentativas.
+
+    Os workers não gravam eventos: o resultado fica no job até o processo
+    escritor (o scraper) gravá-lo com o DatabasePipeline e chamar `mark_written`.
+    """
+
+    def __init__(self, lease_seconds=settings.queue_lease_seconds, max_attempts=settings.queue_max_attempts,
+                 refresh_hours=settings.crawler_refresh_hours, max_pages=settings.crawler_max_pages):
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.refresh_interval = timedelta(hours=refresh_hours)
+        self.max_pages = max_pages
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def enqueue(self, sites, date_windows, full=False):
+        """
+        Cria o job da página inicial de cada site e o da primeira página de
+        cada (site, janela). Janelas com jobs pendentes de uma execução
+        interrompida continuam de onde pararam (jobs que falharam ganham nova
+        chance); no modo incremental, janelas concluídas dentro do intervalo
+        de atualização são puladas. Retorna o número de janelas enfileiradas.
+        """
+        cutoff = datetime.utcnow() - self.refresh_interval
+        windows = [INITIAL_PAGE] + list(date_windows)
+        existing = {}
+        query = (CrawlJob
+                 .select(CrawlJob.site, CrawlJob.start_date, CrawlJob.status, CrawlJob.updated_at)
+                 .where(CrawlJob.site.in_(list(sites)) & CrawlJob.start_date.in_(windows))
+                 .tuples())
+        for site, start_date, status, updated_at in query:
+            existing.setdefault((site, start_date), []).append((status, updated_at))
+
+        enqueued = resumed = fresh = 0
+        with database.atomic():
+            for site in sites:
+                for start_date in windows:
+                    jobs = existing.get((site, start_date), [])
+                    window_jobs = (CrawlJob.site == site) & (CrawlJob.start_date == start_date)
+                    recent = jobs and min(updated_at for _, updated_at in jobs) >= cutoff
+                    if recent and any(status != 'done' for status, _ in jobs):
+                        (CrawlJob
+                         .update(status='pending', attempts=0, error=None)
+                         .where(window_jobs & (CrawlJob.status == 'failed'))
+                         .execute())
+                        resumed += 1
+                        continue
+                    if recent and not full and start_date != INITIAL_PAGE:
+                        fresh += 1
+                        continue
+                    if jobs:
+                        CrawlJob.delete().where(window_jobs).execute()
+                    CrawlJob.create(site=site, start_date=start_date, offset=0)
+                    enqueued += 1
+
+        self.logger.info(
+            "Fila de trabalho: %s sites, %s janelas enfileiradas, %s retomadas, %s atualizadas há menos de %s.",
+            len(sites), enqueued, resumed, fresh, self.refresh_interval
+        )
+        return enqueued
+
+    def claim(self, worker):
+        """
+        Arrenda o próximo job disponível (pendente ou com lease vencido) para
+        `worker`. Retorna o job ou None se não houver nenhum disponível.
+        """
+        while True:
+            now = datetime.utcnow()
+            with database.atomic('IMMEDIATE'):
+                job = (CrawlJob
+                       .select()
+                       .where((CrawlJob.status == 'pending') |
+                              ((CrawlJob.status == 'leased') & (CrawlJob.leased_until < now)))
+                       .order_by(CrawlJob.id)
+                       .first())
+                if job is None:
+                    return None
+                if job.attempts >= self.max_attempts:
+                    # Lease vencido na última tentativa: o worker morreu ou travou nesta página.
+                    (CrawlJob
+                     .update(status='failed', worker=None, leased_until=None, updated_at=now,
+                             error=job.error or f"Lease de {job.worker} vencido.")
+                     .where(CrawlJob.id == job.id)
+                     .execute())
+                    continue
+                job.status = 'leased'
+                job.worker = worker
+                job.leased_until = now + self.lease
+                job.attempts += 1
+                job.updated_at = now
+                job.save()
+                return job
+
+    def complete(self, job, worker, events, next_offset, content_hash=None):
+        """
+        Guarda os eventos da página (e o hash do corpo de onde vieram) e
+        enfileira a página seguinte da janela, na mesma transação. Retorna
+        False se o lease de `worker` venceu e o job já foi arrendado por
+        outro worker; o resultado é descartado.
+        """
+        with database.atomic():
+            updated = (CrawlJob
+                       .update(status='fetched', leased_until=None, error=None,
+                               result=encode_events(events) if events else None, event_count=len(events),
+                               next_offset=next_offset, content_hash=content_hash, updated_at=datetime.utcnow())
+                       .where((CrawlJob.id == job.id) & (CrawlJob.status == 'leased') & (CrawlJob.worker == worker))
+                       .execute())
+            if not updated:
+                self.logger.warning("Lease do job %s vencido; resultado descartado.", job.id)
+                return False
+
+            if next_offset is not None and job.start_date != INITIAL_PAGE:
+                pages = (CrawlJob
+                         .select()
+                         .where((CrawlJob.site == job.site) & (CrawlJob.start_date == job.start_date))
+                         .count())
+                if pages < self.max_pages:
+                    (CrawlJob
+                     .insert(site=job.site, start_date=job.start_date, offset=next_offset)
+                     .on_conflict_ignore()
+                     .execute())
+                else:
+                    self.logger.warning("Limite de %s páginas atingido para %s, data %s.",
+                                        self.max_pages, job.site, job.start_date)
+        return True
+
+    def fail(self, job, worker, error):
+        """
+        Devolve o job à fila ou, depois de `max_attempts` tentativas, marca-o como falho.
+        """
+        status = 'failed' if job.attempts >= self.max_attempts else 'pending'
+        (CrawlJob
+         .update(status=status, worker=None, leased_until=None, error=error, updated_at=datetime.utcnow())
+         .where((CrawlJob.id == job.id) & (CrawlJob.status == 'leased') & (CrawlJob.worker == worker))
+         .execute())
+        return status
+
+    def fetched_jobs(self, limit=100):
+        """
+        Jobs buscados esperando gravação, na ordem em que foram criados.
+        """
+        return list(CrawlJob.select().where(CrawlJob.status == 'fetched').order_by(CrawlJob.id).limit(limit))
+
+    def mark_written(self, jobs):
+        """
+        Marca os jobs como concluídos depois que seus eventos foram gravados,
+        registrando cada página em crawl_page. Chamado na mesma transação que
+        grava os eventos.
+        """
+        for job in jobs:
+            record_persisted_page(job.site, job.start_date, job.offset, job.content_hash)
+        (CrawlJob
+         .update(status='done', result=None, updated_at=datetime.utcnow())
+         .where(CrawlJob.id.in_([job.id for job in jobs]))
+         .execute())
+
+    def counts(self):
+        """
+        Número de jobs por status.
+        """
+        query = CrawlJob.select(CrawlJob.status, fn.COUNT(CrawlJob.id)).group_by(CrawlJob.status).tuples()
+        return dict(query)
+
+    def has_work(self, statuses=('pending', 'leased')):
+        """
+        Há jobs em algum dos `statuses`? Os workers param quando não há nada
+        a buscar; o escritor, quando também não há nada a gravar.
+        """
+        return CrawlJob.select().where(CrawlJob.status.in_(list(statuses))).exists()
@@ -1,49 +1,137 @@
 # src/queries/database_queries.py
 
-from peewee import fn, prefetch
+from peewee import fn
 from src.db.database import database
 from src.db.models.event import Event
 from src.db.models.event_data import EventData
 from src.db.models.metadata import Metadata
+from src.db.models.event_details import EventDetails
+from src.db.models.event_search import EventSearch
+from src.db.models.venue import Venue
+from src.db.models.scrape_run import ScrapeRun
+from src.db.models.crawl_job import CrawlJob
+from src.config import settings
+from src.queries.query_cache import query_cache
+from src.queries.rows import event_rows
+from src.pipelines.details import PROJECTED_KEYS
+from src.parsers.address_parser import canonical_city
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pesos do bm25 por coluna do índice: nome, descrição, localização.
+SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+RIO_DE_JANEIRO = "Rio de Janeiro"
+
+
+def build_search_expression(text, column=None, phrase=False):
+    """
+    Converte texto livre em uma expressão MATCH do FTS5 sem operadores:
+    cada termo vira uma string entre aspas (ou o texto todo, se `phrase`),
+    opcionalmente restrita a uma coluna do índice. Retorna None se não há termos.
+    """
+    terms = [text.strip()] if phrase else text.split()
+    terms = ['"' + term.replace('"', '""') + '"' for term in terms if term]
+    if not terms:
+        return None
+    expression = ' '.join(terms)
+    if column:
+        expression = f"{column} : ({expression})"
+    return expression
+
+
+def _in_city(city):
+    """
+    Condição sobre EventData: o local normalizado fica na cidade `city`.
+    Usa o índice de venue.city (comparação sem diferenciar maiúsculas; as
+    cidades de KNOWN_CITIES são gravadas e buscadas com a mesma grafia,
+    inclusive nos acentos). Locais cujo endereço não revelou a cidade
+    (venue.city nulo) entram se o texto de event_data.location contém
+    `city`, como na consulta original.
+    """
+    city = canonical_city(city)
+    in_city = EventData.venue.in_(Venue.select(Venue.id).where(Venue.city == city))
+    unknown_city = EventData.venue.in_(Venue.select(Venue.id).where(Venue.city.is_null()))
+    return in_city | (unknown_city & (EventData.location ** f'%{city}%'))
+
+
+def _event_rows_query(where=None, join_details=False):
+    """
+    Consulta base de Event x EventData em um único SELECT com JOIN, devolvendo
+    tuplas (nome, tipo, descrição, data, localização) em vez de instâncias,
+    para que nenhuma linha dispare consultas adicionais (N+1).
+    """
+    query = (EventData
+             .select(Event.name, Event.type, Event.description, EventData.date, EventData.location)
+             .join(Event))
+    if join_details:
+        query = query.switch(Event).join(EventDetails)
+    if where is not None:
+        query = query.where(where)
+    return query
+
+def _is_outdoor():
+    """
+    Condição sobre EventDetails: evento marcado como 'Ao ar livre' (coluna indexada).
+    """
+    return EventDetails.event_type == 'Ao ar livre'
+
+def _iter_event_rows(where=None, join_details=False, chunk_size=None):
+    """
+    Percorre Event x EventData em ordem de (Event.name, EventData.date) usando
+    paginação por chave (keyset): cada bloco continua a partir da última chave
+    vista, em vez de usar OFFSET, e só um bloco fica em memória por vez.
+    Gera listas de tuplas (nome, tipo, descrição, data, localização).
+    """
+    chunk_size = chunk_size or settings.query_chunk_size
+    last_name = last_date = None
+
+    while True:
+        query = _event_rows_query(where, join_details)
+        if last_name is not None:
+            query = query.where(
+                (Event.name > last_name) |
+                ((Event.name == last_name) & (EventData.date > last_date))
+            )
+        rows = list(query.order_by(Event.name, EventData.date).limit(chunk_size).tuples())
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        last_name, last_date = rows[-1][0], rows[-1][3]
+
+@query_cache.cached
 def get_all_events():
     """
     Consulta 1:
     Mostrar todos os eventos com suas datas, localização e tipo de evento.
     """
     try:
-        prefetch_query = prefetch(
-            Event.select().order_by(Event.name),
-            EventData.select().order_by(EventData.date)
-        )
-
-        results = []
-        event_count = 0
-        eventdata_count = 0
-
-        for event in prefetch_query:
-            event_count += 1
-            for event_data in event.data:
-                eventdata_count += 1
-                results.append({
-                    'Nome': event.name,
-                    'Tipo': event.type,
-                    'Descrição': event.description,
-                    'Data': event_data.date.strftime('%Y-%m-%d'),
-                    'Localização': event_data.location
-                })
-
-        logger.info(f"Total de eventos: {event_count}")
-        logger.info(f"Total de dados de eventos: {eventdata_count}")
+        query = _event_rows_query().order_by(Event.name, EventData.date).tuples()
+        results = event_rows(query)
+
+        logger.info("Total de eventos: %s", len({row.name for row in results}))
+        logger.info("Total de dados de eventos: %s", len(results))
         return results
 
     except Exception as e:
         logger.exception("Erro ao obter todos os eventos.")
         return []
 
+@query_cache.cached_pages
+def iter_all_events(chunk_size=None):
+    """
+    Versão em streaming da Consulta 1: gera os eventos em blocos de
+    `chunk_size` linhas, com as mesmas chaves de get_all_events().
+    """
+    try:
+        for rows in _iter_event_rows(chunk_size=chunk_size):
+            yield event_rows(rows)
+    except Exception:
+        logger.exception("Erro ao percorrer todos os eventos.")
+
+# Sem cache: o resultado depende da data atual, não só das escritas no banco.
 def get_upcoming_events(limit=2):
     """
     Consulta 2:
@@ -51,108 +139,220 @@ def get_upcoming_events(limit=2):
     """
     try:
         today = fn.DATE('now')
-        query = (EventData
-                 .select(Event, EventData)
-                 .join(Event)
-                 .where(EventData.date >= today)
+        query = (_event_rows_query(where=EventData.date >= today)
                  .order_by(EventData.date)
-                 .limit(limit))
-        results = []
-        for event_data in query:
-            results.append({
-                'Nome': event_data.event.name,
-                'Tipo': event_data.event.type,
-                'Descrição': event_data.event.description,
-                'Data': event_data.date.strftime('%Y-%m-%d'),
-                'Localização': event_data.location
-            })
-        return results
+                 .limit(limit)
+                 .tuples())
+        return event_rows(query)
     except Exception as e:
         logger.exception("Erro ao obter eventos próximos.")
         return []
 
-def get_events_in_rio():
+@query_cache.cached
+def get_events_in_city(city):
     """
-    Consulta 3:
-    Mostrar os eventos que acontecem no Rio de Janeiro.
+    Mostrar os eventos cujo local normalizado fica na cidade `city`.
     """
     try:
-        query = (
-            Event
-            .select(Event, EventData)
-            .join(EventData)
-            .where(EventData.location ** "%Rio de Janeiro%")  # Busca insensível a maiúsculas/minúsculas
-            .order_by(Event.name)
-        )
-        results = []
-        event_count = 0
-        eventdata_count = 0
-        for event in query:
-            event_count += 1
-            for event_data in event.data:  # Corrigido para 'data'
-                if "Rio de Janeiro" in event_data.location:
-                    eventdata_count += 1
-                    results.append({
-                        'Nome': event.name,
-                        'Tipo': event.type,
-                        'Descrição': event.description,
-                        'Data': event_data.date.strftime('%Y-%m-%d'),
-                        'Localização': event_data.location
-                    })
-        logger.info(f"Total de eventos no Rio de Janeiro: {event_count}")
-        logger.info(f"Total de dados de eventos no Rio de Janeiro: {eventdata_count}")
+        query = _event_rows_query(where=_in_city(city)).order_by(Event.name, EventData.date).tuples()
+        results = event_rows(query)
+        logger.info("Total de eventos em %s: %s", city, len({row.name for row in results}))
+        logger.info("Total de dados de eventos em %s: %s", city, len(results))
         return results
     except Exception as e:
-        logger.exception("Erro ao obter eventos no Rio de Janeiro.")
+        logger.exception("Erro ao obter eventos em %s.", city)
         return []
 
+def get_events_in_rio():
+    """
+    Consulta 3:
+    Mostrar os eventos que acontecem no Rio de Janeiro.
+    """
+    return get_events_in_city(RIO_DE_JANEIRO)
+
+@query_cache.cached_pages
+def iter_events_in_rio(chunk_size=None):
+    """
+    Versão em streaming da Consulta 3, em blocos de `chunk_size` linhas.
+    """
+    try:
+        where = _in_city(RIO_DE_JANEIRO)
+        for rows in _iter_event_rows(where=where, chunk_size=chunk_size):
+            yield event_rows(rows)
+    except Exception:
+        logger.exception("Erro ao percorrer eventos no Rio de Janeiro.")
+
+@query_cache.cached
 def get_outdoor_events():
     """
     Consulta 4:
     Mostrar todos os eventos que são ao ar livre.
-    Presume-se que há uma metadata 'event_type' com valor 'Ao ar livre'.
+    Presume-se que há um event_type 'Ao ar livre' nos detalhes do evento.
     """
     try:
-        query = (Event
-                 .select(Event, EventData, Metadata)
-                 .join(EventData)
-                 .switch(Event)
-                 .join(Metadata)
-                 .where((Metadata.key == 'event_type') & (Metadata.value == 'Ao ar livre'))
-                 .order_by(Event.name))
-        results = []
-        for event in query:
-            for event_data in event.eventdata:
-                results.append({
-                    'Nome': event.name,
-                    'Tipo': event.type,
-                    'Descrição': event.description,
-                    'Data': event_data.date.strftime('%Y-%m-%d'),
-                    'Localização': event_data.location,
-                    'Tipo de Evento': 'Ao ar livre'
-                })
-        return results
+        query = (_event_rows_query(where=_is_outdoor(), join_details=True)
+                 .order_by(Event.name, EventData.date)
+                 .tuples())
+        return event_rows(query, event_type='Ao ar livre')
     except Exception as e:
         logger.exception("Erro ao obter eventos ao ar livre.")
         return []
 
+@query_cache.cached_pages
+def iter_outdoor_events(chunk_size=None):
+    """
+    Versão em streaming da Consulta 4, em blocos de `chunk_size` linhas.
+    """
+    try:
+        for rows in _iter_event_rows(where=_is_outdoor(), join_details=True, chunk_size=chunk_size):
+            yield event_rows(rows, event_type='Ao ar livre')
+    except Exception:
+        logger.exception("Erro ao percorrer eventos ao ar livre.")
+
+def _format_detail(value):
+    """
+    Valor de uma coluna de EventDetails como texto, como era gravado em Metadata.
+    """
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return value
+
+def _metadata_by_event(event_filter=None):
+    """
+    Junta, por nome de evento, as colunas preenchidas de EventDetails e as
+    chaves raras de Metadata, em dois SELECTs, e devolve uma lista ordenada
+    de pares (nome do evento, {chave: valor}) com as chaves em ordem alfabética.
+    Eventos sem nenhum metadado ficam de fora.
+    """
+    details_query = (EventDetails
+                     .select(Event.name, *[getattr(EventDetails, key) for key in PROJECTED_KEYS])
+                     .join(Event))
+    metadata_query = (Metadata
+                      .select(Event.name, Metadata.key, Metadata.value)
+                      .join(Event))
+    if event_filter is not None:
+        details_query = details_query.where(event_filter)
+        metadata_query = metadata_query.where(event_filter)
+
+    results = {}
+    for name, *values in details_query.tuples():
+        details = {key: _format_detail(value) for key, value in zip(PROJECTED_KEYS, values) if value is not None}
+        if details:
+            results.setdefault(name, {}).update(details)
+    for name, key, value in metadata_query.tuples():
+        results.setdefault(name, {})[key] = value
+    return [(name, dict(sorted(results[name].items()))) for name in sorted(results)]
+
+@query_cache.cached
 def get_metadata_per_event():
     """
     Consulta 5:
     Mostrar todos os Metadados por evento.
     """
     try:
-        query = (Metadata
-                 .select(Metadata, Event)
-                 .join(Event)
-                 .order_by(Event.name, Metadata.key))
-        results = {}
-        for metadata in query:
-            event_name = metadata.event.name
-            if event_name not in results:
-                results[event_name] = {}
-            results[event_name][metadata.key] = metadata.value
-        return results
+        return dict(_metadata_by_event())
     except Exception as e:
         logger.exception("Erro ao obter metadados por evento.")
         return {}
+
+@query_cache.cached_pages
+def iter_metadata_per_event(chunk_size=None):
+    """
+    Versão em streaming da Consulta 5: gera blocos de pares
+    (nome do evento, {chave: valor}), paginando os eventos por Event.name
+    em blocos de `chunk_size` eventos.
+    """
+    chunk_size = chunk_size or settings.query_chunk_size
+    last_name = None
+
+    try:
+        while True:
+            query = Event.select(Event.id, Event.name)
+            if last_name is not None:
+                query = query.where(Event.name > last_name)
+            events = list(query.order_by(Event.name).limit(chunk_size).tuples())
+            if not events:
+                break
+
+            chunk = _metadata_by_event(Event.id.in_([event_id for event_id, _ in events]))
+            if chunk:
+                yield chunk
+            if len(events) < chunk_size:
+                break
+            last_name = events[-1][1]
+    except Exception:
+        logger.exception("Erro ao percorrer metadados por evento.")
+
+@query_cache.cached
+def search_events(text, limit=50):
+    """
+    Consulta 6:
+    Busca textual livre em nome, descrição e localização dos eventos,
+    ordenada por relevância (bm25, com mais peso para o nome).
+    """
+    try:
+        expression = build_search_expression(text)
+        if expression is None:
+            return []
+        score = EventSearch.bm25(*SEARCH_WEIGHTS)
+        query = (EventSearch
+                 .select(Event.name, Event.type, Event.description, EventData.date, EventData.location, score)
+                 .join(EventData, on=(EventData.id == EventSearch.rowid))
+                 .join(Event, on=(Event.id == EventData.event))
+                 .where(EventSearch.match(expression))
+                 .order_by(score, EventData.date)
+                 .limit(limit)
+                 .tuples())
+        rows = list(query)
+        results = event_rows(row[:-1] for row in rows)
+        for event, row in zip(results, rows):
+            event.relevance = round(-row[-1], 2)  # bm25 do SQLite é negativo: menor é melhor
+        logger.info("Busca por '%s': %s resultados.", text, len(results))
+        return results
+    except Exception as e:
+        logger.exception("Erro ao buscar eventos por '%s'.", text)
+        return []
+
+
+def get_database_stats():
+    """
+    Resumo do banco para o comando `stats` da CLI: linhas por tabela, a
+    última execução do scraper (e a última com sucesso) e os jobs da fila
+    de trabalho por status.
+    """
+    def run_summary(run):
+        if run is None:
+            return None
+        return {
+            'id': run.id,
+            'started_at': run.started_at,
+            'finished_at': run.finished_at,
+            'duration': round(run.duration, 2),
+            'success': run.success,
+            'crawler_mode': run.crawler_mode,
+            'full_recrawl': run.full_recrawl,
+            'requests': run.requests,
+            'events_parsed': run.events_parsed,
+            'events_inserted': run.events_inserted,
+            'events_updated': run.events_updated,
+        }
+
+    try:
+        tables = {model._meta.table_name: model.select().count()
+                  for model in (Event, EventData, EventDetails, Metadata, Venue)}
+        last_run = ScrapeRun.select().order_by(ScrapeRun.id.desc()).first()
+        last_success = (ScrapeRun
+                        .select()
+                        .where(ScrapeRun.success)
+                        .order_by(ScrapeRun.id.desc())
+                        .first())
+        jobs = dict(CrawlJob.select(CrawlJob.status, fn.COUNT(CrawlJob.id)).group_by(CrawlJob.status).tuples())
+        return {
+            'tables': tables,
+            'last_run': run_summary(last_run),
+            'last_success': run_summary(last_success),
+            'crawl_jobs': jobs,
+        }
+    except Exception as e:
+        logger.exception("Erro ao obter as estatísticas do banco.")
+        return {}
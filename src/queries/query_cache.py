@@ -0,0 +1,168 @@
+import functools
+import logging
+import sys
+from collections import OrderedDict
+from src.config import settings
+from src.db.database import database
+
+
+def estimate_size(value):
+    """
+    Estimativa em bytes de um resultado de consulta (listas, tuplas,
+    dicionários e objetos com __slots__, como EventRow, de strings, números
+    e datas), usada no limite de memória. Strings internadas, compartilhadas
+    entre linhas, são contadas em cada uma: a estimativa erra para cima.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    else:
+        for slot in getattr(type(value), '__slots__', ()):
+            size += estimate_size(getattr(value, slot, None))
+    return size
+
+
+class QueryCache:
+    """
+    Cache em memória dos resultados de src/queries/database_queries.py,
+    indexado por função e argumentos, com evicção LRU por tamanho estimado.
+
+    Os resultados valem para uma geração de escrita, que combina um contador incrementado pelo DatabasePipeline a cada escrita
+    confirmada com o `PRAGMA data_version` do SQLite, que muda quando outra
+    conexão (outro processo) grava no banco. Quando a geração muda, todas as
+    entradas anteriores são descartadas.
+
+    Os resultados são compartilhados entre chamadas: não devem ser modificados.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4
+        self._entries = OrderedDict()  # chave -> (tamanho, resultado)
+        self._bytes = 0
+        self._write_generation = 0
+        self._last_generation = None
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def bump_generation(self):
+        """
+        Chamado depois de cada escrita confirmada: invalida todas as entradas.
+        """
+        self._write_generation += 1
+
+    def generation(self):
+        data_version = database.execute_sql('PRAGMA data_version').fetchone()[0]
+        return self._write_generation, data_version
+
+    def get(self, key, generation):
+        if generation != self._last_generation:
+            self.clear()
+            self._last_generation = generation
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, generation, result, size):
+        # Houve escrita neste processo enquanto o resultado era calculado: já nasce obsoleto.
+        if size > self.max_entry_bytes or generation[0] != self._write_generation:
+            return
+        self._discard(key)
+        self._entries[key] = (size, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def log_stats(self, name, hit):
+        self.logger.info(
+            "Cache de consultas: %s em %s "
+            "(%s hits, %s misses, %s entradas, %.0f KB).",
+            'hit' if hit else 'miss', name, self.hits, self.misses, len(self), self._bytes / 1024
+        )
+
+    @staticmethod
+    def make_key(func, args, kwargs):
+        return func.__name__, args, tuple(sorted(kwargs.items()))
+
+    def cached(self, func):
+        """
+        Decorador para funções que retornam o resultado inteiro (lista ou dicionário).
+        Resultados vazios não são guardados: podem vir de um erro já registrado.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.query_cache_enabled:
+                return func(*args, **kwargs)
+
+            key = self.make_key(func, args, kwargs)
+            generation = self.generation()
+            entry = self.get(key, generation)
+            self.log_stats(func.__name__, entry is not None)
+            if entry is not None:
+                return entry[1]
+
+            result = func(*args, **kwargs)
+            if result:
+                self.put(key, generation, result, estimate_size(result))
+            return result
+        return wrapper
+
+    def cached_pages(self, func):
+        """
+        Decorador para os geradores iter_* que produzem blocos de linhas.
+        Num miss, os blocos são repassados à medida que chegam e acumulados;
+        a entrada só é guardada se o gerador for consumido até o fim e couber
+        no limite por entrada, senão o acúmulo é abandonado no meio do caminho.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.query_cache_enabled:
+                yield from func(*args, **kwargs)
+                return
+
+            key = self.make_key(func, args, kwargs)
+            generation = self.generation()
+            entry = self.get(key, generation)
+            self.log_stats(func.__name__, entry is not None)
+            if entry is not None:
+                yield from entry[1]
+                return
+
+            pages = []
+            size = 0
+            for page in func(*args, **kwargs):
+                if pages is not None:
+                    size += estimate_size(page)
+                    if size > self.max_entry_bytes:
+                        pages = None
+                    else:
+                        pages.append(page)
+                yield page
+            if pages:
+                self.put(key, generation, pages, size)
+        return wrapper
+
+
+query_cache = QueryCache(settings.query_cache_max_mb * 1024 * 1024)
@@ -0,0 +1,84 @@
+# src/queries/rows.py
+from collections.abc import Mapping
+
+# Chave de exibição -> atributo de EventRow.
+DISPLAY_KEYS = {
+    'Nome': 'name',
+    'Tipo': 'type',
+    'Descrição': 'description',
+    'Data': 'date',
+    'Localização': 'location',
+    'Tipo de Evento': 'event_type',
+    'Relevância': 'relevance',
+}
+# Chaves que só aparecem quando preenchidas (eventos ao ar livre, busca textual).
+OPTIONAL_KEYS = ('Tipo de Evento', 'Relevância')
+BASE_KEYS = tuple(key for key in DISPLAY_KEYS if key not in OPTIONAL_KEYS)
+
+
+class EventRow(Mapping):
+    """
+    Linha de exibição de um evento devolvida pelas consultas. Guarda os
+    valores em __slots__, sem um dicionário por linha, mas se comporta como
+    um mapeamento somente leitura com as chaves usadas pelo menu ('Nome',
+    'Tipo', 'Descrição', 'Data', 'Localização' e, quando preenchidas,
+    'Tipo de Evento' e 'Relevância'); dict(row) devolve o dicionário.
+    """
+    __slots__ = ('name', 'type', 'description', 'date', 'location', 'event_type', 'relevance')
+
+    def __init__(self, name, type, description, date, location, event_type=None, relevance=None):
+        self.name = name
+        self.type = type
+        self.description = description
+        self.date = date
+        self.location = location
+        self.event_type = event_type
+        self.relevance = relevance
+
+    def __getitem__(self, key):
+        attribute = DISPLAY_KEYS.get(key)
+        if attribute is None:
+            raise KeyError(key)
+        value = getattr(self, attribute)
+        if value is None and key in OPTIONAL_KEYS:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        yield from BASE_KEYS
+        if self.event_type is not None:
+            yield 'Tipo de Evento'
+        if self.relevance is not None:
+            yield 'Relevância'
+
+    def __len__(self):
+        return len(BASE_KEYS) + (self.event_type is not None) + (self.relevance is not None)
+
+    def __repr__(self):
+        return f"EventRow({dict(self)!r})"
+
+
+def event_rows(rows, event_type=None):
+    """
+    Converte tuplas (nome, tipo, descrição, data, localização) em EventRow.
+    Tipo, data e localização se repetem em muitas linhas: cada valor fica
+    uma única vez no resultado (e cada data é formatada uma única vez), num
+    dicionário local em vez de sys.intern, que cresceria a tabela global de
+    strings internadas com localizações que nunca se repetem. Linhas seguidas
+    do mesmo evento (as consultas ordenam por nome) compartilham as strings
+    de nome e descrição, em vez de uma cópia por linha vinda do cursor.
+    """
+    dates = {}
+    shared = {}
+    previous = None
+    result = []
+    for name, type_, description, date, location in rows:
+        text = dates.get(date)
+        if text is None:
+            text = dates[date] = date.strftime('%Y-%m-%d')
+        if previous is not None and name == previous.name:
+            name, description = previous.name, previous.description
+        previous = EventRow(name, shared.setdefault(type_, type_), description, text,
+                            shared.setdefault(location, location), event_type)
+        result.append(previous)
+    return result
@@ -1,101 +1,490 @@
+import asyncio
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 from src.db.init_db import initialize_db
-from src.crawlers.event_crawler import EventCrawler
+from src.crawlers.event_crawler import EventCrawler, AJAX_ACTION, next_page_offset
+from src.crawlers.response_cache import ResponseCache
 from src.db.database import database
 from src.config import settings
 import logging
 from src.parsers.event_parser import EventParser
+from src.parsers.parallel_parser import ParallelEventParser
 from src.pipelines.database_pipeline import DatabasePipeline
+from src.pipelines.crawl_state import CrawlState
+from src.pipelines.crawl_pages import INITIAL_PAGE, forget_persisted_pages
+from src.pipelines.work_queue import WorkQueue, ACTIVE_STATUSES, decode_events
+from src.pipelines.run_metrics import start_scrape_run, record_scrape_run
+from src.db.models.scrape_run import ScrapeRun
+from peewee import fn
+from src.utils.metrics import metrics, EVENTS_PARSED
+from src.utils.log_config import setup_logging
+from src.utils.run_lock import RunLock
 
 
-def setup_logging():
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+def build_date_windows():
+    """
+    Determina as datas de início das janelas AJAX cobrindo
+    `settings.crawler_horizon_days` em passos de `settings.crawler_window_days`.
 
-    # Formato dos logs
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    A primeira janela é alinhada a um múltiplo de `crawler_window_days` (contado
+    desde 01/01/0001), e não a hoje, para que execuções em dias próximos
+    reutilizem as mesmas janelas e o modo incremental possa pulá-las.
+    """
+    today = datetime.today()
+    first = today - timedelta(days=today.toordinal() % settings.crawler_window_days)
+    date_list = [
+        first + timedelta(days=day)
+        for day in range(0, settings.crawler_horizon_days, settings.crawler_window_days)
+    ]
+    return [date.strftime('%Y-%m-%d') for date in date_list]
 
-    # Handler para console
-    ch = logging.StreamHandler()
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
-    # Handler para arquivo
-    fh = logging.FileHandler(settings.scraper_log)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
+class ScraperSession:
+    """
+    Recursos do scraper que sobrevivem entre execuções: banco inicializado e
+    conexão aberta, EventParser, DatabasePipeline (com o mapa de identidade),
+    EventCrawler do modo sync (sessão HTTP keep-alive e cache) e pool de parse.
 
+    `scraper()` cria uma sessão descartável por chamada; o daemon mantém a
+    mesma sessão entre os ciclos, sem refazer esse trabalho a cada execução.
+    O AsyncEventCrawler continua sendo criado por execução, porque a sessão
+    aiohttp fica presa ao event loop de cada `asyncio.run`.
+    """
 
-def scraper():
-    setup_logging()
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_ready = False
+        self.last_run_id = None
+        self._parser = None
+        self._pipeline = None
+        self._crawler = None
+        self._parse_stage = None
+
+    @property
+    def parser(self):
+        if self._parser is None:
+            self._parser = EventParser()
+        return self._parser
+
+    @property
+    def pipeline(self):
+        if self._pipeline is None:
+            self._pipeline = DatabasePipeline()
+        return self._pipeline
+
+    @property
+    def crawler(self):
+        if self._crawler is None:
+            cache = ResponseCache() if settings.http_cache_enabled else None
+            self._crawler = EventCrawler(settings.targets[0], cache=cache)
+        return self._crawler
+
+    @property
+    def parse_stage(self):
+        if self._parse_stage is None:
+            self._parse_stage = ParallelEventParser(self.parser)
+        return self._parse_stage
+
+    def prepare(self):
+        """
+        Deixa a sessão pronta para uma execução: inicializa o banco só na
+        primeira vez e reabre a conexão se ela foi fechada. Se outro processo
+        executou o scraper desde a última execução desta sessão, o mapa de
+        identidade pode estar desatualizado e é descartado.
+        """
+        if not self.db_ready:
+            self.logger.info("Inicializando o banco de dados...")
+            initialize_db()
+            self.db_ready = True
+        database.connect(reuse_if_open=True)
+        self.pipeline.reset_stats()
+        if self.last_run_id is not None:
+            latest = ScrapeRun.select(fn.MAX(ScrapeRun.id)).scalar()
+            if latest != self.last_run_id:
+                self.logger.info("Outro processo executou o scraper desde a execução %s. Descartando o mapa de identidade.",
+                                 self.last_run_id)
+                self.pipeline.identity_map.clear()
+
+    def finish_run(self, run):
+        self.last_run_id = run.id if run is not None else None
+        if self._crawler is not None and self._crawler.cache is not None:
+            self._crawler.cache.log_stats()
+
+    def recycle(self):
+        """
+        Descarta o crawler e o pool de parse depois de uma execução que
+        falhou; a próxima cria outros, em vez de herdar uma sessão HTTP ou um
+        pool em estado ruim. O mapa de identidade também é esvaziado: ele pode
+        ter ids de eventos de transações desfeitas.
+        """
+        if self._pipeline is not None:
+            self._pipeline.identity_map.clear()
+        if self._parse_stage is not None:
+            self._parse_stage.close()
+            self._parse_stage = None
+        if self._crawler is not None:
+            self._crawler.close()
+            self._crawler = None
+
+    def close(self):
+        self.recycle()
+        if not database.is_closed():
+            database.close()
+            self.logger.info("Conexão com o banco de dados fechada.")
+
+
+def iter_window_pages(crawler, date_windows, crawl_state):
+    """
+    Gera (date_str, offset, next_offset, response_json) para cada página de
+    cada janela, buscando a próxima página só quando a anterior já foi
+    consumida. Janelas retomadas começam do checkpoint da execução
+    interrompida. Páginas cujo conteúdo já foi gravado (mesmo hash em
+    crawl_page) passam com response_json None, sem parse, só para registrar
+    o checkpoint.
+    Ao fim de cada janela percorrida sem erros, gera (date_str, None, None, None).
+    """
     logger = logging.getLogger(__name__)
-    
-    try:
-        logger.info("Inicializando o banco de dados...")
-        initialize_db()
-        
-        crawler = EventCrawler(settings.target_url)
-        parser = EventParser()
-        pipeline = DatabasePipeline()
-        
-        logger.info(f"Buscando a página inicial: {settings.target_url}")
+
+    for idx, date_str in enumerate(date_windows, start=1):
+        logger.debug("Iniciando requisições AJAX para data %s: %s", idx, date_str)
+        crawl_state.start_window(date_str)
+        start_offset, pages_done = crawl_state.resume_point(date_str)
+        if pages_done:
+            logger.info("Janela %s retomada no offset %s (%s páginas já gravadas).", date_str, start_offset, pages_done)
+        pages = unchanged = 0
+        for offset, response_json in crawler.iter_event_pages(AJAX_ACTION, date_str, start_offset=start_offset,
+                                                              pages_done=pages_done):
+            pages += 1
+            next_offset = next_page_offset(response_json, offset)
+            if crawl_state.page_unchanged(date_str, offset, crawler.last_content_hash):
+                logger.debug("Página da data %s, offset %s já gravada com o mesmo conteúdo. Pulando o parse.", date_str, offset)
+                unchanged += 1
+                yield date_str, offset, next_offset, None
+                continue
+            yield date_str, offset, next_offset, response_json
+        if not pages:
+            logger.info("Nenhum conteúdo HTML retornado para data %s. Pulando para a próxima data.", date_str)
+        else:
+            logger.info("Janela %s (%s/%s): %s páginas, %s inalteradas.", date_str, idx, len(date_windows), pages, unchanged)
+        if crawler.last_window_complete:
+            yield date_str, None, None, None
+
+
+def iter_parsed_pages(parse_stage, pages):
+    """
+    Extrai os eventos de cada página AJAX. O parse roda no pool de processos
+    do `parse_stage` enquanto as próximas páginas ainda estão sendo buscadas.
+    Gera (date_str, offset, next_offset, events); páginas inalteradas e os
+    marcadores de fim de janela (offset None) passam adiante na mesma ordem,
+    com events None.
+    """
+    logger = logging.getLogger(__name__)
+
+    def html_of(page):
+        response_json = page[3]
+        return None if response_json is None else response_json.get('html', '')
+
+    for (date_str, offset, next_offset, response_json), events in parse_stage.parse_many(pages, html_of=html_of):
+        if response_json is not None and not events:
+            logger.debug("Nenhum evento encontrado para data %s, offset %s.", date_str, offset)
+        yield date_str, offset, next_offset, events
+
+
+def persist_pages(pipeline, parsed_pages, crawl_state):
+    """
+    Envia cada página de eventos para o pipeline assim que ela é extraída e
+    registra a página no estado do crawl, na mesma transação: o checkpoint
+    de uma página só existe se os seus eventos foram gravados (e o mapa de
+    identidade do pipeline só os vê depois do commit). Uma janela só
+    é marcada como completa depois que todas as suas páginas foram gravadas.
+    Retorna o total de eventos enviados.
+    """
+    logger = logging.getLogger(__name__)
+    total = 0
+
+    for date_str, offset, next_offset, events in parsed_pages:
+        if offset is None:
+            crawl_state.complete_window(date_str)
+            continue
+        with pipeline.transaction():
+            if events:
+                logger.debug("%s eventos encontrados para data %s, offset %s. Enviando para o pipeline.", len(events), date_str, offset)
+                pipeline.process_events(events)
+                total += len(events)
+            crawl_state.record_page(date_str, offset, len(events or []), next_offset)
+    return total
+
+
+def process_initial_page(parser, pipeline, initial_html):
+    logger = logging.getLogger(__name__)
+
+    initial_events = parser.parse_events_from_html(initial_html)
+    if initial_events:
+        logger.info("%s eventos encontrados na página inicial. Enviando para o pipeline.", len(initial_events))
+        pipeline.process_events(initial_events)
+    else:
+        logger.info("Nenhum evento encontrado na página inicial.")
+
+
+def scrape_sync(session, crawl_state, date_windows):
+    """
+    Busca a página inicial e depois percorre cada janela de datas, página a
+    página, até o endpoint indicar que não há mais eventos. Usa o crawler e
+    o pool de parse da `session`, que continuam abertos depois da execução.
+    """
+    logger = logging.getLogger(__name__)
+    crawler = session.crawler
+
+    if crawl_state.initial_page_done:
+        logger.info("Página inicial já gravada pela execução interrompida. Pulando.")
+    else:
+        logger.info("Buscando a página inicial: %s", crawler.base_url)
         initial_html = crawler.fetch_initial_page()
         if not initial_html:
             logger.error("Falha ao obter a página inicial. Encerrando scraping.")
-            return
+            return False
 
-        initial_events = parser.parse_events_from_html(initial_html)
-        if initial_events:
-            logger.info(f"{len(initial_events)} eventos encontrados na página inicial. Enviando para o pipeline.")
-            pipeline.process_events(initial_events)
-        else:
-            logger.info("Nenhum evento encontrado na página inicial.")
-        
-
-        # Determinar três datas com intervalo de semanas
-        today = datetime.today()
-        date_list = [today + timedelta(weeks=i) for i in range(3)]
-        date_str_list = [date.strftime('%Y-%m-%d') for date in date_list]
-
-        for idx, date_str in enumerate(date_str_list, start=1):
-            logger.info(f"Iniciando requisição AJAX para data {idx}: {date_str}")
-            action = 'mec_grid_load_more'
-            offset = 0
-            
-            response_json = crawler.fetch_events_ajax(
-                action=action,
-                start_date=date_str,
-                offset=offset,
-            )
-            
-            if not response_json:
-                logger.error(f"Falha ao obter dados via AJAX para data {date_str}. Pulando para a próxima data.")
+        with session.pipeline.transaction():
+            if crawl_state.page_unchanged(INITIAL_PAGE, 0, crawler.last_content_hash):
+                logger.info("Página inicial já gravada com o mesmo conteúdo. Pulando o parse.")
+            else:
+                process_initial_page(session.parser, session.pipeline, initial_html)
+            crawl_state.record_initial_page()
+
+    pages = iter_window_pages(crawler, date_windows, crawl_state)
+    total = persist_pages(session.pipeline, iter_parsed_pages(session.parse_stage, pages), crawl_state)
+    logger.info("%s eventos processados a partir das janelas AJAX.", total)
+    return True
+
+
+async def scrape_async(session, crawl_state, date_windows):
+    """
+    Busca a página inicial e todas as janelas de datas de forma concorrente,
+    agendando a próxima página de cada janela assim que a anterior chega.
+    Cada resposta vai para o pool de parse assim que chega, e os eventos são
+    persistidos no processo principal na ordem de chegada.
+    """
+    from src.crawlers.async_event_crawler import AsyncEventCrawler
+
+    logger = logging.getLogger(__name__)
+    parse_stage = session.parse_stage
+    pipeline = session.pipeline
+    parsed_pages = asyncio.Queue()
+
+    async def crawl(crawler, date_windows):
+        async def fetch_initial():
+            if crawl_state.initial_page_done:
+                logger.info("Página inicial já gravada pela execução interrompida. Pulando.")
+                return True
+            initial_html = await crawler.fetch_initial_page()
+            if initial_html:
+                await parsed_pages.put((None, asyncio.ensure_future(parse_stage.parse_async(initial_html))))
+            return bool(initial_html)
+
+        initial_task = asyncio.ensure_future(fetch_initial())
+        resume_points = {}
+        for date_str in date_windows:
+            crawl_state.start_window(date_str)
+            start_offset, pages_done = crawl_state.resume_point(date_str)
+            if pages_done:
+                resume_points[date_str] = (start_offset, pages_done)
+                logger.info("Janela %s retomada no offset %s (%s páginas já gravadas).", date_str, start_offset, pages_done)
+
+        try:
+            pages = crawler.fetch_windows_paginated(AJAX_ACTION, date_windows, resume_points=resume_points)
+            async for date_str, offset, response_json in pages:
+                if offset is None:
+                    await parsed_pages.put(((date_str, None, None), None))
+                    continue
+                html_content = response_json.get('html', '')
+                page = (date_str, offset, next_page_offset(response_json, offset))
+                await parsed_pages.put((page, asyncio.ensure_future(parse_stage.parse_async(html_content))))
+            return await initial_task
+        finally:
+            await parsed_pages.put(None)
+
+    async with AsyncEventCrawler(settings.targets[0]) as crawler:
+        logger.info(
+            "Buscando a página inicial e %s janelas AJAX "
+            "(concorrência máxima: %s)",
+            len(date_windows), crawler.concurrency
+        )
+        crawl_task = asyncio.ensure_future(crawl(crawler, date_windows))
+
+        total = 0
+        window_pages = Counter()
+        window_events = Counter()
+        while (item := await parsed_pages.get()) is not None:
+            page, parse_task = item
+            if page is not None and page[1] is None:
+                crawl_state.complete_window(page[0])
+                logger.info("Janela %s: %s páginas, %s eventos.", page[0], window_pages[page[0]], window_events[page[0]])
                 continue
-            
-            html_content = response_json.get('html', '')
-            if not html_content.strip():
-                logger.info(f"Nenhum conteúdo HTML retornado para data {date_str}. Pulando para a próxima data.")
+
+            label = "a página inicial" if page is None else f"data {page[0]}, offset {page[1]}"
+            events = await parse_task
+            with pipeline.transaction():
+                if events:
+                    logger.debug("%s eventos encontrados para %s. Enviando para o pipeline.", len(events), label)
+                    pipeline.process_events(events)
+                    total += len(events)
+                else:
+                    logger.debug("Nenhum evento encontrado para %s.", label)
+                if page is None:
+                    crawl_state.record_initial_page()
+                else:
+                    crawl_state.record_page(page[0], page[1], len(events), page[2])
+            if page is not None:
+                window_pages[page[0]] += 1
+                window_events[page[0]] += len(events)
+
+        initial_ok = await crawl_task
+        logger.info("%s eventos processados.", total)
+        if not initial_ok:
+            logger.error("Falha ao obter a página inicial.")
+            return False
+        return True
+
+
+def scrape_queue(pipeline, date_windows, full_recrawl):
+    """
+    Modo `queue`: enfileira a página inicial e a primeira página de cada
+    janela de cada site em `settings.targets` na tabela crawl_job, inicia
+    `settings.queue_workers` processos worker e grava no banco, como único
+    escritor, os eventos que os workers deixam na fila. Workers em outras
+    máquinas com o mesmo banco podem ajudar (ver src/crawlers/queue_worker.py).
+    Termina quando a fila esvazia, ou quando não há worker local vivo e
+    nenhum job foi concluído em `settings.queue_lease_seconds`.
+    """
+    from src.crawlers.queue_worker import start_queue_workers
+
+    logger = logging.getLogger(__name__)
+    queue = WorkQueue()
+    queue.enqueue(settings.targets, date_windows, full=full_recrawl)
+    workers = start_queue_workers(settings.queue_workers)
+    logger.info("%s workers locais iniciados.", len(workers))
+
+    total = 0
+    last_progress = time.monotonic()
+    try:
+        while True:
+            jobs = queue.fetched_jobs()
+            if jobs:
+                # IMMEDIATE: o pipeline lê antes de escrever, e uma transação adiada
+                # que começou lendo não consegue virar escrita depois que um worker
+                # fez commit (SQLITE_BUSY imediato, sem esperar o timeout).
+                with pipeline.transaction('IMMEDIATE'):
+                    for job in jobs:
+                        events = decode_events(job.result)
+                        EVENTS_PARSED.inc(len(events))
+                        if events:
+                            logger.debug("%s eventos de %s, data %s, offset %s. Enviando para o pipeline.",
+                                         len(events), job.site, job.start_date or "inicial", job.offset)
+                            pipeline.process_events(events)
+                            total += len(events)
+                    queue.mark_written(jobs)
+                last_progress = time.monotonic()
                 continue
 
-            logger.info(f"Processando eventos retornados para data {date_str}")
-            events = parser.parse_events_from_html(html_content)
-            
-            if events:
-                logger.info(f"{len(events)} eventos encontrados para data {date_str}. Enviando para o pipeline.")
-                pipeline.process_events(events)
+            if not queue.has_work(ACTIVE_STATUSES):
+                break
+            if (not any(worker.is_alive() for worker in workers)
+                    and time.monotonic() - last_progress > settings.queue_lease_seconds):
+                logger.warning("Nenhum worker ativo. Os jobs restantes ficam na fila para a próxima execução.")
+                return False
+            time.sleep(settings.queue_poll_seconds)
+    finally:
+        for worker in workers:
+            worker.join(timeout=settings.queue_lease_seconds)
+            if worker.is_alive():
+                worker.terminate()
+
+    counts = queue.counts()
+    logger.info("%s eventos processados a partir da fila (%s jobs concluídos, %s falhos).",
+                total, counts.get('done', 0), counts.get('failed', 0))
+    return True
+
+
+def scraper(full_recrawl=None, session=None):
+    """
+    Executa o scraping. Por padrão segue `settings.scrape_mode`: no modo
+    incremental só busca janelas novas ou vencidas; `full_recrawl=True`
+    força a busca de todas as janelas.
+
+    Se a execução anterior não terminou (erro, Ctrl+C ou processo encerrado)
+    e `settings.scrape_resume` estiver ligado, esta a retoma do último
+    checkpoint: janelas já concluídas e páginas já gravadas não são buscadas
+    de novo.
+
+    Só uma execução por vez: se outro processo já está executando o scraper
+    (trava em `settings.scrape_lock_file`), esta é pulada. Sem `session`, os
+    recursos são criados e fechados aqui; com ela (daemon), ficam abertos
+    para a próxima execução. Retorna True se a execução foi concluída.
+    """
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    lock = RunLock()
+    if not lock.acquire():
+        logger.warning("Outra execução do scraper está em andamento (PID %s, trava %s). Pulando esta execução.",
+                       lock.holder(), lock.path)
+        return False
+
+    own_session = session is None
+    if own_session:
+        session = ScraperSession()
+    if full_recrawl is None:
+        full_recrawl = settings.scrape_mode == "full"
+    metrics.reset()
+    started_at = datetime.utcnow()
+    completed = False
+    run = None
+
+    try:
+        session.prepare()
+        pipeline = session.pipeline
+        crawl_state = CrawlState()
+        resumed = crawl_state.interrupted_run() if settings.scrape_resume else None
+        if resumed is not None:
+            full_recrawl = full_recrawl or resumed.full_recrawl
+        if full_recrawl:
+            # Re-crawl completo: nenhuma página pula o parse por já ter sido gravada.
+            forget_persisted_pages()
+        run = start_scrape_run(started_at, settings.crawler_mode, full_recrawl, resumed)
+        crawl_state.begin_run(run, resumed)
+        if run is not None and resumed is not None:
+            logger.info("Execução %s: retomando a execução interrompida %s (iniciada em %s).",
+                        run.id, resumed.id, resumed.started_at)
+        elif run is not None:
+            logger.info("Execução %s iniciada.", run.id)
+
+        if settings.crawler_mode == "queue":
+            completed = scrape_queue(pipeline, build_date_windows(), full_recrawl)
+        else:
+            if len(settings.targets) > 1:
+                logger.warning("CRAWLER_MODE=%s busca só o primeiro site (%s); use CRAWLER_MODE=queue para vários sites.",
+                               settings.crawler_mode, settings.targets[0])
+            date_windows = crawl_state.windows_to_fetch(build_date_windows(), full=full_recrawl)
+            if settings.crawler_mode == "async":
+                completed = asyncio.run(scrape_async(session, crawl_state, date_windows))
             else:
-                logger.info(f"Nenhum evento encontrado para data {date_str}.")
+                completed = scrape_sync(session, crawl_state, date_windows)
 
+        pipeline.log_stats()
+        if completed:
+            logger.info("Scraping concluído com sucesso.")
 
-        logger.info("Scraping concluído com sucesso.")
-        
     except Exception as e:
-        logger.exception(f"Ocorreu um erro durante a execução do scraper: {e}")
+        logger.exception("Ocorreu um erro durante a execução do scraper: %s", e)
     finally:
-        crawler.close()
-        if not database.is_closed():
-            database.close()
-            logger.info("Conexão com o banco de dados fechada.")
+        if not completed:
+            session.recycle()
+        record_scrape_run(started_at, completed, settings.crawler_mode, full_recrawl, run)
+        session.finish_run(run)
+        if own_session:
+            session.close()
+        lock.release()
+    return completed
 
 if __name__ == "__main__":
-    scraper()
\ No newline at end of file
+    scraper()
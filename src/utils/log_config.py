@@ -0,0 +1,110 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+# Listener ativo, criado uma única vez por processo por setup_logging().
+_listener = None
+_queue_handler = None
+_log_file = None
+
+
+def setup_logging(level=None, log_file=None, console=True):
+    """
+    Configura o logging do processo uma única vez: o logger raiz recebe só um
+    QueueHandler, que apenas enfileira os registros, e uma thread QueueListener
+    os escreve no console e em `settings.scraper_log`. Assim a escrita em disco
+    não bloqueia o crawler nem o pipeline.
+
+    Chamadas seguintes não adicionam handlers; retornam o listener já ativo.
+    """
+    global _listener, _queue_handler, _log_file
+    if _listener is not None:
+        return _listener
+
+    # Importado aqui: carregar as configurações (pydantic_settings) é a maior
+    # parte do tempo de inicialização, e o menu é exibido antes de precisar delas.
+    from src.config import settings
+
+    level = level or settings.log_level
+    log_file = log_file or settings.scraper_log
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_dir = os.path.dirname(log_file)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    _log_file = log_file
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """
+    Escreve os registros ainda na fila, encerra a thread do listener e
+    remove o QueueHandler do logger raiz. setup_logging() pode ser chamado
+    de novo depois.
+    """
+    global _listener, _queue_handler, _log_file
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+    _log_file = None
+
+
+def active_log_file():
+    """
+    Arquivo de log configurado por setup_logging(), ou None se o logging
+    do processo não foi configurado.
+    """
+    return _log_file
+
+
+def setup_worker_logging(log_file=None, level=logging.WARNING):
+    """
+    Logging dos processos worker do parse. Um worker criado por fork herda o
+    QueueHandler do processo principal, mas nenhuma thread consome aquela
+    fila no worker; por isso os handlers herdados são trocados por escrita
+    direta no console e, se `log_file` for dado, no arquivo de log. Os
+    workers só registram avisos e erros, então a escrita síncrona não pesa.
+    """
+    global _listener, _queue_handler, _log_file
+    _listener = _queue_handler = _log_file = None
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,233 @@
+import math
+import os
+import time
+from contextlib import contextmanager
+
+# Limites superiores (em segundos) dos buckets de cada histograma de latência.
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+WRITE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Contador monotônico, com uma série por combinação de rótulos.
+    """
+    type_name = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.reset()
+
+    def reset(self):
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self.values.get(label_key(labels), 0)
+
+    def total(self):
+        return sum(self.values.values())
+
+    def samples(self):
+        # Sem nenhuma série, exporta o zero para que a métrica sempre exista no arquivo.
+        for key, value in (self.values or {(): 0}).items():
+            yield self.name, key, value
+
+    def snapshot(self):
+        return {format_labels(key): value for key, value in self.values.items()}
+
+
+class Gauge(Counter):
+    """
+    Valor instantâneo (duração da execução, vazão etc.).
+    """
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        self.values[label_key(labels)] = value
+
+
+class Histogram:
+    """
+    Histograma de buckets cumulativos, no formato do Prometheus.
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """
+        Estimativa do quantil por interpolação linear dentro do bucket, como o
+        histogram_quantile do Prometheus. Retorna None sem observações.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                upper = self.max if bound == math.inf else min(bound, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket', (), cumulative, (('le', format_value(bound)),)
+        yield f'{self.name}_sum', (), self.sum
+        yield f'{self.name}_count', (), self.count
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+        }
+
+
+class MetricsRegistry:
+    """
+    Métricas de uma execução do scraper. Os estágios registram latências e
+    contadores no registro global `metrics`; ao fim da execução o scraper
+    grava o resumo na tabela scrape_run e exporta tudo no formato texto do
+    Prometheus, para o textfile collector do node exporter.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation):
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name, documentation):
+        return self._register(Gauge(name, documentation))
+
+    def histogram(self, name, documentation, buckets):
+        return self._register(Histogram(name, documentation, buckets))
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            for name, key, value, *extra in metric.samples():
+                lines.append(f'{name}{format_labels(key, *extra)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """
+        Grava as métricas em `path` de forma atômica (arquivo temporário +
+        rename), para o collector nunca ler um arquivo pela metade.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+metrics = MetricsRegistry()
+
+FETCH_SECONDS = metrics.histogram(
+    'scraper_fetch_duration_seconds', 'Duração de cada requisição HTTP, em segundos.', FETCH_BUCKETS)
+FETCH_REQUESTS = metrics.counter(
+    'scraper_fetch_requests_total',
+    'Requisições HTTP por resultado (ok, not_modified, cache_hit, throttled, error). Cada tentativa conta uma vez.')
+FETCH_BYTES = metrics.counter(
+    'scraper_fetch_bytes_total', 'Bytes de corpo de resposta baixados.')
+FETCH_RETRIES = metrics.counter(
+    'scraper_fetch_retries_total', 'Novas tentativas de requisições HTTP.')
+FETCH_CONCURRENCY = metrics.gauge(
+    'scraper_fetch_concurrency', 'Limite de concorrência atual do controle adaptativo (AIMD).')
+FETCH_RATE = metrics.gauge(
+    'scraper_fetch_requests_per_second', 'Requisições HTTP por segundo na última execução.')
+FETCH_ERROR_RATE = metrics.gauge(
+    'scraper_fetch_error_rate', 'Fração das requisições HTTP da última execução com 429/503 ou erro.')
+PARSE_SECONDS = metrics.histogram(
+    'scraper_parse_duration_seconds', 'Duração do parse de cada página HTML, em segundos.', PARSE_BUCKETS)
+EVENTS_PARSED = metrics.counter(
+    'scraper_events_parsed_total', 'Eventos extraídos dos scripts JSON-LD.')
+PARSE_RATE = metrics.gauge(
+    'scraper_parse_events_per_second', 'Eventos extraídos por segundo de parse na última execução.')
+WRITE_SECONDS = metrics.histogram(
+    'scraper_write_duration_seconds', 'Duração de cada chamada de DatabasePipeline.process_events, em segundos.',
+    WRITE_BUCKETS)
+EVENTS_WRITTEN = metrics.counter(
+    'scraper_events_written_total', 'Eventos enviados ao pipeline por resultado (inserted, updated, unchanged, failed).')
+ROWS_WRITTEN = metrics.counter(
+    'scraper_rows_written_total', 'Linhas gravadas no banco por tabela.')
+RUN_DURATION = metrics.gauge(
+    'scraper_run_duration_seconds', 'Duração da última execução do scraper, em segundos.')
+RUN_TIMESTAMP = metrics.gauge(
+    'scraper_run_finished_timestamp_seconds', 'Horário (epoch) do fim da última execução do scraper.')
+RUN_SUCCESS = metrics.gauge(
+    'scraper_run_success', '1 se a última execução terminou com sucesso, 0 caso contrário.')
@@ -0,0 +1,86 @@
+import logging
+import os
+from src.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class RunLock:
+    """
+    Trava exclusiva e não bloqueante em um arquivo, que impede duas execuções
+    do scraper ao mesmo tempo (menu, CLI, cron ou daemon). A trava é do sistema
+    operacional: é liberada sozinha se o processo morrer, então nunca sobra
+    um arquivo de trava "preso" depois de um kill ou de uma queda.
+    """
+
+    def __init__(self, path=settings.scrape_lock_file):
+        self.path = path
+        self._file = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def locked(self):
+        return self._file is not None
+
+    def acquire(self):
+        """
+        Tenta obter a trava. Retorna False, sem esperar, se outro processo já a tem.
+        """
+        if self._file is not None:
+            return True
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir and not os.path.exists(lock_dir):
+            os.makedirs(lock_dir)
+        lock_file = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+
+        # Só informativo: quem tem a trava é o processo, não o conteúdo do arquivo.
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        self.logger.debug("Trava %s obtida.", self.path)
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+        self.logger.debug("Trava %s liberada.", self.path)
+
+    def holder(self):
+        """
+        PID gravado no arquivo pelo processo que tem (ou teve) a trava, ou None.
+        """
+        try:
+            with open(self.path) as lock_file:
+                return int(lock_file.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,113 @@
+# tests/conftest.py
+"""
+Os testes nunca tocam nos arquivos reais do projeto: antes de qualquer import
+de `src`, o banco, o cache HTTP, a trava, o log, as métricas e as exportações
+apontam para um diretório temporário. O cache de resultados das consultas
+fica desligado, para que cada teste execute o SQL de verdade.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_test_dir = tempfile.mkdtemp(prefix="event_scraper_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_test_dir, 'tests.db')}")
+os.environ.setdefault("HTTP_CACHE_PATH", os.path.join(_test_dir, 'http_cache.db'))
+os.environ.setdefault("SCRAPE_LOCK_FILE", os.path.join(_test_dir, 'scraper.lock'))
+os.environ.setdefault("SCRAPER_LOG", os.path.join(_test_dir, 'scraper.log'))
+os.environ.setdefault("METRICS_FILE", os.path.join(_test_dir, 'scraper.prom'))
+os.environ.setdefault("EXPORT_DIR", os.path.join(_test_dir, 'exports'))
+os.environ.setdefault("QUERY_CACHE_ENABLED", "0")
+
+
+# Esquema do banco entregue com o projeto (src/data/tp5_data.db), anterior a
+# todas as colunas e tabelas adicionadas depois.
+BASELINE_SCHEMA = (
+    'CREATE TABLE "event" ("id" INTEGER NOT NULL PRIMARY KEY, "name" VARCHAR(255) NOT NULL, "type" TEXT NOT NULL, '
+    '"description" VARCHAR(255), "created_at" DATETIME NOT NULL)',
+    'CREATE UNIQUE INDEX "event_name" ON "event" ("name")',
+    'CREATE TABLE "event_data" ("id" INTEGER NOT NULL PRIMARY KEY, "event_id" INTEGER NOT NULL, '
+    '"date" DATETIME NOT NULL, "location" TEXT NOT NULL, '
+    'FOREIGN KEY ("event_id") REFERENCES "event" ("id") ON DELETE CASCADE)',
+    'CREATE INDEX "eventdata_event_id" ON "event_data" ("event_id")',
+    'CREATE UNIQUE INDEX "eventdata_event_id_date" ON "event_data" ("event_id", "date")',
+    'CREATE TABLE "metadata" ("id" INTEGER NOT NULL PRIMARY KEY, "event_id" INTEGER NOT NULL, '
+    '"key" VARCHAR(255) NOT NULL, "value" TEXT NOT NULL, "updated_at" DATETIME NOT NULL, '
+    'FOREIGN KEY ("event_id") REFERENCES "event" ("id") ON DELETE CASCADE)',
+    'CREATE INDEX "metadata_event_id" ON "metadata" ("event_id")',
+    'CREATE UNIQUE INDEX "metadata_event_id_key" ON "metadata" ("event_id", "key")',
+)
+# (nome, local, tipo de evento) dos eventos gravados no banco antigo.
+BASELINE_EVENTS = (
+    ('Samba na Pedra', 'Pedra do Sal - Saúde, Rio de Janeiro - RJ', 'Ao ar livre'),
+    ('Jazz no Parque', 'Parque Lage - Jardim Botânico, Rio de Janeiro - RJ', 'Ao ar livre'),
+    ('Peça no Teatro', 'Teatro Municipal - Centro, Niterói - RJ', None),
+)
+
+
+def drop_tables():
+    from src.db.database import database
+    from src.db.models import (
+        Event, Venue, EventData, Metadata, EventDetails, CrawlWindow, EventSearch, ScrapeRun, CrawlJob, CrawlPage,
+        ExportRun,
+    )
+
+    with database:
+        database.drop_tables([EventSearch, CrawlJob, CrawlPage, CrawlWindow, ExportRun, ScrapeRun, EventDetails,
+                              Metadata, EventData, Venue, Event], safe=True)
+
+
+def reset_database():
+    """
+    Apaga e recria todas as tabelas do banco de testes.
+    """
+    from src.db.init_db import initialize_db
+
+    drop_tables()
+    initialize_db()
+
+
+@pytest.fixture
+def db():
+    """
+    Banco de testes vazio, com todas as tabelas, índices e triggers criados.
+    """
+    from src.db.database import database
+
+    reset_database()
+    database.connect(reuse_if_open=True)
+    yield database
+    if not database.is_closed():
+        database.close()
+
+
+@pytest.fixture
+def baseline_db():
+    """
+    Banco com o esquema original (event, event_data, metadata) e alguns
+    eventos com dados e metadados, como o entregue antes das migrações,
+    aberto como por um processo novo, que ainda não preparou o esquema.
+    """
+    from src.db.database import database
+
+    drop_tables()
+    with database:
+        for statement in BASELINE_SCHEMA:
+            database.execute_sql(statement)
+        for event_id, (name, location, event_type) in enumerate(BASELINE_EVENTS, start=1):
+            database.execute_sql("INSERT INTO event VALUES (?, ?, 'Event', 'Descrição', '2024-11-01 10:00:00')",
+                                 (event_id, name))
+            database.execute_sql("INSERT INTO event_data (event_id, date, location) VALUES (?, ?, ?)",
+                                 (event_id, f'2024-12-0{event_id} 20:00:00', location))
+            metadata = {'price': '50', 'price_currency': 'BRL', 'url': f'https://example.com/{event_id}'}
+            if event_type:
+                metadata['event_type'] = event_type
+            for key, value in metadata.items():
+                database.execute_sql("INSERT INTO metadata (event_id, key, value, updated_at) "
+                                     "VALUES (?, ?, ?, '2024-11-01 10:00:00')", (event_id, key, value))
+    # Como um processo novo: a próxima conexão prepara o esquema.
+    database.schema_ready = False
+    yield database
+    if not database.is_closed():
+        database.close()
@@ -0,0 +1,60 @@
+# tests/test_address_parser.py
+import pytest
+
+from src.parsers.address_parser import canonical_city, parse_address_text, parse_venue
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Rua Exemplo, 12 - Centro, Rio de Janeiro - RJ',
+     {'street': 'Rua Exemplo, 12', 'neighborhood': 'Centro', 'city': 'Rio de Janeiro', 'region': 'RJ'}),
+    ('Rua X, 123, Niterói - RJ, 24000-000, Brasil',
+     {'street': 'Rua X, 123', 'city': 'Niterói', 'region': 'RJ', 'postal_code': '24000-000', 'country': 'Brasil'}),
+    ('Rio de Janeiro', {'city': 'Rio de Janeiro'}),
+    ('Rio de Janeiro - RJ', {'city': 'Rio de Janeiro', 'region': 'RJ'}),
+    ('Centro, Rio de Janeiro', {'neighborhood': 'Centro', 'city': 'Rio de Janeiro'}),
+    ('Rua X, 123, Niterói', {'street': 'Rua X, 123', 'city': 'Niterói'}),
+    ('Rua das Flores, Centro, Rio de Janeiro', {'street': 'Rua das Flores, Centro', 'city': 'Rio de Janeiro'}),
+    ('Rua X, 123', {'street': 'Rua X, 123'}),
+    ('Av. Atlântica', {'street': 'Av. Atlântica'}),
+    ('Rua X, 123 - Centro', {'street': 'Rua X, 123', 'neighborhood': 'Centro'}),
+    ('Desconhecido', {}),
+    # Formas encontradas nos endereços raspados (src/data/tp5_data.db).
+    ('Av. Reporter Nestor Moreira, 42, Botafogo Rio de Janeiro, RJ',
+     {'street': 'Av. Reporter Nestor Moreira, 42', 'neighborhood': 'Botafogo', 'city': 'Rio de Janeiro',
+      'region': 'RJ'}),
+    ('Rua São Francisco Xavier, 210 Maracanã Rio de Janeiro, RJ',
+     {'street': 'Rua São Francisco Xavier, 210', 'neighborhood': 'Maracanã', 'city': 'Rio de Janeiro',
+      'region': 'RJ'}),
+    ('Rua Dolores Carvalho Vasconcelos Glória Macaé, RJ',
+     {'street': 'Rua Dolores Carvalho Vasconcelos Glória', 'city': 'Macaé', 'region': 'RJ'}),
+    ('Av. Atlântica, 1910 – Copacabana – Rio de Janeiro – RJ',
+     {'street': 'Av. Atlântica, 1910', 'neighborhood': 'Copacabana', 'city': 'Rio de Janeiro', 'region': 'RJ'}),
+    ('R. Marquês de Sapucaí | 20220-007 RIO DE JANEIRO',
+     {'street': 'R. Marquês de Sapucaí', 'city': 'Rio de Janeiro', 'postal_code': '20220-007'}),
+    ('R. Domingos Ferreira, 160 - Copacabana, Rio de Janeiro - RJ, 22050-01',
+     {'street': 'R. Domingos Ferreira, 160', 'neighborhood': 'Copacabana', 'city': 'Rio de Janeiro',
+      'region': 'RJ', 'postal_code': '22050-01'}),
+    ('Avenida Afrânio de Melo Franco, 290 a, Leblon, Rio de Janeiro – RJ CEP: 22430-060',
+     {'street': 'Avenida Afrânio de Melo Franco, 290 a, Leblon', 'city': 'Rio de Janeiro', 'region': 'RJ',
+      'postal_code': '22430-060'}),
+    ('Rua do Lavradio, 20, Rio de Janeiro - Rio de Janeiro',
+     {'street': 'Rua do Lavradio, 20', 'city': 'Rio de Janeiro', 'region': 'RJ'}),
+    ('Rua Filinto de Almeida, 42, Cosme Velho – Rio de Janeiro',
+     {'street': 'Rua Filinto de Almeida, 42, Cosme Velho', 'city': 'Rio de Janeiro'}),
+    ('Rua X, 1 - Savassi, Belo Horizonte - Minas Gerais',
+     {'street': 'Rua X, 1', 'neighborhood': 'Savassi', 'city': 'Belo Horizonte', 'region': 'MG'}),
+])
+def test_parse_address_text(text, expected):
+    fields = parse_address_text(text)
+    assert {field: value for field, value in fields.items() if value} == expected
+
+
+def test_city_without_region_keeps_venue_key_case_insensitive():
+    assert parse_venue('Teatro', 'Centro, Rio de Janeiro')['key'] == parse_venue('TEATRO', 'centro, rio de janeiro')['key']
+
+
+def test_canonical_city():
+    assert canonical_city('RIO DE JANEIRO') == 'Rio de Janeiro'
+    assert canonical_city('niterói') == 'Niterói'
+    assert canonical_city('Botafogo Rio de Janeiro') == 'Botafogo Rio de Janeiro'
+    assert canonical_city('Cidade Nova') == 'Cidade Nova'
@@ -0,0 +1,161 @@
+# tests/test_database_pipeline.py
+import sqlite3
+
+import pytest
+
+from benchmarks.bench_pipeline import make_parsed_events
+from src.config import settings
+from src.db.database import SQLITE_MAX_VARIABLES, insert_chunks
+from src.db.models import Event, EventData, EventDetails, Venue
+from src.pipelines.database_pipeline import DatabasePipeline
+from src.queries.query_cache import query_cache
+from src.scraper import persist_pages
+from tests.conftest import reset_database
+
+
+def test_insert_chunks_respect_variable_limit():
+    rows = [{column: 0 for column in 'abcdef'} for _ in range(1000)]
+    chunks = list(insert_chunks(rows))
+    assert sum(len(chunk) for chunk in chunks) == 1000
+    assert all(len(chunk) * 6 <= SQLITE_MAX_VARIABLES for chunk in chunks)
+    assert list(insert_chunks([])) == []
+
+
+def test_batch_write_fits_old_sqlite_variable_limit(db):
+    # Simula um SQLite anterior à 3.32 (limite padrão de 999 variáveis).
+    db.connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, SQLITE_MAX_VARIABLES)
+    events = make_parsed_events(500)
+
+    DatabasePipeline().process_events_batch(events)
+
+    assert Event.select().count() == 500
+    assert EventData.select().count() == 500
+    assert EventDetails.select().count() == 500
+    assert Venue.select().count() > 0
+
+
+class FailingCrawlState:
+    """
+    Estado do crawl que falha ao registrar a página de número `fail_on`.
+    """
+
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.pages = 0
+
+    def record_page(self, date_str, offset, count, next_offset):
+        self.pages += 1
+        if self.pages == self.fail_on:
+            raise RuntimeError("falha simulada no checkpoint")
+
+    def complete_window(self, date_str):
+        pass
+
+
+def make_pages(events, page_size=12):
+    return [('2026-01-01', offset, offset + page_size, events[offset:offset + page_size])
+            for offset in range(0, len(events), page_size)]
+
+
+def test_identity_map_waits_for_outer_commit(db):
+    pipeline = DatabasePipeline()
+    events = make_parsed_events(12)
+    generation = query_cache.generation()
+
+    with pipeline.transaction():
+        pipeline.process_events(events)
+        assert len(pipeline.identity_map) == 0
+        assert query_cache.generation() == generation
+
+    assert len(pipeline.identity_map) == 12
+    assert query_cache.generation() != generation
+
+
+def test_rolled_back_page_is_not_remembered(db):
+    pipeline = DatabasePipeline()
+    events = make_parsed_events(36)
+
+    with pytest.raises(RuntimeError):
+        persist_pages(pipeline, make_pages(events), FailingCrawlState(fail_on=2))
+
+    assert Event.select().count() == 12
+    assert len(pipeline.identity_map) == 0
+
+    # Uma nova execução grava os eventos da página desfeita, em vez de pulá-los como inalterados.
+    pipeline.reset_stats()
+    pipeline.process_events(events)
+    assert pipeline.write_stats['inserted'] == 24
+    assert pipeline.write_stats['unchanged'] == 12
+    assert Event.select().count() == 36
+    ids = dict(Event.select(Event.name, Event.id).tuples())
+    assert all(ids[name] == event_id for name, (event_id, _) in pipeline.identity_map._entries.items())
+
+
+def test_individual_writes_wait_for_outer_commit(db, monkeypatch):
+    monkeypatch.setattr(settings, 'pipeline_batch_writes', False)
+    pipeline = DatabasePipeline()
+    events = make_parsed_events(24)
+
+    with pytest.raises(RuntimeError):
+        persist_pages(pipeline, make_pages(events), FailingCrawlState(fail_on=1))
+
+    assert Event.select().count() == 0
+    assert len(pipeline.identity_map) == 0
+    pipeline.process_events(events)
+    assert Event.select().count() == 24
+
+
+def stored_rows():
+    events = list(Event.select(Event.name, Event.type, Event.description, Event.fingerprint)
+                  .order_by(Event.name).tuples())
+    event_data = list(EventData
+                      .select(Event.name, EventData.date, EventData.location, Venue.key)
+                      .join(Event).switch(EventData).join(Venue)
+                      .order_by(Event.name, EventData.date)
+                      .tuples())
+    details = list(EventDetails
+                   .select(Event.name, EventDetails.price, EventDetails.url)
+                   .join(Event)
+                   .order_by(Event.name)
+                   .tuples())
+    return events, event_data, details
+
+
+def recurring_events():
+    """
+    Eventos de uma página com um evento recorrente listado em três datas,
+    a última num local diferente.
+    """
+    events = make_parsed_events(6)
+    first = events[0]
+    occurrences = [first._replace(start_date=events[index].start_date) for index in range(3)]
+    occurrences[-1] = occurrences[-1]._replace(location=events[1].location, address=events[1].address)
+    return occurrences + events[3:]
+
+
+def test_batch_and_individual_paths_write_the_same_rows(db):
+    events = recurring_events()
+    DatabasePipeline().process_events_individually(events)
+    individual = stored_rows()
+
+    reset_database()
+    DatabasePipeline().process_events_batch(events)
+    batch = stored_rows()
+
+    assert len(batch[1]) == len(events)
+    assert batch == individual
+
+
+def test_batch_path_skips_unchanged_recurring_event(db):
+    events = recurring_events()
+    DatabasePipeline().process_events_batch(events)
+
+    # Uma página posterior só com a última ocorrência não muda nada...
+    pipeline = DatabasePipeline()
+    pipeline.process_events_batch(events[2:])
+    assert pipeline.write_stats['unchanged'] == len(events) - 2
+    # ...mas uma data que ainda não foi gravada é gravada, mesmo com a última ocorrência igual.
+    first_date = pipeline.parse_date(events[0].start_date)
+    assert EventData.delete().where(EventData.date == first_date).execute() == 1
+    pipeline.process_events_batch(events)
+    assert EventData.select().count() == len(events)
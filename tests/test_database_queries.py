@@ -0,0 +1,216 @@
+# tests/test_database_queries.py
+import logging
+from datetime import datetime
+
+import pytest
+
+from benchmarks.bench_queries import OUTDOOR_EVERY, count_statements, load_database
+from benchmarks.corpus import make_event as make_corpus_event
+from src.db.models import Event, EventData, EventDetails
+from src.parsers.event_parser import EventParser, ParsedEvent
+from src.pipelines.database_pipeline import DatabasePipeline
+from src.queries import database_queries
+from tests.conftest import BASELINE_EVENTS
+
+# Blocos maiores que qualquer banco dos testes: as versões em streaming leem tudo em um bloco.
+ONE_CHUNK = 10 ** 6
+
+# Statements executados por cada função de consulta, qualquer que seja o
+# número de eventos. Uma contagem que cresce com o banco é uma consulta por linha (N+1).
+EXPECTED_STATEMENTS = {
+    'get_all_events': (database_queries.get_all_events, 1),
+    'get_upcoming_events': (database_queries.get_upcoming_events, 1),
+    'get_events_in_rio': (database_queries.get_events_in_rio, 1),
+    'get_events_in_city': (lambda: database_queries.get_events_in_city('Niterói'), 1),
+    'get_outdoor_events': (database_queries.get_outdoor_events, 1),
+    'get_metadata_per_event': (database_queries.get_metadata_per_event, 2),
+    'search_events': (lambda: database_queries.search_events('festival', limit=None), 1),
+    'iter_all_events': (lambda: list(database_queries.iter_all_events(chunk_size=ONE_CHUNK)), 1),
+    'iter_events_in_rio': (lambda: list(database_queries.iter_events_in_rio(chunk_size=ONE_CHUNK)), 1),
+    'iter_outdoor_events': (lambda: list(database_queries.iter_outdoor_events(chunk_size=ONE_CHUNK)), 1),
+    'iter_metadata_per_event': (lambda: list(database_queries.iter_metadata_per_event(chunk_size=ONE_CHUNK)), 3),
+    'get_database_stats': (database_queries.get_database_stats, 8),
+}
+
+# (local, endereço) de cada local dos eventos em src/data/tp5_data.db, como raspados.
+SHIPPED_VENUES = (
+    ('Teatro Multiplan', 'VillageMall - AV. DAS AMÉRICAS, 3900 - PISO SS1, Rio de Janeiro - Rio de Janeiro'),
+    ('Teatro Brigitte Blair', 'R. Miguel Lemos, 51 - h - Copacabana, Rio de Janeiro - RJ, 22071-000, Brasil'),
+    ('Espaço Rampa', 'Av. Reporter Nestor Moreira, 42, Botafogo Rio de Janeiro, RJ'),
+    ('Retrato Espaço Cultural', 'Rua Benjamin Constant, 117 - Glória'),
+    ('Teatro Cândido Mendes', 'Rua Joana Angélica , 63, Rio de Janeiro - Rio de Janeiro'),
+    ('Teatro Riachuelo RJ', 'Rua do Passeio , 40, Rio de Janeiro - Rio de Janeiro'),
+    ('Bar do Belo', 'Avenida das Américas, 13970, Bar do Belo., Recreio dos Bandeirantes Rio de Janeiro, RJ'),
+    ('Teatro Fashion Mall', 'Estr. da Gávea, 899 - São Conrado, Rio de Janeiro - RJ, 22610-001, Brasil'),
+    ('Sacadura 154', 'Rua Sacadura Cabral, 154 - Centro - Rio de Janeiro, RJ'),
+    ('Da Vinci Comedy', 'Rua São Francisco Xavier, 210 Maracanã Rio de Janeiro, RJ'),
+    ('Escola de Artes Visuais do Parque Lage', 'R. Jardim Botânico, 414, Rio de Janeiro - Rio de Janeiro'),
+    ('Sala Nelson Pereira dos Santos', 'Av. Visconde do Rio Branco, 880 - São Domingos, Niterói - RJ, 24210-200'),
+    ('Bar Carioca da Gema', 'Avenida Mem de Sá, 79 Lapa Rio de Janeiro, RJ'),
+    ('Teatro Dercy Gonçalves', 'Teatro Dercy Gonçalves Rua Professor Valadares, 262, Grajaú Rio de Janeiro, RJ'),
+    ('Teatro Rival Petrobras', 'Rua Álvaro Alvim ,33 - Subsolo, Rio de Janeiro - Rio de Janeiro'),
+    ('O CAMARÃO Shopping Nova Iguaçu', 'Avenida Abílio Augusto Távora, 1111 Luz Nova Iguaçu, RJ'),
+    ('Teatro Solar de Botafogo RJ', 'Rua General Polidoro , 180, Rio de Janeiro - Rio de Janeiro'),
+    ('Roxx Music Bar', 'Rua Coronel Serrado, 926 Ze Garoto São Gonçalo, RJ'),
+    ('Rio Scenarium', 'Rua do Lavradio, 20, Rio de Janeiro - Rio de Janeiro'),
+    ('Arena Jockey', 'Praça Santos Dumont, 31 - Gávea, Rio de Janeiro/RJ'),
+    ('Teatro dos 4', 'Rua Marquês de São Vicente , 52 - Loja 265, Rio de Janeiro - Rio de Janeiro'),
+    ('Via Music Hall', 'Rod. Pres. Dutra, 4200 - Parque Barreto, São João de Meriti - RJ, 25586-140, Brasil'),
+    ('Blue Note Rio', 'Av. Atlântica, 1910 – Copacabana – Rio de Janeiro – RJ'),
+    ('Teatro Cesgranrio', 'Cesgranrio'),
+    ('Teatro Poeira', 'Teatro Poeira - R. São João Batista, 104, Rio de Janeiro - Rio de Janeiro'),
+    ('Teatro Casa Grande', 'Avenida Afrânio de Melo Franco, 290 a, Leblon, Rio de Janeiro – RJ CEP: 22430-060'),
+    ('Circo Voador', 'R. dos Arcos, s/n - Jardim Iracema, Rio de Janeiro - RJ, 20230-060, Brasil'),
+    ('Sesc Copacabana', 'R. Domingos Ferreira, 160 - Copacabana, Rio de Janeiro - RJ, 22050-01'),
+    ('Casa Savana', 'Rua Camerino, 162 - Centro, Rio de Janeiro - 20080-010'),
+    ('Qualistage', 'Av. Ayrton Senna, 3000, 22775-003 Rio de Janeiro'),
+    ('Vivo Rio', 'Av. Infante Dom Henrique, 85 - Parque do Flamengo, Rio de Janeiro - RJ, 20021-140, Brasil'),
+    ('Experience Music', 'Rua Riachuelo, 20 - Lapa - Rio de Janeiro, RJ'),
+    ('Farmasi Arena', 'Av. Embaixador Abelardo Bueno, 3401 - Barra da Tijuca, Rio de Janeiro - RJ, 22775-040, Brasil'),
+    ('Aldeia Lagoa', 'Avenida Borges de Medeiros, 1994 Lagoa'),
+    ('Museu do Amanhã', 'Praça Mauá, 1 - Centro, Rio de Janeiro - RJ, 20081-240, Brasil'),
+    ('Z42 Arte', 'Rua Filinto de Almeida, 42, Cosme Velho – Rio de Janeiro'),
+    ('Trem do Corcovado', 'Rua Cosme Velho 513 - Cosme Velho, Rio de Janeiro - RJ'),
+    ('Teatro Municipal São Gonçalo', 'Rua Doutor Felíciano Sodré, 100 Centro São Gonçalo, RJ'),
+    ('Teatro Clara Nunes', 'Rua Marquês de São Vicente - Loja 370, 53, Rio de Janeiro - Rio de Janeiro'),
+    ('Casa de Portugal - Teresópolis - RJ', 'Avenida Lúcio Meira, 850 Várzea Teresópolis, RJ'),
+    ('Estádio do Maracanã', 'Av. Pres. Castelo Branco, Portão 3 - Maracanã, Rio de Janeiro - RJ, 20271-130, Brasil'),
+    ('Rio de Janeiro', ''),
+    ('Auditório Mercure Macaé - RJ', 'Rua Dolores Carvalho Vasconcelos Glória Macaé, RJ'),
+    ('Teatro Vanucci', 'Rua Marques São Vicente , 52 - 3º andar Loja 371, Rio de Janeiro - Rio de Janeiro'),
+    ('Teatro Claro Rio', 'Rua Siqueira Campos, 143 - 2º Piso - Copacabana, Rio de Janeiro'),
+    ('', ''),
+    ('Apoteose', 'R. Marquês de Sapucaí | 20220-007 RIO DE JANEIRO'),
+    ('Riocentro', 'Av. Salvador Allende, 6555 - Barra da Tijuca, Rio de Janeiro - RJ, 22783-127, Brasil'),
+    ('TEATRO ADOLPHO BLOCH', 'Rua do Russel, 804, Rio de Janeiro - Rio de Janeiro'),
+    ('Alto Vidigal Brasil', 'Rua Armando Almeida Lima, 2, Vidigal Rio de Janeiro, RJ'),
+    ('Audio Rebel', 'Audio Rebel - Rio de Janeiro, R. Visc. de Silva, 55 - Botafogo, Rio de Janeiro - RJ, 22271-091'),
+)
+
+
+def legacy_rio_rows():
+    """
+    A Consulta 3 antes da tabela venue: LIKE no texto de event_data.location.
+    """
+    query = (EventData
+             .select(Event.name, EventData.date)
+             .join(Event)
+             .where(EventData.location ** f'%{database_queries.RIO_DE_JANEIRO}%')
+             .tuples())
+    return sorted((name, date.strftime('%Y-%m-%d')) for name, date in query)
+
+
+def rows_of(results):
+    return sorted((row['Nome'], row['Data']) for row in results)
+
+
+def make_event(name, location, address):
+    return ParsedEvent.from_record((name, 'Event', 'Descrição', '2025-01-10', None, location, address,
+                                    None, None, None, None, None))
+
+
+def test_events_in_rio_match_legacy_like_query(db):
+    load_database(1000)
+    legacy = legacy_rio_rows()
+    assert legacy
+    assert rows_of(database_queries.get_events_in_rio()) == legacy
+    streamed = [row for rows in database_queries.iter_events_in_rio(chunk_size=37) for row in rows]
+    assert rows_of(streamed) == legacy
+
+
+def test_events_in_rio_include_addresses_without_region(db):
+    DatabasePipeline().process_events([
+        make_event('Só a cidade', 'Teatro A', 'Rio de Janeiro'),
+        make_event('Bairro e cidade', 'Teatro B', 'Centro, Rio de Janeiro'),
+        make_event('Cidade como bairro', 'Teatro C', 'Rua X, 10 - Rio de Janeiro'),
+        make_event('Outra cidade', 'Teatro D', 'Icaraí, Niterói'),
+    ])
+    names = {row['Nome'] for row in database_queries.get_events_in_rio()}
+    assert names == {'Só a cidade', 'Bairro e cidade', 'Cidade como bairro'}
+    assert rows_of(database_queries.get_events_in_rio()) == legacy_rio_rows()
+
+
+def test_events_in_rio_match_legacy_like_query_on_shipped_addresses(db):
+    DatabasePipeline().process_events([
+        make_event(f'Evento {index}', location, address) for index, (location, address) in enumerate(SHIPPED_VENUES)
+    ])
+    legacy = legacy_rio_rows()
+    assert len(legacy) == 40
+    assert rows_of(database_queries.get_events_in_rio()) == legacy
+    assert rows_of(database_queries.get_events_in_city('RIO DE JANEIRO')) == legacy
+    niteroi = {row['Nome'] for row in database_queries.get_events_in_city('niterói')}
+    assert niteroi == {'Evento 11'}
+
+
+def load_with_upcoming(size):
+    """
+    Corpus de `size` eventos no passado mais alguns a partir de hoje, para
+    que get_upcoming_events também tenha linhas.
+    """
+    load_database(size)
+    parser = EventParser()
+    upcoming = [parser.extract_event_data(make_corpus_event(size + index, base_date=datetime.now()))
+                for index in range(5)]
+    DatabasePipeline().process_events(upcoming)
+
+
+@pytest.mark.parametrize('size', [100, 1000])
+def test_statement_count_does_not_grow_with_database(db, size):
+    load_with_upcoming(size)
+    counts = {}
+    for name, (query_function, _) in EXPECTED_STATEMENTS.items():
+        with count_statements() as counter:
+            result = query_function()
+        assert result, name
+        counts[name] = counter[0]
+    assert counts == {name: expected for name, (_, expected) in EXPECTED_STATEMENTS.items()}
+
+
+def test_streaming_runs_one_statement_per_chunk(db):
+    load_database(1000)
+    with count_statements() as counter:
+        chunks = list(database_queries.iter_all_events(chunk_size=64))
+    assert sum(len(chunk) for chunk in chunks) == 1000
+    assert counter[0] == len(chunks)
+
+
+def test_outdoor_events_return_rows(db, caplog):
+    load_database(300)
+    expected = (EventData
+                .select()
+                .join(EventDetails, on=(EventData.event == EventDetails.event))
+                .where(EventDetails.event_type == 'Ao ar livre')
+                .count())
+    assert expected == 300 // OUTDOOR_EVERY
+
+    with caplog.at_level(logging.ERROR):
+        rows = database_queries.get_outdoor_events()
+    assert not caplog.records
+    assert len(rows) == expected
+    assert all(row['Tipo de Evento'] == 'Ao ar livre' for row in rows)
+    streamed = [row for chunk in database_queries.iter_outdoor_events(chunk_size=7) for row in chunk]
+    assert [dict(row) for row in streamed] == [dict(row) for row in rows]
+
+
+
+def test_events_in_rio_on_baseline_database_before_any_scrape(baseline_db, caplog):
+    with caplog.at_level(logging.ERROR):
+        in_rio = database_queries.get_events_in_rio()
+    assert not caplog.records
+    assert {row['Nome'] for row in in_rio} == {'Samba na Pedra', 'Jazz no Parque'}
+
+
+def test_metadata_and_outdoor_queries_on_baseline_database_before_any_scrape(baseline_db, caplog):
+    # Consultas 4 e 5 do menu: event_details é criada e preenchida a partir
+    # de metadata na primeira conexão.
+    with caplog.at_level(logging.ERROR):
+        metadata = database_queries.get_metadata_per_event()
+        outdoor = database_queries.get_outdoor_events()
+    assert not caplog.records
+
+    assert metadata['Samba na Pedra'] == {
+        'event_type': 'Ao ar livre', 'price': '50', 'price_currency': 'BRL', 'url': 'https://example.com/1'}
+    assert metadata['Peça no Teatro'] == {'price': '50', 'price_currency': 'BRL', 'url': 'https://example.com/3'}
+    assert len(metadata) == len(BASELINE_EVENTS)
+    assert {row['Nome'] for row in outdoor} == {'Samba na Pedra', 'Jazz no Parque'}
+    assert all(row['Tipo de Evento'] == 'Ao ar livre' for row in outdoor)
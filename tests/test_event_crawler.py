@@ -0,0 +1,41 @@
+# tests/test_event_crawler.py
+import pytest
+
+from src.crawlers.event_crawler import next_page_offset, parse_has_more
+
+HTML = '<div class="mec-event-article"></div>'
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), (1, True), (0, False),
+    ('1', True), ('0', False), ('true', True), ('false', False), (' True ', True), ('', False),
+    (None, None), ('talvez', None), ([1], None),
+])
+def test_parse_has_more(value, expected):
+    assert parse_has_more(value) is expected
+
+
+@pytest.mark.parametrize('value', [True, 1, '1', 'true'])
+def test_has_more_true_continues_even_on_short_page(value):
+    response = {'html': HTML, 'count': 5, 'has_more_event': value}
+    assert next_page_offset(response, 24, page_size=12) == 29
+
+
+@pytest.mark.parametrize('value', [False, 0, '0', 'false'])
+def test_has_more_false_stops(value):
+    response = {'html': HTML, 'count': 12, 'has_more_event': value}
+    assert next_page_offset(response, 0, page_size=12) is None
+
+
+@pytest.mark.parametrize('value', [None, 'talvez', {'a': 1}])
+def test_unknown_has_more_stops_on_short_page(value):
+    full = {'html': HTML, 'count': 12, 'has_more_event': value}
+    short = {'html': HTML, 'count': 5, 'has_more_event': value}
+    assert next_page_offset(full, 0, page_size=12) == 12
+    assert next_page_offset(short, 12, page_size=12) is None
+
+
+def test_reported_offset_and_empty_html():
+    assert next_page_offset({'html': HTML, 'count': 12, 'offset': '30', 'has_more_event': 'true'}, 12, 12) == 30
+    assert next_page_offset({'html': '  ', 'has_more_event': 'true'}, 0, 12) is None
+    assert next_page_offset(None, 0, 12) is None
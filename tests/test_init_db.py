@@ -0,0 +1,31 @@
+# tests/test_init_db.py
+from tests.conftest import BASELINE_EVENTS
+from src.db.init_db import initialize_db
+from src.db.models import Event, EventData, EventDetails, Metadata, Venue
+
+
+def count_rows(database, table):
+    return database.execute_sql(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+
+def test_migration_keeps_child_rows(baseline_db):
+    initialize_db()
+
+    with baseline_db:
+        assert Event.select().count() == len(BASELINE_EVENTS)
+        assert EventData.select().count() == len(BASELINE_EVENTS)
+        # Os metadados com coluna tipada foram movidos para event_details, não apagados.
+        assert EventDetails.select().where(EventDetails.url.is_null(False)).count() == len(BASELINE_EVENTS)
+        assert Metadata.select().count() == 0
+        assert EventData.select().where(EventData.venue.is_null()).count() == 0
+        assert Venue.select().count() == len(BASELINE_EVENTS)
+        assert Event.select().where(Event.updated_at != Event.created_at).count() == 0
+
+
+def test_migration_is_idempotent(baseline_db):
+    initialize_db()
+    initialize_db()
+
+    with baseline_db:
+        assert count_rows(baseline_db, 'event_data') == len(BASELINE_EVENTS)
+        assert count_rows(baseline_db, 'event_details') == len(BASELINE_EVENTS)
@@ -0,0 +1,90 @@
+# tests/test_scraper.py
+import pytest
+
+from benchmarks.stub_server import StubServer
+from src.config import settings
+from src.db.models import CrawlPage, CrawlWindow, Event
+from src.pipelines.database_pipeline import DatabasePipeline
+from src.scraper import scraper
+from tests.conftest import reset_database
+
+PAGES_PER_WINDOW = 3
+# Página inicial (12 eventos) + 3 janelas de 3 páginas (12 eventos cada).
+TOTAL_EVENTS = 120
+
+
+@pytest.fixture
+def stub(db, monkeypatch):
+    """
+    Scraper síncrono, com cache HTTP, contra o servidor local.
+    """
+    with StubServer(latency=0.001, pages_per_window=PAGES_PER_WINDOW) as server:
+        monkeypatch.setattr(settings, 'target_url', server.url)
+        monkeypatch.setattr(settings, 'crawler_mode', 'sync')
+        monkeypatch.setattr(settings, 'http_cache_enabled', True)
+        monkeypatch.setattr(settings, 'parser_workers', 1)
+        monkeypatch.setattr(settings, 'metrics_file', '')
+        yield server
+
+
+def fail_on_call(monkeypatch, number):
+    """
+    Faz a chamada `number` de DatabasePipeline.process_events falhar.
+    """
+    original = DatabasePipeline.process_events
+    calls = []
+
+    def process_events(self, events):
+        calls.append(len(events))
+        if len(calls) == number:
+            raise RuntimeError("falha simulada na gravação")
+        return original(self, events)
+
+    monkeypatch.setattr(DatabasePipeline, 'process_events', process_events)
+    return lambda: monkeypatch.setattr(DatabasePipeline, 'process_events', original)
+
+
+def test_warm_http_cache_does_not_skip_pages_missing_from_database(stub):
+    assert scraper()
+    assert Event.select().count() == TOTAL_EVENTS
+    requests = stub.request_count
+
+    # Banco novo, cache HTTP ainda quente: as respostas vêm do cache, mas os eventos precisam ser gravados.
+    reset_database()
+    assert scraper(full_recrawl=True)
+    assert stub.request_count == requests
+    assert Event.select().count() == TOTAL_EVENTS
+
+    reset_database()
+    assert scraper()
+    assert Event.select().count() == TOTAL_EVENTS
+
+
+def test_resumed_run_parses_pages_whose_write_was_rolled_back(stub, monkeypatch):
+    restore = fail_on_call(monkeypatch, 3)
+    assert not scraper()
+    restore()
+    assert Event.select().count() < TOTAL_EVENTS
+
+    assert scraper()
+    assert Event.select().count() == TOTAL_EVENTS
+
+
+def test_unchanged_pages_skip_parse_only_when_persisted(stub, monkeypatch):
+    assert scraper()
+    assert CrawlPage.select().count() == 1 + 3 * PAGES_PER_WINDOW
+
+    # Janelas vencidas, páginas já gravadas: nenhuma página chega ao pipeline.
+    CrawlWindow.delete().execute()
+    written = []
+    original = DatabasePipeline.process_events
+    monkeypatch.setattr(DatabasePipeline, 'process_events',
+                        lambda self, events: written.append(len(events)) or original(self, events))
+    assert scraper()
+    assert written == []
+
+    # Sem o registro de uma página, ela volta a passar pelo parse.
+    CrawlPage.delete().where(CrawlPage.offset == 12).execute()
+    CrawlWindow.delete().execute()
+    assert scraper()
+    assert written == [12] * 3
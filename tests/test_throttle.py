@@ -0,0 +1,188 @@
+# tests/test_throttle.py
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from benchmarks.stub_server import StubServer
+from src.crawlers.async_event_crawler import AsyncEventCrawler
+from src.crawlers.event_crawler import EventCrawler
+from src.crawlers.throttle import AIMDLimit, CrawlerThrottle, parse_retry_after
+
+ACTION = 'mec_grid_load_more'
+PAGE_SIZE = 12
+# Folga para a requisição ir do cliente ao stub: as que já tinham saído
+# quando o 429 chegou podem ser recebidas logo depois dele.
+IN_FLIGHT_MARGIN = 0.1
+
+
+class RecordingStub(StubServer):
+    """
+    StubServer que anota o instante de cada requisição recebida e se ela foi recusada.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.arrivals = []
+
+    def admit(self):
+        admitted = super().admit()
+        self.arrivals.append((time.monotonic(), admitted))
+        return admitted
+
+
+def make_throttle(concurrency):
+    return CrawlerThrottle(concurrency=concurrency, rate=0, burst=0, min_concurrency=1, latency_target=0,
+                           max_retries=10, backoff_base=0.01, backoff_max=0.05)
+
+
+def make_windows(count):
+    first = datetime(2024, 12, 1)
+    return [(first + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(count)]
+
+
+def assert_paused_after_refusals(arrivals, retry_after):
+    """
+    Nenhuma requisição chega ao servidor durante o Retry-After de uma
+    recusa, além das que já estavam a caminho.
+    """
+    refusals = [moment for moment, admitted in arrivals if not admitted]
+    assert refusals
+    for refused_at in refusals:
+        during_pause = [moment for moment, _ in arrivals
+                        if refused_at + IN_FLIGHT_MARGIN < moment < refused_at + retry_after - IN_FLIGHT_MARGIN]
+        assert not during_pause, refused_at
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_throttle_status_halves_limit(status):
+    throttle = make_throttle(16)
+    throttle.record_failure(status)
+    assert throttle.limit.current == 8
+    throttle.limit._last_decrease = float('-inf')
+    throttle.record_failure(status)
+    assert throttle.limit.current == 4
+
+
+def test_other_retry_statuses_keep_limit():
+    throttle = make_throttle(16)
+    throttle.record_failure(502)
+    throttle.record_failure(504)
+    assert throttle.limit.current == 16
+
+
+def test_limit_never_goes_below_minimum():
+    limit = AIMDLimit(4, 2, 16, latency_target=0)
+    for _ in range(5):
+        limit._last_decrease = float('-inf')
+        limit.on_throttle()
+    assert limit.current == 2
+
+
+def test_one_decrease_per_round():
+    throttle = make_throttle(16)
+    throttle.record_success(0.5)
+    throttle.record_failure(429)
+    throttle.record_failure(429)
+    assert throttle.limit.current == 8
+
+
+def test_limit_grows_by_one_per_round_of_fast_responses():
+    limit = AIMDLimit(4, 1, 32, latency_target=1.0)
+    for _ in range(6):
+        before = limit.limit
+        for _ in range(round(before)):
+            limit.on_success(0.01)
+        assert limit.limit - before == pytest.approx(1, abs=0.15)
+    assert limit.limit == pytest.approx(4 + 6, abs=0.5)
+
+
+def test_slow_responses_halve_limit():
+    limit = AIMDLimit(8, 1, 32, latency_target=0.2)
+    limit.on_success(0.5)
+    assert limit.current == 4
+
+
+def test_growth_stops_at_maximum():
+    limit = AIMDLimit(4, 1, 6, latency_target=1.0)
+    for _ in range(100):
+        limit.on_success(0.01)
+    assert limit.current == 6
+
+
+@pytest.mark.parametrize('status', [429, 503, 502])
+def test_retry_after_pauses_every_request(status):
+    throttle = make_throttle(4)
+    throttle.record_failure(status, retry_after=0.5)
+    waits = [throttle.bucket.reserve() for _ in range(4)]
+    assert all(0.4 < wait <= 0.5 for wait in waits)
+
+
+def test_pause_only_extends():
+    throttle = make_throttle(4)
+    throttle.record_failure(429, retry_after=2)
+    throttle.record_failure(429, retry_after=0.5)
+    assert throttle.bucket.reserve() > 1.5
+
+
+@pytest.mark.parametrize('retry_after', [0.5, 3, 120])
+def test_backoff_never_shorter_than_retry_after(retry_after):
+    random.seed(0)
+    throttle = CrawlerThrottle(concurrency=4, backoff_base=0.5, backoff_max=60)
+    for attempt in range(10):
+        for _ in range(50):
+            assert throttle.backoff(attempt, retry_after) >= retry_after
+
+
+def test_backoff_without_retry_after_is_capped():
+    random.seed(0)
+    throttle = CrawlerThrottle(concurrency=4, backoff_base=0.5, backoff_max=4)
+    for attempt in range(10):
+        for _ in range(50):
+            assert 0 <= throttle.backoff(attempt) <= min(4, 0.5 * 2 ** attempt)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('5') == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('logo') is None
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+
+
+def test_async_crawler_loses_no_pages_when_throttled():
+    windows = make_windows(6)
+    throttle = make_throttle(4)
+
+    async def crawl(url):
+        pages = {}
+        async with AsyncEventCrawler(url, concurrency=4, throttle=throttle) as crawler:
+            async for start_date, _, response_json in crawler.fetch_windows(ACTION, [(w, 0) for w in windows]):
+                pages[start_date] = response_json
+        return pages
+
+    with RecordingStub(latency=0.2, page_size=PAGE_SIZE, max_concurrent=2, retry_after=1) as server:
+        pages = asyncio.run(crawl(server.url))
+
+    assert server.throttled_count > 0
+    assert server.max_in_flight <= 2
+    assert sorted(pages) == windows
+    assert all(page and page['count'] == PAGE_SIZE for page in pages.values())
+    assert throttle.limit.current < 4
+    assert_paused_after_refusals(server.arrivals, retry_after=1)
+
+
+def test_sync_crawler_loses_no_pages_when_throttled():
+    windows = make_windows(8)
+    crawler = EventCrawler(throttle=make_throttle(1))
+
+    with RecordingStub(latency=0.01, page_size=PAGE_SIZE, rate_limit=4, retry_after=1) as server:
+        crawler.base_url = server.url
+        pages = [crawler.fetch_events_ajax(ACTION, window, 0) for window in windows]
+
+    assert server.throttled_count > 0
+    assert all(page and page['count'] == PAGE_SIZE for page in pages)
+    assert_paused_after_refusals(server.arrivals, retry_after=1)